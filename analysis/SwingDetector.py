@@ -1,19 +1,25 @@
+import backtrader as bt
+
+
 class SwingDetector(bt.Indicator):
     lines = ('swing_high', 'swing_low',)
     params = (
         ('bars_left', 5),  # Number of bars to the left that must be lower/higher
         ('bars_right', 5),  # Number of bars to the right that must be lower/higher
+        ('range_index', None),  # utils.range_index.RangeExtremeIndex of the same chart: O(1) window max/min
     )
 
-    def __init__(self):
-        # Initialize lines with nan to indicate no swing point yet
-        self.lines.swing_high.set_value_with_nan()
-        self.lines.swing_low.set_value_with_nan()
-
     def next(self):
         # Need enough data for the lookback period
         if len(self.data) < self.p.bars_left + self.p.bars_right + 1:
             return
+        # Not enough bars after this one to confirm a swing (end of the chart)
+        if len(self.data) + self.p.bars_right > self.data.buflen():
+            return
+
+        if self.p.range_index is not None:
+            self._next_from_range_index()
+            return
 
         # Check for Swing High
         # Current bar's high
@@ -55,6 +61,26 @@ class SwingDetector(bt.Indicator):
         else:
             self.lines.swing_low[0] = float('nan')
 
+    def _next_from_range_index(self):
+        """
+        Same rule as next(), with the left/right loops replaced by one O(1) window query per side.
+        """
+        index = self.p.range_index
+        bar = len(self.data) - 1
+        left, right = self.p.bars_left, self.p.bars_right
+
+        current_high = self.data.high[0]
+        if (left == 0 or index.max_high(bar - left, bar) < current_high) and (right == 0 or index.max_high(bar + 1, bar + right + 1) < current_high):
+            self.lines.swing_high[0] = current_high
+        else:
+            self.lines.swing_high[0] = float('nan')
+
+        current_low = self.data.low[0]
+        if (left == 0 or index.min_low(bar - left, bar) > current_low) and (right == 0 or index.min_low(bar + 1, bar + right + 1) > current_low):
+            self.lines.swing_low[0] = current_low
+        else:
+            self.lines.swing_low[0] = float('nan')
+
 # Then in your strategy, you'd use:
 # self.swing_points = SwingDetector(self.datas[0], bars_left=5, bars_right=5)
 # And then iterate through self.swing_points.swing_high.array to find the last valid swing high, etc.
@@ -1,9 +1,9 @@
-from ta.volatility import AverageTrueRange
-from ta.momentum import RSIIndicator
 import numpy as np
 import pandas as pd
 import os
 
+from utils.range_index import RangeExtremeIndex
+
 
 # Load and preprocess a raw CSV DataFrame
 def ready_df(df_input, mcap=False):
@@ -21,7 +21,10 @@ def ready_df(df_input, mcap=False):
     return df_input
 
 
-def enrich_indicators(df):
+def enrich_indicators(df, range_index=None):
+    from ta.volatility import AverageTrueRange
+    from ta.momentum import RSIIndicator
+
     df['return'] = df['close'].pct_change()  # Price momentum per second
 
     # Momentum & volatility indicators
@@ -106,10 +109,18 @@ def enrich_indicators(df):
 
     # Double top detector within 10s → early reversal signal
     df['double_top'] = False
-    for i in range(10, len(df)):
-        segment = df['high'].iloc[i - 10:i]
-        if np.sum(np.isclose(segment, segment.max(), rtol=0.0005)) >= 2:
-            df.loc[df.index[i], 'double_top'] = True
+    if range_index is not None and len(df) > 10:
+        # Same rule for all bars at once: max of the previous 10 highs from the range index
+        high = df['high'].to_numpy(dtype=float)
+        segment_max = range_index.rolling_max_high(10)[9:-1]
+        segments = np.lib.stride_tricks.sliding_window_view(high, 10)[:-1]
+        touches = np.isclose(segments, segment_max[:, None], rtol=0.0005).sum(axis=1)
+        df.iloc[10:, df.columns.get_loc('double_top')] = touches >= 2
+    else:
+        for i in range(10, len(df)):
+            segment = df['high'].iloc[i - 10:i]
+            if np.sum(np.isclose(segment, segment.max(), rtol=0.0005)) >= 2:
+                df.loc[df.index[i], 'double_top'] = True
 
     # Compression = low price std → pre-breakout setup
     df['compression_zone'] = df['close'].rolling(60).std() < df['close'].std() * 0.25
@@ -172,7 +183,7 @@ def process_coin(file_path):
     # print(df.columns)
     # print(df.head(2))
     print("Processing ", file_path)
-    df = enrich_indicators(df)
+    df = enrich_indicators(df, range_index=RangeExtremeIndex.from_df(df))
     features = extract_features(df)
     return df, features
 
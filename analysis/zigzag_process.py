@@ -1,5 +1,4 @@
 import os
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 # from ..utils.utils import format_marketcap
@@ -170,33 +169,47 @@ def get_relative_changes(pdf):
     return relative_changes
 
 
-def plot_pivot_1(df, pdf):
+def plot_pivot_1(df, pdf, lifecycle=None):
+    """
+    Plots the chart with its zigzag pivots. lifecycle is the chart's manifest entry (utils.lifecycle):
+    its migration bar is used instead of scanning the closes, and the ATH and death bars are marked too.
+    """
+    import matplotlib.pyplot as plt
+
     pivot_prices = pdf["pivot_prices"]
     candle_idx = pdf["candle_idx"]
     pct_changes = pdf["pct_changes"]
     relative_changes = pdf["raw_changes_ratio"]
     ath_rel = pdf["ath_rel"]
 
-    migration_price = 70_000
-    migration_idx = df[df["close"] > migration_price].index
-    first_migration_time = migration_idx[0]
-    migration_value = df.loc[first_migration_time, "close"]
+    if lifecycle is not None:
+        first_migration_time = lifecycle["migration_bar"]
+    else:
+        migration_price = 70_000
+        migration_idx = df[df["close"] > migration_price].index
+        first_migration_time = migration_idx[0] if len(migration_idx) else None
 
     # Plot the main chart
     timestamps = df.index
     plt.figure(figsize=(14, 6))
     plt.plot(timestamps, df["close"], label='Price', alpha=0.6)
     plt.plot(candle_idx, pivot_prices, 'ro-', label='ZigZag Pivots')
-    plt.plot(first_migration_time, migration_value, 'mo')  # magenta dot
-    # plt.axvline(first_migration_time, color='purple', linestyle='--', alpha=0.6, label='Migration >70K')
-    plt.annotate("Migration\n>70K",
-                 (first_migration_time, migration_value),
-                 textcoords="offset points",
-                 xytext=(0, 80),  # label 40 points above the dot
-                 ha='center',
-                 fontsize=9,
-                 color='purple',
-                 arrowprops=dict(arrowstyle='-', color='purple', alpha=0.6, lw=1.5))  # vertical line
+    if first_migration_time is not None:
+        migration_value = df.loc[first_migration_time, "close"]
+        plt.plot(first_migration_time, migration_value, 'mo')  # magenta dot
+        # plt.axvline(first_migration_time, color='purple', linestyle='--', alpha=0.6, label='Migration >70K')
+        plt.annotate("Migration\n>70K",
+                     (first_migration_time, migration_value),
+                     textcoords="offset points",
+                     xytext=(0, 80),  # label 40 points above the dot
+                     ha='center',
+                     fontsize=9,
+                     color='purple',
+                     arrowprops=dict(arrowstyle='-', color='purple', alpha=0.6, lw=1.5))  # vertical line
+    if lifecycle is not None:
+        plt.axvline(lifecycle["ath_bar"], color='green', linestyle='--', alpha=0.6, label='ATH')
+        if lifecycle["dead_bar"] is not None:
+            plt.axvline(lifecycle["dead_bar"], color='black', linestyle='--', alpha=0.6, label='Dead coin')
 
     # Add labels with both % values
     for i in range(1, len(pivot_prices)):
@@ -221,10 +234,17 @@ def plot_pivot_1(df, pdf):
     plt.show()
 
 
-def after_migration(df, migration_price=70_000):
+def after_migration(df, migration_price=70_000, migration_bar=None):
+    """
+    Marks the pivots after migration: from the first pivot above migration_price, or, with the chart's
+    migration_bar (utils.lifecycle), from the first pivot at or after that bar.
+    """
     pivot_prices = df["pivot_prices"]
 
-    migration_idx = df[df["pivot_prices"] > migration_price].index
+    if migration_bar is not None:
+        migration_idx = df[df["candle_idx"] >= migration_bar].index
+    else:
+        migration_idx = df[df["pivot_prices"] > migration_price].index
     first_migration_time = None
     if not migration_idx.empty:
         first_migration_time = migration_idx[0]
@@ -312,14 +332,15 @@ def ready_df(df_input, mcap=False, log=False):  # Renamed df to df_input to avoi
     return df_input
 
 
-def main(df_file, log=False, draw=False, log_custom_print=False, up_thresh=0.4, down_thresh=-0.4):
+def main(df_file, log=False, draw=False, log_custom_print=False, up_thresh=0.4, down_thresh=-0.4, lifecycle=None):
+    # lifecycle: manifest entry of df_file (utils.lifecycle), marks migration from its migration bar
     df, pdf = get_pivots(ready_df(pd.read_csv(df_file), True, log), up_thresh=up_thresh, down_thresh=down_thresh)
     pivot_indices = pdf["candle_idx"]
     pivot_prices = pdf["pivot_prices"]
     candle_idx = pdf["candle_idx"]
     pdf = ath_rel(pdf)
     pdf = pivot_changes(pdf)
-    pdf = after_migration(pdf)
+    pdf = after_migration(pdf, migration_bar=lifecycle["migration_bar"] if lifecycle is not None else None)
     pdf["next_wave_pct"] = pdf["pct_changes"].shift(-1)
     # relative_changes = get_relative_changes(pdf)
     # pdf["relative_changes"] = relative_changes
@@ -337,7 +358,7 @@ def main(df_file, log=False, draw=False, log_custom_print=False, up_thresh=0.4,
         print(pdf)
 
     if draw:
-        plot_pivot_1(df, pdf)
+        plot_pivot_1(df, pdf, lifecycle=lifecycle)
     return pdf
 
 
@@ -1,7 +1,53 @@
-import pandas as pd
-import numpy as np
+import os
 import datetime
 
+import numpy as np
+import pandas as pd
+
+
+# Elliott wave segments in chart order: (label, length in segment units, trend oscillation factor,
+# close noise scale, volume drift range, volume floor as a fraction of initial_volume)
+WAVE_SEGMENTS = (
+    ('Wave 1', 1, 0.10, 1.0, (-1.0, 1.0), 0.5),
+    ('Wave 2', 1, 0.10, 1.0, (-0.5, 0.5), 0.3),   # Volume decreases in correction
+    ('Wave 3', 2, 0.05, 0.2, (None, 2.0), 1.5),   # Longest and strongest, volume increases significantly
+    ('Wave 4', 1, 0.10, 0.2, (-0.5, 0.5), 0.5),
+    ('Wave 5', 1, 0.05, 0.1, (-1.0, 1.0), 0.8),
+    ('Wave A', 1, 0.10, 0.2, (-0.8, 0.2), 0.3),
+    ('Wave B', 1, 0.10, 0.2, (-0.5, 0.5), None),
+    ('Wave C', 1, 0.10, 0.2, (-0.8, 0.2), None),
+)
+SEGMENT_UNITS = sum(seg[1] for seg in WAVE_SEGMENTS)
+REFERENCE_SEGMENT_CANDLES = 50
+
+
+def _wave_segment(rng, start_mc, change, n, oscillation_factor, noise_scale, price_noise_factor):
+    """
+    Builds the closes of one wave segment at once: a linear move of `change` over n candles,
+    a sine oscillation around the trend and uniform noise.
+    """
+    i = np.arange(n)
+    step = change / n
+    trend = start_mc + step * (i + 1)
+    oscillation = np.sin(i / (n / (2 * np.pi))) * abs(step) * oscillation_factor
+    noise = rng.uniform(-1, 1, n) * price_noise_factor * abs(change) * noise_scale
+    return trend + oscillation + noise
+
+
+def _segment_volume(rng, start_volume, n, drift, volume_noise_factor, floor):
+    """
+    Multiplicative random walk of the volume for one segment, floored at `floor` when given.
+    Per-candle growth is tuned for REFERENCE_SEGMENT_CANDLES candles and scaled down for longer
+    segments, so million-bar charts keep the same overall volume profile instead of overflowing.
+    """
+    low, high = drift
+    low = 0.1 if low is None else low * volume_noise_factor
+    log_growth = np.log1p(rng.uniform(low, high * volume_noise_factor, n)) * min(1.0, REFERENCE_SEGMENT_CANDLES / n)
+    volume = start_volume * np.exp(np.cumsum(log_growth))
+    if floor is not None:
+        volume = np.maximum(volume, floor)
+    return volume
+
 
 def generate_elliott_wave_data(
     start_market_cap=1000,
@@ -10,10 +56,15 @@ def generate_elliott_wave_data(
     candles_per_wave_segment=50,  # Number of candles for each sub-wave (e.g., Wave 1, Wave A, Wave B, etc.)
     price_noise_factor=0.01,
     volume_noise_factor=0.1,
-    start_date=datetime.datetime(2025, 1, 1)
+    start_time=datetime.datetime(2025, 1, 1),
+    seed=None,
+    with_labels=False
 ):
     """
-    Generates synthetic memecoin price data following Elliott Wave Theory.
+    Generates synthetic memecoin 1s candles following Elliott Wave Theory.
+
+    Every wave segment is built with numpy array operations; only the segment targets are
+    chained in Python (each depends on where the previous segment ended).
 
     Args:
         start_market_cap (int): Starting market capitalization.
@@ -22,353 +73,145 @@ def generate_elliott_wave_data(
         candles_per_wave_segment (int): Number of data points (candles) per segment of a wave.
         price_noise_factor (float): Multiplier for random price fluctuations.
         volume_noise_factor (float): Multiplier for random volume fluctuations.
-        start_date (datetime.datetime): Starting date for the data.
+        start_time (datetime.datetime): Time of the first candle (bars are 1s apart).
+        seed (int | np.random.SeedSequence | np.random.Generator): Seed for reproducible charts.
+        with_labels (bool): Add a 'wave' column with the segment label of every candle.
 
     Returns:
-        pd.DataFrame: A DataFrame with 'Open', 'Close', 'High', 'Low', 'Volume', 'MarketCap', and 'Candle' columns.
+        pd.DataFrame: Candles in the axiom CSV schema: 'time' (ms), 'open', 'high', 'low', 'close', 'volume'.
     """
-
-    data = []
-    current_market_cap = start_market_cap
-    current_volume = initial_volume
-    base_price_factor = 1  # Used to scale price movements relative to the initial price
-
-    # --- Impulse Wave 1 --- (5 waves up)
-    # Let's say Wave 1 targets a moderate increase
-    wave1_end_mc = start_market_cap * 3  # Example: 3x increase
-    wave1_length = wave1_end_mc - start_market_cap
-
-    # Sub-waves of Wave 1 (i, ii, iii, iv, v)
-    # For simplicity, we'll model impulse waves as a continuous climb with corrections
-    # We are simulating daily data, so each wave will have 'candles_per_wave_segment' days
-
-    # Wave 1 (overall)
-    wave1_open_mc = current_market_cap
-    for i in range(candles_per_wave_segment):
-        mc = wave1_open_mc + (wave1_length / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (wave1_length / candles_per_wave_segment) * 0.1
-        mc += oscillation
-
-        close_mc = max(start_market_cap, mc + np.random.uniform(-1, 1) * price_noise_factor * wave1_length)
-        open_mc = current_market_cap  # Open is previous close for simulation purposes
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor, volume_noise_factor))
-        vol = max(initial_volume * 0.5, vol)  # Ensure volume doesn't drop too low
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave 1'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    wave1_high_mc = max([d['High_MC'] for d in data if d['Candle'] == 'Wave 1'])
-    wave1_low_mc = min([d['Low_MC'] for d in data if d['Candle'] == 'Wave 1'])
-
-    # --- Corrective Wave 2 --- (retraces Wave 1)
-    # Typical retracements: 0.5, 0.618, 0.786
-    fib_retracement_level_wave2 = np.random.choice([0.5, 0.618, 0.786])
-    retracement_amount = (current_market_cap - wave1_open_mc) * fib_retracement_level_wave2
-    wave2_target_mc = current_market_cap - retracement_amount
-
-    wave2_start_mc = current_market_cap
-    for i in range(candles_per_wave_segment):
-        mc = wave2_start_mc - (retracement_amount / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (retracement_amount / candles_per_wave_segment) * 0.1
-        mc += oscillation
-
-        close_mc = max(start_market_cap, mc + np.random.uniform(-1, 1) * price_noise_factor * retracement_amount)
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor, volume_noise_factor) * 0.5)  # Volume decreases in correction
-        vol = max(initial_volume * 0.3, vol)
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave 2'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    # --- Impulse Wave 3 --- (strongest, never shortest)
-    # Typically 1.618 * Wave 1, or can be much larger. Let's aim for a significant jump.
-    wave3_start_mc = current_market_cap
-    wave3_length_from_wave1_base = wave1_end_mc - wave1_open_mc
-    wave3_target_mc = wave3_start_mc + wave3_length_from_wave1_base * np.random.uniform(2.0, 4.0)  # Larger than 1.618 for a memecoin pump
-    wave3_length = wave3_target_mc - wave3_start_mc
-
-    for i in range(candles_per_wave_segment * 2):  # Make Wave 3 longer and more pronounced
-        mc = wave3_start_mc + (wave3_length / (candles_per_wave_segment * 2)) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment * 2 / (2 * np.pi))) * (wave3_length / (candles_per_wave_segment * 2)) * 0.05
-        mc += oscillation
-
-        close_mc = mc + np.random.uniform(-1, 1) * price_noise_factor * wave3_length * 0.2
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(0.1, volume_noise_factor * 2))  # Volume increases significantly
-        vol = max(initial_volume * 1.5, vol)
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave 3'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    # --- Corrective Wave 4 --- (no overlap with Wave 1's price territory)
-    # Wave 4 retraces Wave 3.
-    # Check Wave 1's highest low to ensure no overlap
-    wave4_start_mc = current_market_cap
-    fib_retracement_level_wave4 = np.random.choice([0.236, 0.382])  # Often shallow
-
-    wave3_price_change = wave3_target_mc - wave3_start_mc
-    retracement_amount_wave4 = wave3_price_change * fib_retracement_level_wave4
-    wave4_target_mc = wave4_start_mc - retracement_amount_wave4
-
-    # Ensure Wave 4 does not overlap Wave 1
-    # For simplicity, we define "overlap" as the low of Wave 4 going below the high of Wave 1.
-    # However, Elliott Wave rule is that Wave 4 doesn't go below the *high of Wave 1*.
-    # Let's use the low of Wave 2 as a proxy for the start of the impulse, so Wave 4 shouldn't go below wave 1's peak.
-    # For now, we'll enforce that the low of Wave 4 is above the start_market_cap + a buffer.
-
-    # A more robust check would involve storing the precise price range of Wave 1
-    # For now, we'll make sure it doesn't drop to its beginning levels
-    wave1_peak_mc_for_overlap_check = max([d['High_MC'] for d in data if d['Candle'] == 'Wave 1'])  # Simple rule of not overlapping
-
-    # Adjust target if it violates the rule
-    if wave4_target_mc < wave1_peak_mc_for_overlap_check * 0.8:  # Simple check to avoid major overlap
-        wave4_target_mc = wave1_peak_mc_for_overlap_check * 0.8
-        retracement_amount_wave4 = wave4_start_mc - wave4_target_mc
-
-    for i in range(candles_per_wave_segment):
-        mc = wave4_start_mc - (retracement_amount_wave4 / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (retracement_amount_wave4 / candles_per_wave_segment) * 0.1
-        mc += oscillation
-
-        close_mc = mc + np.random.uniform(-1, 1) * price_noise_factor * retracement_amount_wave4 * 0.2
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor, volume_noise_factor) * 0.5)
-        vol = max(initial_volume * 0.5, vol)
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave 4'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    # --- Impulse Wave 5 --- (reaches target)
-    wave5_start_mc = current_market_cap
-    # Wave 5 could be equal to Wave 1, or 0.618 * Wave 1, or even extended for memecoins.
-    # Let's ensure it hits the target_market_cap_wave5.
-    wave5_length = target_market_cap_wave5 - wave5_start_mc
-
-    # If the target is not much higher than current, make sure it still has an upward move
-    if wave5_length < start_market_cap * 0.1:
-        wave5_length = start_market_cap * 0.1  # Ensure some minimal increase
-        target_market_cap_wave5 = wave5_start_mc + wave5_length
-
-    for i in range(candles_per_wave_segment):
-        mc = wave5_start_mc + (wave5_length / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (wave5_length / candles_per_wave_segment) * 0.05
-        mc += oscillation
-
-        close_mc = mc + np.random.uniform(-1, 1) * price_noise_factor * wave5_length * 0.1
-        close_mc = min(close_mc, target_market_cap_wave5 * 1.05)  # Cap at target with slight overshoot
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor, volume_noise_factor))  # Volume can taper off
-        vol = max(initial_volume * 0.8, vol)
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave 5'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    # --- Corrective Wave A ---
-    waveA_start_mc = current_market_cap
-    waveA_drop_factor = np.random.uniform(0.3, 0.6)  # Significant drop after impulse
-    waveA_target_mc = waveA_start_mc * (1 - waveA_drop_factor)
-    waveA_length = waveA_start_mc - waveA_target_mc
-
-    for i in range(candles_per_wave_segment):
-        mc = waveA_start_mc - (waveA_length / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (waveA_length / candles_per_wave_segment) * 0.1
-        mc += oscillation
-
-        close_mc = mc + np.random.uniform(-1, 1) * price_noise_factor * waveA_length * 0.2
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor * 0.8, volume_noise_factor * 0.2))  # Volume can remain high or drop
-        vol = max(initial_volume * 0.3, vol)
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave A'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    waveA_low_mc = current_market_cap
-
-    # --- Corrective Wave B --- (retraces Wave A)
-    fib_retracement_level_waveB = np.random.choice([0.5, 0.618, 0.786])
-    retracement_amount_waveB = (waveA_start_mc - waveA_low_mc) * fib_retracement_level_waveB
-    waveB_target_mc = waveA_low_mc + retracement_amount_waveB
-
-    waveB_start_mc = current_market_cap
-    for i in range(candles_per_wave_segment):
-        mc = waveB_start_mc + (retracement_amount_waveB / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (retracement_amount_waveB / candles_per_wave_segment) * 0.1
-        mc += oscillation
-
-        close_mc = mc + np.random.uniform(-1, 1) * price_noise_factor * retracement_amount_waveB * 0.2
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor * 0.5, volume_noise_factor * 0.5))
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave B'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    # --- Corrective Wave C --- (extends beyond Wave A)
-    # Often 1.0 or 1.618 times Wave A's length
-    waveC_start_mc = current_market_cap
-    waveC_extension_factor = np.random.choice([1.0, 1.618])
-    waveC_length = (waveA_start_mc - waveA_low_mc) * waveC_extension_factor
-    waveC_target_mc = waveC_start_mc - waveC_length
-
-    # Ensure it doesn't drop to absurdly low levels
-    if waveC_target_mc < start_market_cap * 0.5:
-        waveC_target_mc = start_market_cap * 0.5
-        waveC_length = waveC_start_mc - waveC_target_mc
-
-    for i in range(candles_per_wave_segment):
-        mc = waveC_start_mc - (waveC_length / candles_per_wave_segment) * (i + 1)
-
-        # Add some oscillation within the trend
-        oscillation = np.sin(i / (candles_per_wave_segment / (2 * np.pi))) * (waveC_length / candles_per_wave_segment) * 0.1
-        mc += oscillation
-
-        close_mc = mc + np.random.uniform(-1, 1) * price_noise_factor * waveC_length * 0.2
-        close_mc = max(start_market_cap * 0.1, close_mc)  # Don't go below almost zero
-        open_mc = current_market_cap
-        high_mc = max(open_mc, close_mc) * (1 + np.random.uniform(0, price_noise_factor))
-        low_mc = min(open_mc, close_mc) * (1 - np.random.uniform(0, price_noise_factor))
-
-        vol = current_volume * (1 + np.random.uniform(-volume_noise_factor * 0.8, volume_noise_factor * 0.2))  # Volume can pick up on the final drop
-
-        data.append({
-            'MarketCap': close_mc,
-            'Open_MC': open_mc,
-            'High_MC': high_mc,
-            'Low_MC': low_mc,
-            'Volume': vol,
-            'Candle': 'Wave C'
-        })
-        current_market_cap = close_mc
-        current_volume = vol
-
-    df = pd.DataFrame(data)
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    n = candles_per_wave_segment
+    current_mc = float(start_market_cap)
+    closes, volumes, labels = [], [], []
+    volume = float(initial_volume)
+    wave1_high = None
+    waveA_start = waveA_low = None
+
+    for label, units, oscillation_factor, noise_scale, drift, floor in WAVE_SEGMENTS:
+        if label == 'Wave 1':
+            change = start_market_cap * 3 - start_market_cap  # Example: 3x increase
+        elif label == 'Wave 2':
+            # Typical retracements: 0.5, 0.618, 0.786
+            change = -(current_mc - start_market_cap) * rng.choice([0.5, 0.618, 0.786])
+        elif label == 'Wave 3':
+            # Larger than 1.618 * Wave 1 for a memecoin pump
+            change = (start_market_cap * 3 - start_market_cap) * rng.uniform(2.0, 4.0)
+        elif label == 'Wave 4':
+            change = -(closes[2][-1] - closes[2][0]) * rng.choice([0.236, 0.382])  # Often shallow
+            # Simple check to avoid a major overlap with Wave 1's territory
+            change = max(change, wave1_high * 0.8 - current_mc)
+        elif label == 'Wave 5':
+            change = max(target_market_cap_wave5 - current_mc, start_market_cap * 0.1)
+        elif label == 'Wave A':
+            waveA_start = current_mc
+            change = -current_mc * rng.uniform(0.3, 0.6)  # Significant drop after impulse
+        elif label == 'Wave B':
+            change = (waveA_start - waveA_low) * rng.choice([0.5, 0.618, 0.786])
+        else:  # Wave C, often 1.0 or 1.618 times Wave A's length
+            change = -(waveA_start - waveA_low) * rng.choice([1.0, 1.618])
+            change = max(change, start_market_cap * 0.5 - current_mc)  # Ensure it doesn't drop to absurdly low levels
+
+        segment = _wave_segment(rng, current_mc, change, n * units, oscillation_factor, noise_scale, price_noise_factor)
+        if label in ('Wave 1', 'Wave 2'):
+            segment = np.maximum(segment, start_market_cap)
+        elif label == 'Wave 5':
+            segment = np.minimum(segment, (current_mc + change) * 1.05)  # Cap at target with slight overshoot
+        elif label == 'Wave C':
+            segment = np.maximum(segment, start_market_cap * 0.1)  # Don't go below almost zero
+
+        segment_volume = _segment_volume(rng, volume, n * units, drift, volume_noise_factor,
+                                         None if floor is None else initial_volume * floor)
+        closes.append(segment)
+        volumes.append(segment_volume)
+        labels.append(np.full(n * units, label))
+        current_mc = segment[-1]
+        volume = segment_volume[-1]
+        if label == 'Wave 1':
+            wave1_high = segment.max()
+        elif label == 'Wave A':
+            waveA_low = current_mc
+
+    close_mc = np.concatenate(closes)
+    open_mc = np.concatenate(([start_market_cap], close_mc[:-1]))  # Open is previous close
+    size = len(close_mc)
+    high_mc = np.maximum(open_mc, close_mc) * (1 + rng.uniform(0, price_noise_factor, size))
+    low_mc = np.minimum(open_mc, close_mc) * (1 - rng.uniform(0, price_noise_factor, size))
 
     # Convert Market Cap to Price (assuming 1B circulating supply)
-    df['Close'] = df['MarketCap'] / 1_000_000_000
-    df['Open'] = df['Open_MC'] / 1_000_000_000
-    df['High'] = df['High_MC'] / 1_000_000_000
-    df['Low'] = df['Low_MC'] / 1_000_000_000
+    start_ms = int(pd.Timestamp(start_time).value // 1_000_000)
+    df = pd.DataFrame({
+        'time': start_ms + np.arange(size, dtype=np.int64) * 1000,
+        'open': open_mc / 1_000_000_000,
+        'high': high_mc / 1_000_000_000,
+        'low': low_mc / 1_000_000_000,
+        'close': close_mc / 1_000_000_000,
+        'volume': np.concatenate(volumes),
+    })
+    if with_labels:
+        df['wave'] = np.concatenate(labels)
+    return df
 
-    # Ensure OHLC integrity
-    df['High'] = df[['Open', 'Close', 'High']].max(axis=1) * (1 + np.random.uniform(0, price_noise_factor * 0.5))
-    df['Low'] = df[['Open', 'Close', 'Low']].min(axis=1) * (1 - np.random.uniform(0, price_noise_factor * 0.5))
 
-    # Clean up temporary market cap columns
-    df = df.drop(columns=['MarketCap', 'Open_MC', 'High_MC', 'Low_MC'])
+def generate_chart(n_bars, seed=None, **kwargs):
+    """
+    Generates one synthetic chart with exactly n_bars 1s candles.
 
-    # Add datetime index
-    df['Date'] = [start_date + datetime.timedelta(days=i) for i in range(len(df))]
-    df = df.set_index('Date')
+    Args:
+        n_bars (int): Number of candles.
+        seed: Seed forwarded to generate_elliott_wave_data.
+        **kwargs: Any other generate_elliott_wave_data argument.
 
-    # Reorder columns
-    df = df[['Open', 'Close', 'High', 'Low', 'Volume', 'Candle']]
+    Returns:
+        pd.DataFrame: Candles in the axiom CSV schema.
+    """
+    candles_per_wave_segment = max(1, -(-n_bars // SEGMENT_UNITS))
+    df = generate_elliott_wave_data(candles_per_wave_segment=candles_per_wave_segment, seed=seed, **kwargs)
+    return df.iloc[:n_bars].reset_index(drop=True)
 
-    return df
 
+def generate_charts_to_parquet(n_charts, n_bars, out_dir='synthetic_charts', seed=0, **kwargs):
+    """
+    Writes n_charts synthetic charts of n_bars candles each as Parquet files, for engine stress tests.
 
-# Generate the DataFrame
-memecoin_data = generate_elliott_wave_data(
-    start_market_cap=1_000_000,  # Starting at 1 million market cap
-    target_market_cap_wave5=100_000_000,  # Up to 100 million market cap for Wave 5 end
-    candles_per_wave_segment=30,  # Shorter segments for quicker generation
-    price_noise_factor=0.005,
-    volume_noise_factor=0.08
-)
+    Each chart gets an independent random stream spawned from `seed`, so the batch is reproducible and
+    any single chart can be regenerated on its own. File names follow the axiom naming, so run_all's
+    coin-name extraction works on them ('SYNTH00042').
 
-print(memecoin_data.head())
-print("\n--- Market Cap Progression ---")
-print(memecoin_data['Close'].plot(title='Simulated Memecoin Price Action').get_figure())
-print(memecoin_data.tail())
+    Args:
+        n_charts (int): Number of charts.
+        n_bars (int): Candles per chart.
+        out_dir (str): Output folder (created if missing).
+        seed (int): Root seed of the batch.
+        **kwargs: Any other generate_elliott_wave_data argument.
 
-memecoin_data['Close'].plot(title='Simulated Memecoin Price Action').get_figure()
-plot.show()
\ No newline at end of file
+    Returns:
+        list: Paths of the written Parquet files.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, child_seed in enumerate(np.random.SeedSequence(seed).spawn(n_charts)):
+        df = generate_chart(n_bars, seed=child_seed, **kwargs)
+        path = os.path.join(out_dir, f"axiom_chart_bars_SYNTH{i:05d}_{df['time'].iloc[0]}.parquet")
+        df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    # Generate the DataFrame
+    memecoin_data = generate_elliott_wave_data(
+        start_market_cap=1_000_000,  # Starting at 1 million market cap
+        target_market_cap_wave5=100_000_000,  # Up to 100 million market cap for Wave 5 end
+        candles_per_wave_segment=30,  # Shorter segments for quicker generation
+        price_noise_factor=0.005,
+        volume_noise_factor=0.08,
+        seed=42,
+    )
+
+    print(memecoin_data.head())
+    print(memecoin_data.tail())
+    memecoin_data['close'].plot(title='Simulated Memecoin Price Action')
+    plt.show()
@@ -22,3 +22,11 @@ class CustomSolanaCommission(bt.CommissionInfo):
 
         total_commission = perc_commission + fixed_sol_fee_usd
         return total_commission
+
+    def getcommission_array(self, size, price):
+        """
+        Vectorized _getcommission: size and price can be numpy arrays (broadcast together).
+        Used by utils.exit_sweep to charge the same fees as the broker without running it.
+        """
+        fixed_sol_fee_usd = (self.p.sol_bribe_fee + self.p.sol_priority_fee) * self.p.sol_price_usd
+        return abs(size) * price * self.p.commission + fixed_sol_fee_usd
@@ -1,3 +1,4 @@
+import argparse
 import os
 import numpy as np
 import pandas as pd
@@ -12,6 +13,8 @@ from strategies.Fibo78Once import FiboR78Once
 # from strategies.SimpleTest import SimpleTest
 from utils.data_utils import ready_df
 from utils.plotting_utils import plot_all_portfolio_histories, plot_all_portfolio_histories_by_time, plot_single_backtest
+# from utils.plotting_utils import plot_portfolio_overlay
+from utils.report import generate_report
 from utils.runner import run_all  # Import pandas for data preparation
 
 import backtrader as bt
@@ -22,6 +25,15 @@ import backtrader as bt
 # Connect to Google Drive
 # drive.mount('/content/drive')
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the backtests and plot the results.")
+    parser.add_argument("--report", metavar="OUT_DIR", default=None,
+                        help="Headless mode: render every plot to OUT_DIR (with an index.html) instead of plt.show().")
+    parser.add_argument("--report-formats", default="png", help="Comma separated formats for --report: png,svg,html")
+    parser.add_argument("--report-workers", type=int, default=None, help="Worker processes for --report (default: all cores).")
+    args = parser.parse_args()
+    if args.report:
+        import matplotlib
+        matplotlib.use("Agg")
 
     # Define path to your CSV files
     print("backtrader:", bt.__version__)
@@ -96,6 +108,12 @@ if __name__ == "__main__":
 
     all_results_df
 
+    if args.report:
+        generate_report(all_results_df, all_portfolio_histories, all_cerebros=all_cerebros_objects,
+                        out_dir=args.report, formats=tuple(args.report_formats.split(",")),
+                        workers=args.report_workers, initial_cash=1000)
+        raise SystemExit(0)
+
     import matplotlib.pyplot as plt
     plt.rcParams['figure.figsize'] = [18, 20]  # Adjust as desired
     plt.rcParams['figure.dpi'] = 100
@@ -106,6 +124,9 @@ if __name__ == "__main__":
     # Step 3: Plot all portfolio histories on one chart
     plot_all_portfolio_histories_by_time(all_portfolio_histories, title="Portfolio Value Over Time for All Coins")
     # plot_all_portfolio_histories(all_portfolio_histories, title="Portfolio Value Over Time for All Coins")
+    # For hundreds of coins, downsample and overlay (or show the median / p10-p90 band across coins):
+    # plot_portfolio_overlay(all_portfolio_histories, method='lttb', view='lines')
+    # plot_portfolio_overlay(all_portfolio_histories, view='band')
 
     # Step 4: Select an interesting backtest and plot it
     # You can choose based on 'sharpe_ratio', 'final_value', etc.
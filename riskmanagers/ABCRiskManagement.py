@@ -11,6 +11,55 @@ class AbstractRiskManagement(abc.ABC):
         # A reference to the main strategy instance, allowing access to its data, position, and logging.
         self.strategy = strategy
 
+    def on_position_change(self):
+        """
+        Called by the strategy from notify_order whenever an order reaches a final (or partial) state.
+        Risk managers that cache position-dependent values refresh them here.
+        """
+        pass
+
+    def trigger_envelope(self, current_price: float):
+        """
+        Event skipping: price range (lo, hi, wake_bar) around current_price in which no exit rule can fire
+        or change its state, so the strategy may skip bars until the close leaves it.
+        Returns None when that cannot be guaranteed (the default: never skip).
+        """
+        return None
+
+    def check_intrabar_exits(self, high: float, low: float):
+        """
+        Fixed SL / TP checked against the bar's low / high instead of its close, for coarse bars that may
+        have crossed a level and come back within the bar (SL first, like check_and_execute_exits).
+        Returns the name of the rule that fired, or None.
+        """
+        p = self.strategy.p
+        if p.enable_stop_loss and self.check_and_execute_stop_loss(low):
+            return 'stop_loss'
+        if p.enable_take_profit and self.check_and_execute_take_profit(high):
+            return 'take_profit'
+        return None
+
+    def check_and_execute_exits(self, current_price: float):
+        """
+        Runs the enabled exit rules in priority order:
+        SL > Emergency Exit > Trailing SL > Trailing TP > Dynamic TP > Fixed TP.
+        Returns the name of the rule that fired, or None.
+        """
+        p = self.strategy.p
+        if p.enable_stop_loss and self.check_and_execute_stop_loss(current_price):
+            return 'stop_loss'
+        if p.enable_emergency_exit and self.check_and_execute_emergency_exit(current_price):
+            return 'emergency_exit'
+        if p.enable_trailing_stop_loss and self.check_and_execute_trailing_stop_loss(current_price):
+            return 'trailing_stop_loss'
+        if p.enable_trailing_take_profit and self.check_and_execute_trailing_take_profit(current_price):
+            return 'trailing_take_profit'
+        if p.enable_dynamic_take_profit and self.check_and_execute_dynamic_take_profit(current_price):
+            return 'dynamic_take_profit'
+        if p.enable_take_profit and self.check_and_execute_take_profit(current_price):
+            return 'take_profit'
+        return None
+
     # ---- TP ----
     @abc.abstractmethod
     def check_and_execute_take_profit(self, current_price: float) -> bool:
@@ -1,5 +1,8 @@
 
+import numpy as np
+
 from riskmanagers.ABCRiskManagement import AbstractRiskManagement
+from utils.range_index import narrow_envelope
 
 
 class BaseRiskManagement(AbstractRiskManagement):
@@ -13,6 +16,35 @@ class BaseRiskManagement(AbstractRiskManagement):
         # Internal state for Dynamic Take Profit
         self.dynamic_tp_peak_price = 0.0
 
+        # Position snapshot used by check_and_execute_exits, refreshed only after notify_order
+        self._snapshot_stale = True
+        self._position_size = 0.0
+        self._avg_buy_price = 0.0
+        self._stop_loss_price = 0.0
+        self._take_profit_price = 0.0
+        self._trailing_sl_price = 0.0
+        self._trailing_tp_price = 0.0
+
+    def on_position_change(self):
+        """
+        Marks the position snapshot as stale. The strategy calls this from notify_order,
+        the snapshot itself is rebuilt lazily on the next check_and_execute_exits call
+        (after the strategy has updated its portfolio stats).
+        """
+        self._snapshot_stale = True
+
+    def _refresh_snapshot(self):
+        """
+        Reads the position once and computes every exit threshold for it.
+        """
+        self._position_size = self.strategy.getposition(self.strategy.datas[0]).size
+        self._avg_buy_price = self.strategy.portfolio_avg_buy_price
+        self._stop_loss_price = self._calculate_stop_loss_price()
+        self._take_profit_price = self._calculate_take_profit_price()
+        self._trailing_sl_price = self._calculate_trailing_stop_loss_price()
+        self._trailing_tp_price = self._calculate_trailing_take_profit_price()
+        self._snapshot_stale = False
+
     def _calculate_trailing_stop_loss_price(self) -> float:
         """
         Calculates the trailing stop-loss price based on the highest price reached
@@ -20,7 +52,7 @@ class BaseRiskManagement(AbstractRiskManagement):
         """
         if self.strategy.portfolio_total_quantity == 0 or self.strategy.portfolio_highest_price_since_buy == 0:
             return 0.0
-        return self.strategy.portfolio_highest_price_since_buy * (1 - self.strategy.p.trailing_sl_percent)
+        return self.strategy.highest_price_since_buy() * (1 - self.strategy.p.trailing_sl_percent)
 
     def _calculate_trailing_take_profit_price(self) -> float:
         """
@@ -29,7 +61,7 @@ class BaseRiskManagement(AbstractRiskManagement):
         """
         if self.strategy.portfolio_total_quantity == 0 or self.strategy.portfolio_highest_price_since_buy == 0:
             return 0.0
-        return self.strategy.portfolio_highest_price_since_buy * (1 - self.strategy.p.trailing_tp_percent)
+        return self.strategy.highest_price_since_buy() * (1 - self.strategy.p.trailing_tp_percent)
 
     def _calculate_take_profit_price(self) -> float:
         """
@@ -130,7 +162,7 @@ class BaseRiskManagement(AbstractRiskManagement):
 
         pnl_percent = (current_price / self.strategy.portfolio_avg_buy_price) - 1.0
 
-        if pnl_percent >= self.strategy.p.dynamic_tp_activation_profit_percent:
+        if pnl_percent >= self.strategy.p.dynamic_tp_peak_profit_percent:
             self.dynamic_tp_peak_price = max(self.dynamic_tp_peak_price, current_price)
             dynamic_tp_trigger_price = self.dynamic_tp_peak_price * (1 - self.strategy.p.dynamic_tp_pullback_percent)
 
@@ -145,3 +177,123 @@ class BaseRiskManagement(AbstractRiskManagement):
         else:
             self.dynamic_tp_peak_price = 0.0
         return False
+
+    def trigger_envelope(self, current_price: float):
+        """
+        Price range (lo, hi, wake_bar) around current_price in which none of the enabled exits can fire
+        or change state (trailing highs, dynamic TP peak), see AbstractRiskManagement.trigger_envelope.
+        """
+        if self._snapshot_stale:
+            self._refresh_snapshot()
+        envelope = (-np.inf, np.inf, None)
+        if not self._position_size > 0:
+            return envelope
+        p = self.strategy.p
+        if p.enable_emergency_exit and self.strategy.emergency_exit_triggered:
+            return None
+        if p.enable_stop_loss:
+            envelope = narrow_envelope(envelope, current_price, band_hi=self._stop_loss_price)
+        if p.enable_take_profit:
+            envelope = narrow_envelope(envelope, current_price, band_lo=self._take_profit_price)
+
+        trailing = ((p.enable_trailing_stop_loss, p.trailing_sl_activation_profit_percent, self._calculate_trailing_stop_loss_price),
+                    (p.enable_trailing_take_profit, p.trailing_tp_activation_profit_percent, self._calculate_trailing_take_profit_price))
+        for enabled, activation, trailing_price in trailing:
+            if enabled and envelope is not None:
+                if p.trailing_every_bar:
+                    # Each new highest close moves the trailing price
+                    lo, hi, wake = envelope
+                    envelope = lo, min(hi, max(self.strategy.highest_price_since_buy(), current_price)), wake
+                envelope = narrow_envelope(envelope, current_price, self._avg_buy_price * (1 + activation), trailing_price())
+
+        if p.enable_dynamic_take_profit and envelope is not None:
+            lo, hi, wake = envelope
+            activation_price = self._avg_buy_price * (1 + p.dynamic_tp_peak_profit_percent)
+            if current_price < activation_price:
+                hi = min(hi, activation_price)
+            else:
+                # Armed: a new peak, a drop below the activation price or the pullback all change something
+                hi = min(hi, max(self.dynamic_tp_peak_price, current_price))
+                lo = max(lo, activation_price, self.dynamic_tp_peak_price * (1 - p.dynamic_tp_pullback_percent))
+            envelope = lo, hi, wake
+        return envelope
+
+    def check_and_execute_exits(self, current_price: float):
+        """
+        Fused version of the individual check_and_execute_* methods: one position snapshot and
+        one set of thresholds (recomputed only when the position changed) for all enabled rules.
+        Keeps the priority SL > Emergency Exit > Trailing SL > Trailing TP > Dynamic TP > Fixed TP.
+
+        Returns:
+            str: Name of the rule that placed the exit ('stop_loss', 'emergency_exit', 'trailing_stop_loss',
+                 'trailing_take_profit', 'dynamic_take_profit', 'take_profit'), or None.
+        """
+        if self._snapshot_stale:
+            self._refresh_snapshot()
+        strategy = self.strategy
+        p = strategy.p
+        size = self._position_size
+        fmt = strategy._format_value_for_log_mcap
+
+        if size > 0 and p.enable_stop_loss and current_price <= self._stop_loss_price:
+            strategy.log(f"STOP LOSS TRIGGERED! MarketCap: {fmt(current_price)}, "
+                         f"SL Target: {fmt(self._stop_loss_price)}. "
+                         f"Selling all {size:.2f} units.")
+            strategy.order = strategy.close()
+            return 'stop_loss'
+
+        if p.enable_emergency_exit and strategy.emergency_exit_triggered:
+            if size > 0:
+                strategy.log(f'EMERGENCY EXIT! MarketCap {fmt(current_price)}, '
+                             f'Selling all {size:.2f} units.')
+                strategy.order = strategy.close()
+            return 'emergency_exit'
+
+        if not size > 0:
+            return None
+
+        pnl_percent = (current_price / self._avg_buy_price) - 1.0
+
+        if p.trailing_every_bar and (p.enable_trailing_stop_loss or p.enable_trailing_take_profit):
+            # The highest price since buy moves every bar
+            self._trailing_sl_price = self._calculate_trailing_stop_loss_price()
+            self._trailing_tp_price = self._calculate_trailing_take_profit_price()
+
+        if p.enable_trailing_stop_loss and pnl_percent >= p.trailing_sl_activation_profit_percent \
+                and current_price <= self._trailing_sl_price:
+            strategy.log(f"TRAILING STOP LOSS TRIGGERED! MarketCap: {fmt(current_price)}, "
+                         f"TSL Target: {fmt(self._trailing_sl_price)}. "
+                         f"Selling all {size:.2f} units.")
+            strategy.order = strategy.close()
+            return 'trailing_stop_loss'
+
+        if p.enable_trailing_take_profit and pnl_percent >= p.trailing_tp_activation_profit_percent \
+                and current_price <= self._trailing_tp_price:
+            strategy.log(f"TRAILING TAKE PROFIT TRIGGERED! MarketCap: {fmt(current_price)}, "
+                         f"TTP Target: {fmt(self._trailing_tp_price)}. "
+                         f"Selling all {size:.2f} units.")
+            strategy.order = strategy.close()
+            return 'trailing_take_profit'
+
+        if p.enable_dynamic_take_profit:
+            if pnl_percent >= p.dynamic_tp_peak_profit_percent:
+                self.dynamic_tp_peak_price = max(self.dynamic_tp_peak_price, current_price)
+                dynamic_tp_trigger_price = self.dynamic_tp_peak_price * (1 - p.dynamic_tp_pullback_percent)
+                if current_price <= dynamic_tp_trigger_price:
+                    strategy.log(f"DYNAMIC TAKE PROFIT TRIGGERED! MarketCap: {fmt(current_price)}, "
+                                 f"Peak Price: {fmt(self.dynamic_tp_peak_price)}, "
+                                 f"DTP Target: {fmt(dynamic_tp_trigger_price)}. "
+                                 f"Selling all {size:.2f} units.")
+                    strategy.order = strategy.close()
+                    self.dynamic_tp_peak_price = 0.0
+                    return 'dynamic_take_profit'
+            else:
+                self.dynamic_tp_peak_price = 0.0
+
+        if p.enable_take_profit and current_price >= self._take_profit_price:
+            strategy.log(f'FIXED TAKE PROFIT! Selling all {size:.2f} units. '
+                         f'MarketCap: {fmt(current_price)}, '
+                         f'TP Target: {fmt(self._take_profit_price)}')
+            strategy.order = strategy.close()
+            return 'take_profit'
+        return None
@@ -34,3 +34,6 @@ class NoneRiskManagement(AbstractRiskManagement):
 
     def check_and_execute_trailing_take_profit(self, current_price: float) -> bool:
         return False
+
+    def trigger_envelope(self, current_price: float):
+        return (float('-inf'), float('inf'), None)
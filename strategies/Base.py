@@ -1,4 +1,7 @@
 import backtrader as bt
+import numpy as np
+
+from utils.range_index import RangeExtremeIndex, intersect_envelopes
 from utils.utils import format_marketcap, format_price_to_marketcap
 
 
@@ -42,6 +45,20 @@ class BaseTradingStrategy(bt.Strategy):
         ('atr_period', 15),
         ('bb_period', 20),
         ('bb_devfactor', 2),
+
+        # utils.range_index.RangeExtremeIndex of the chart being run (optional O(1) window max/min)
+        ('range_index', None),
+        # Trailing SL/TP follow the highest close of every bar since the buy, not only the closes
+        # seen at order notifications (range_index makes it an O(1) query)
+        ('trailing_every_bar', False),
+        # Jump over bars where no rule can fire (see _plan_skip), needs preloaded data (the default)
+        ('event_skipping', False),
+        # Stop the run (cerebro.runstop) once is_finished() says nothing can happen anymore
+        ('stop_when_finished', False),
+        # Check SL / TP on the bar's low / high too (coarse bars, see utils.multires), disables event skipping
+        ('intrabar_exits', False),
+        # utils.indicator_cache.IndicatorCache shared by the runs of several configs on the same chart
+        ('indicator_cache', None),
     )
 
     def __init__(self):
@@ -60,7 +77,10 @@ class BaseTradingStrategy(bt.Strategy):
         self.datahigh = self.datas[0].high
         self.datalow = self.datas[0].low
         self.datavolume = self.datas[0].volume
-        self.rsi = bt.indicators.RSI_Safe(self.datas[0].close, period=self.p.rsi_period)
+        if self.p.indicator_cache is not None:
+            self.rsi = self.p.indicator_cache.indicator(bt.indicators.RSI_Safe, self.datas[0], 'close', period=self.p.rsi_period)
+        else:
+            self.rsi = bt.indicators.RSI_Safe(self.datas[0].close, period=self.p.rsi_period)
         # self.rsi = SafeRSI(self.datas[0].close, period=self.p.rsi_period)
 
         # self.sma60 = bt.indicators.SimpleMovingAverage(self.datas[0].close, period=60)
@@ -82,6 +102,8 @@ class BaseTradingStrategy(bt.Strategy):
         self.portfolio_avg_buy_price = 0.0          # Average entry price of current position
         self.portfolio_total_quantity = 0.0         # Total quantity of asset currently held
         self.portfolio_highest_price_since_buy = 0.0  # Highest price reached since the last buy (for dynamic TP)
+        self.portfolio_buy_bar = None               # Bar of the first buy of the open position
+        self.highest_close_since_buy = 0.0          # Highest close of every bar since that buy (trailing_every_bar)
 
         # ATH and Migration tracking
         self.ath = 0.0
@@ -97,9 +119,16 @@ class BaseTradingStrategy(bt.Strategy):
 
         # Risk management will be instantiated in derived classes
         self.risk_manager = None
+        self.last_exit_rule = None  # Name of the last risk management rule that placed an exit
         self.current_price = 0.0
         self.current_marketcap_str = ""
         self.current_volume = 0  # Initialized for FastScalperStrategy
+
+        # Event skipping state
+        self._event_index = None   # RangeExtremeIndex used to find the next bar leaving the envelope
+        self._skip_from = None     # First skipped bar
+        self._skip_until = None    # Bar where next() runs again
+        self._skip_streak = False  # Whether the skipped bars count for green_candle_streak
         print("Base Trading Strategy Initialized")
     # --- Utility Methods ---
 
@@ -155,6 +184,9 @@ class BaseTradingStrategy(bt.Strategy):
         if order.status in [order.Submitted, order.Accepted]:
             return
 
+        if self.risk_manager:
+            self.risk_manager.on_position_change()
+
         if order.status in [order.Completed]:
             if order.isbuy():
                 self.log(f'BUY EXECUTED, Price: {self._format_value_for_log_mcap(order.executed.price)}, Cost: {self.cash_when_mcap(order.executed.value):.6f}, Comm: {self.cash_when_mcap(order.executed.comm):.6f}, Size: {order.executed.size:.2f}')
@@ -194,6 +226,8 @@ class BaseTradingStrategy(bt.Strategy):
         if current_pos.size > 0:
             self.portfolio_total_quantity = current_pos.size
             self.portfolio_avg_buy_price = current_pos.price
+            if self.portfolio_buy_bar is None:
+                self.portfolio_buy_bar = len(self.data) - 1
             # Update highest price for dynamic TP from the current bar's close
             self.portfolio_highest_price_since_buy = max(self.portfolio_highest_price_since_buy, self.dataclose[0])
         else:
@@ -201,6 +235,23 @@ class BaseTradingStrategy(bt.Strategy):
             self.portfolio_total_quantity = 0.0
             self.portfolio_avg_buy_price = 0.0
             self.portfolio_highest_price_since_buy = 0.0
+            self.portfolio_buy_bar = None
+            self.highest_close_since_buy = 0.0
+
+    def highest_price_since_buy(self):
+        """
+        Highest close since the first buy of the open position, used by the trailing exits.
+        By default the value sampled at each order notification (portfolio_highest_price_since_buy);
+        with trailing_every_bar the max over every bar since the buy: the running max next() keeps
+        (highest_close_since_buy), or an O(1) query when there is a range_index.
+        """
+        if not self.p.trailing_every_bar or self.portfolio_buy_bar is None:
+            return self.portfolio_highest_price_since_buy
+        if self.p.range_index is not None:
+            highest = self.p.range_index.max_close(self.portfolio_buy_bar, len(self.data))
+        else:
+            highest = self.highest_close_since_buy
+        return max(self.portfolio_highest_price_since_buy, highest)
 
     def _reset_strategy_state(self):
         if hasattr(self, 'sizer') and hasattr(self.sizer, 'reset'):
@@ -210,6 +261,8 @@ class BaseTradingStrategy(bt.Strategy):
         self.portfolio_avg_buy_price = 0.0
         self.portfolio_total_quantity = 0.0
         self.portfolio_highest_price_since_buy = 0.0
+        self.portfolio_buy_bar = None
+        self.highest_close_since_buy = 0.0
         # self.ath = 0.0 # Consider if ATH should be reset here or only when a new migration occurs
         # self.green_candle_streak = 0 # Consider if streak should be reset here
         self.log("Strategy state reset.")
@@ -231,6 +284,24 @@ class BaseTradingStrategy(bt.Strategy):
         take profit, initial buy, and Fibo retracement buys.
         """
         self.index += 1  # starts after indicators
+        if self.p.trailing_every_bar and self.p.range_index is None and self.portfolio_buy_bar is not None:
+            # Every bar, skipped ones included
+            self.highest_close_since_buy = max(self.highest_close_since_buy, self.dataclose[0])
+        if self._skip_until is not None:
+            if len(self.data) - 1 < self._skip_until:
+                return
+            self._end_skip()
+
+        self._process_bar()
+
+        if self.p.stop_when_finished and self.is_finished():
+            self.log("Strategy finished, stopping the run.")
+            self.env.runstop()
+            return
+        if self.p.event_skipping:
+            self._plan_skip()
+
+    def _process_bar(self):
         # Check if this is the last bar
         # print(len(self),  (self._last()), len(self.dataclose))
         if len(self) == self.data.buflen() - 1:
@@ -268,6 +339,100 @@ class BaseTradingStrategy(bt.Strategy):
         # Execute strategy-specific trading logic
         self._execute_trading_logic()
 
+    def is_finished(self):
+        """
+        Terminal state: flat with no pending order, and next() will never place an order again
+        (dead coin or emergency exit). Strategies with their own terminal states extend this.
+        """
+        if self.order or self.getposition(self.datas[0]).size != 0:
+            return False
+        return self.dead_coin or self.emergency_exit_triggered
+
+    # --- Event Skipping ---
+    def trigger_envelope(self):
+        """
+        Price range (lo, hi, wake_bar) of the close in which _execute_trading_logic does nothing and
+        keeps its state, wake_bar being the first bar it has to see regardless of price (None = no such bar).
+        Strategies that support event skipping override this, the default None disables skipping.
+        """
+        return None
+
+    def _trigger_envelope(self):
+        """
+        Combined envelope of the base bookkeeping (migration, dead coin, ATH), the risk manager and the strategy.
+        """
+        if self.dead_coin or self.emergency_exit_triggered:
+            return (-np.inf, np.inf, None)  # next() returns before doing anything
+        to_data = 1 if self.p.data_in_market_cap else 1_000_000_000
+        if not self.migrated:
+            return (-np.inf, self.p.migration_market_cap / to_data, None)
+        if self.ath == 0.0 or not self.risk_manager:
+            return None
+        base = (self.p.dead_coin_market_cap / to_data, self.ath * self.ath_update_thrshld, None)
+        return intersect_envelopes(base,
+                                   self.risk_manager.trigger_envelope(self.current_price),
+                                   self.trigger_envelope())
+
+    def _next_bar_where(self, line, condition, lookahead=4096):
+        """
+        First bar after the current one where condition(values of line) holds, looking at most lookahead bars
+        ahead (returns the bar after the window when nothing matches). Used for wake bars of trigger envelopes.
+        """
+        bar = len(self.data) - 1
+        if len(line.array) < self.data.buflen():
+            return bar + 1  # not precomputed, look at every bar
+        window = np.asarray(line.array[bar + 1:bar + 1 + lookahead], dtype=float)
+        hits = np.flatnonzero(condition(window))
+        return bar + 1 + (int(hits[0]) if len(hits) else len(window))
+
+    def _plan_skip(self):
+        """
+        Finds the next bar whose close leaves the trigger envelope and skips next() until then.
+        Skipped bars still go through backtrader (broker, analyzers and observers update as usual),
+        next() just returns right away. Bars from buflen - 2 on (final close) are never skipped.
+        """
+        bar = len(self.data) - 1
+        n = self.data.buflen()
+        if self.p.intrabar_exits:  # the envelope only follows the close
+            return
+        if self.order or bar >= n - 3 or len(self.dataclose.array) < n:
+            return
+        envelope = self._trigger_envelope()
+        if envelope is None:
+            return
+        lo, hi, wake = envelope
+        end = n - 2 if wake is None else min(wake, n - 2)
+        # Keep a margin for the price <-> market cap conversions of the rules
+        if np.isfinite(lo):
+            lo += abs(lo) * 1e-9
+        if np.isfinite(hi):
+            hi -= abs(hi) * 1e-9
+        if not lo < hi:
+            return
+
+        if self._event_index is None:
+            self._event_index = self.p.range_index or RangeExtremeIndex(
+                np.asarray(self.datahigh.array), np.asarray(self.datalow.array), np.asarray(self.dataclose.array))
+        wake_bar = self._event_index.next_exit(bar + 1, lo, hi, end)
+        if wake_bar > bar + 1:
+            self._skip_from = bar + 1
+            self._skip_until = wake_bar
+            self._skip_streak = self.migrated and not self.dead_coin and not self.emergency_exit_triggered
+
+    def _end_skip(self):
+        """
+        Applies to green_candle_streak what the skipped bars would have done.
+        """
+        if self._skip_streak:
+            green = (np.asarray(self.dataclose.array[self._skip_from:self._skip_until]) >
+                     np.asarray(self.dataopen.array[self._skip_from:self._skip_until]))
+            red = np.flatnonzero(~green)
+            if len(red):
+                self.green_candle_streak = len(green) - 1 - int(red[-1])
+            else:
+                self.green_candle_streak += len(green)
+        self._skip_from = self._skip_until = None
+
     def _execute_risk_management(self) -> bool:
         """
         Executes the risk management checks in priority order,
@@ -279,17 +444,12 @@ class BaseTradingStrategy(bt.Strategy):
             return False
 
         # Order of priority for exits: SL > Emergency Exit > Trailing SL > Trailing TP > Dynamic TP > Fixed TP
-        if self.p.enable_stop_loss and self.risk_manager.check_and_execute_stop_loss(self.current_price):
-            return True
-        if self.p.enable_emergency_exit and self.risk_manager.check_and_execute_emergency_exit(self.current_price):
-            return True
-        if self.p.enable_trailing_stop_loss and self.risk_manager.check_and_execute_trailing_stop_loss(self.current_price):
-            return True
-        if self.p.enable_trailing_take_profit and self.risk_manager.check_and_execute_trailing_take_profit(self.current_price):
-            return True
-        if self.p.enable_dynamic_take_profit and self.risk_manager.check_and_execute_dynamic_take_profit(self.current_price):
-            return True
-        if self.p.enable_take_profit and self.risk_manager.check_and_execute_take_profit(self.current_price):
+        rule = None
+        if self.p.intrabar_exits:
+            rule = self.risk_manager.check_intrabar_exits(self.datahigh[0], self.datalow[0])
+        rule = rule or self.risk_manager.check_and_execute_exits(self.current_price)
+        if rule:
+            self.last_exit_rule = rule
             return True
         return False
 
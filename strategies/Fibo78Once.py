@@ -1,6 +1,9 @@
 
+import numpy as np
+
 from riskmanagers.BaseRiskManagement import BaseRiskManagement
 from strategies.Base import BaseTradingStrategy
+from utils.range_index import narrow_envelope
 
 
 class FiboR78Once(BaseTradingStrategy):
@@ -62,6 +65,12 @@ class FiboR78Once(BaseTradingStrategy):
             if not self.only_once:
                 self.bought_78 = False
 
+    def trigger_envelope(self):
+        if self.bought_78:
+            return (-np.inf, np.inf, None)
+        upper_bound = self.Fibonacci_Buy_MCAP_78 * (1 + 0.02)
+        return narrow_envelope((-np.inf, np.inf, None), self.current_price, band_hi=upper_bound)
+
     def _execute_trading_logic(self):
         if self.ath <= 0.0:
             return
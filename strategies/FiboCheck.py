@@ -1,3 +1,6 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
 
 from riskmanagers.BaseRiskManagement import BaseRiskManagement
 from strategies.Base import BaseTradingStrategy
@@ -16,31 +19,41 @@ class FiboChecker(BaseTradingStrategy):
         self.buying = False
         self.tp = 0
         self.current_fibo = 0
-        self.Fibonacci_Buy_MCAP = {k: 0 for k in self.Fibonacci_Retracement_important}
-        self.fibo_touched_state = {k: False for k in self.Fibonacci_Retracement_important}  # Track per-level entry state
+        self.tolerance = 0.02  # 2% buffer around every level
+        # Level tables (ascending), rebuilt by update_fibo on every ATH change
+        self.fibo_ratios = np.array(self.Fibonacci_Retracement_important, dtype=float)
+        self.fibo_levels = np.zeros(len(self.fibo_ratios))
+        self.fibo_upper = []  # level * (1 + tolerance): touched from above when price <= upper
+        self.fibo_lower = []  # level * (1 - tolerance): touched from below when price >= lower
+        self.fibo_one_index = self.Fibonacci_Retracement_important.index(1)
         self.current_fibo_index = -1
         self.fibo_ath = 0
         self.use_fib_ath = True
         # self.use_fib_ath = False
-        self.up_counter = {k: 0 for k in self.Fibonacci_Retracement_important}
-        self.down_counter = {k: 0 for k in self.Fibonacci_Retracement_important}
+        self.up_counter = np.zeros(len(self.fibo_ratios), dtype=np.int64)
+        self.down_counter = np.zeros(len(self.fibo_ratios), dtype=np.int64)
         self.counter_updated = False
         self.use_fib_ath_updater_value = 1.272  # one of 1.000, 1.272, 1.382, 1.500, 1.618, 2, 2.618, 3.33, 4.236
+        self.fibo_updater_index = self.Fibonacci_Retracement_important.index(self.use_fib_ath_updater_value)
 
     def update_fibo(self):
-        self.Fibonacci_Buy_MCAP = {k: k * self.ath for k in self.Fibonacci_Retracement_important}
-        self.fibo_touched_state = {k: False for k in self.Fibonacci_Retracement_important}  # Reset states on ATH update
-        print("Updating Fibo", {k: self._format_value_for_log_mcap(v) for k, v in self.Fibonacci_Buy_MCAP.items()})
-        self.current_fibo_index = self.Fibonacci_Retracement_important.index(1)  # index of 1
+        self.fibo_levels = self.fibo_ratios * self.ath
+        # Plain lists: bisect on a list is faster than on a numpy array for a single lookup
+        self.fibo_upper = (self.fibo_levels * (1 + self.tolerance)).tolist()
+        self.fibo_lower = (self.fibo_levels * (1 - self.tolerance)).tolist()
+        print("Updating Fibo", {k: self._format_value_for_log_mcap(v) for k, v in zip(self.Fibonacci_Retracement_important, self.fibo_levels)})
+        self.current_fibo_index = self.fibo_one_index  # index of 1
         self.current_fibo = 1
 
     def update_fibo_ath(self):
-        """ 
-        When self.use_fib_ath, we will update ATH when the price reaches 2 * past_ATH
         """
-        if self.current_fibo_index == self.Fibonacci_Retracement_important.index(self.use_fib_ath_updater_value):  # index of 2
+        When self.use_fib_ath, we will update ATH when the price reaches use_fib_ath_updater_value * past_ATH
+        """
+        if self.current_fibo_index == self.fibo_updater_index:
             self.fibo_ath = self.current_price
             self.update_fibo()
+            return True
+        return False
 
     def update_ath(self):
         if super().update_ath():
@@ -51,65 +64,72 @@ class FiboChecker(BaseTradingStrategy):
             if not self.use_fib_ath:
                 self.update_fibo()
 
-    def check_fibo_touch(self, jump_counter=0, jump_direction=None):
+    def _log_fibo_touch(self, arrow, jumps, level_index):
+        fibo = self.Fibonacci_Retracement_important[level_index]
+        print(" " + arrow * jumps + f"  Price touched Fibonacci Level {fibo} at {self._format_value_for_log_mcap(self.current_price)} ({self._format_value_for_log_mcap(self.fibo_levels[level_index])})")
+
+    def _move_down(self, target_index):
+        """Moves from the current level down to target_index, counting (and buying) every level crossed."""
+        crossed = self.current_fibo_index - target_index
+        self._log_fibo_touch("↓", crossed, target_index)
+        self.down_counter[target_index + 1:self.current_fibo_index + 1] += 1
+        self.counter_updated = True
+        self.current_fibo_index = target_index
+        self.current_fibo = self.Fibonacci_Retracement_important[target_index]
+        for _ in range(crossed):
+            self.buy()
+
+    def _move_up(self, target_index):
+        """Moves from the current level up to target_index, counting (and closing) every level crossed."""
+        crossed = target_index - self.current_fibo_index
+        self._log_fibo_touch("↑", crossed, target_index)
+        self.up_counter[self.current_fibo_index + 1:target_index + 1] += 1
+        self.counter_updated = True
+        self.current_fibo_index = target_index
+        self.current_fibo = self.Fibonacci_Retracement_important[target_index]
+        for _ in range(crossed):
+            self.close()
+
+    def check_fibo_touch(self):
         """
-        Tracks and logs when price crosses into the next higher or lower Fibonacci level.
+        Tracks and logs when price crosses into a higher or lower Fibonacci level.
+        The new level is found with a bisect on the level bounds, so a bar that skips
+        several levels is handled in one step.
         Updates current_fibo_index accordingly.
         """
-        tolerance = 0.02  # 2% buffer
-        if jump_counter > 10:
-            10 / 0
-        # Check downward touch
-        if 0 < self.current_fibo_index and (jump_direction is None or jump_direction == 'down'):
-            below_index = self.current_fibo_index - 1
-            below_fibo = self.Fibonacci_Retracement_important[below_index]
-            below_level = self.Fibonacci_Buy_MCAP[below_fibo]
-            upper_bound = below_level * (1 + tolerance)
-            # print(f"Current Level is {self.current_fibo_index}:{self.current_fibo}, Checking with Below which is {below_index}:{below_fibo}")
-
-            if self.current_price <= upper_bound:
-                if jump_counter:
-                    print(" " + "↓" * (jump_counter + 1) + f"  Price touched Fibonacci Level {below_fibo} at {self._format_value_for_log_mcap(self.current_price)} ({self._format_value_for_log_mcap(below_level)})")
-
-                else:
-                    print(f" ↓  Price touched Fibonacci Level {below_fibo} at {self._format_value_for_log_mcap(self.current_price)} ({self._format_value_for_log_mcap(below_level)})")
-                self.down_counter[self.current_fibo] = self.down_counter[self.current_fibo] + 1
-                self.counter_updated = True
-                self.current_fibo_index = below_index
-                self.current_fibo = below_fibo
-                self.check_fibo_touch(jump_counter + 1, jump_direction="down")
-                self.buy()
-
-        # Check upward touch
-        if 0 < self.current_fibo_index < len(self.Fibonacci_Retracement_important) - 1 and (jump_direction is None or jump_direction == 'up'):
-            above_index = self.current_fibo_index + 1
-            above_fibo = self.Fibonacci_Retracement_important[above_index]
-            above_level = self.Fibonacci_Buy_MCAP[above_fibo]
-            lower_bound = above_level * (1 - tolerance)
-            # print(f"Current Level is {self.current_fibo_index}:{self.current_fibo}, Checking with Above which is {above_index}:{above_fibo}")
-
-            if self.current_price >= lower_bound:
-                if jump_counter:
-                    print(" " + "↑" * (jump_counter + 1) + f"  Price touched Fibonacci Level {above_fibo} at {self._format_value_for_log_mcap(self.current_price)} ({self._format_value_for_log_mcap(above_level)})")
-                else:
-                    print(f" ↑  Price touched Fibonacci Level {above_fibo} at {self._format_value_for_log_mcap(self.current_price)} ({self._format_value_for_log_mcap(above_level)})")
-                self.current_fibo_index = above_index
-                self.current_fibo = above_fibo
-                self.up_counter[self.current_fibo] = self.up_counter[self.current_fibo] + 1
-                self.counter_updated = True
-                self.update_fibo_ath()
-                self.check_fibo_touch(jump_counter + 1, jump_direction="up")
-                self.close()
+        if self.current_fibo_index <= 0:  # level 0 is terminal, as is "no table yet"
+            return
+
+        # Downward: lowest level whose upper bound is still above the price
+        below_index = bisect_left(self.fibo_upper, self.current_price)
+        if below_index < self.current_fibo_index:
+            self._move_down(below_index)
+            return
+
+        # Upward: highest level whose lower bound the price reached. Reaching the updater
+        # level rebuilds the table around the new ATH (at most once per bar), then the
+        # walk goes on from level 1 of the new table.
+        reset_done = False
+        while 0 < self.current_fibo_index < len(self.fibo_lower) - 1:
+            above_index = bisect_right(self.fibo_lower, self.current_price) - 1
+            if above_index <= self.current_fibo_index:
+                break
+            if not reset_done and self.current_fibo_index < self.fibo_updater_index <= above_index:
+                self._move_up(self.fibo_updater_index)
+                reset_done = self.update_fibo_ath()
+                continue
+            self._move_up(above_index)
+            break
 
     def _execute_trading_logic(self):
         if self.ath <= 0.0:
             return
 
-        self.check_fibo_touch(0)  # Log Fibonacci level touch
+        self.check_fibo_touch()  # Log Fibonacci level touch
         if self.current_price < 30_000 and self.counter_updated:
-            print(f"# Using Fibo {self.use_fib_ath}, Updater: {self.use_fib_ath_updater_value}, Down: {sum(self.down_counter.values())}, Up: {sum(self.up_counter.values())}")
-            print("down_coounter", sum(self.down_counter.values()), self.down_counter)
-            print("up_counter", sum(self.up_counter.values()), self.up_counter)
+            print(f"# Using Fibo {self.use_fib_ath}, Updater: {self.use_fib_ath_updater_value}, Down: {self.down_counter.sum()}, Up: {self.up_counter.sum()}")
+            print("down_coounter", self.down_counter.sum(), dict(zip(self.Fibonacci_Retracement_important, self.down_counter.tolist())))
+            print("up_counter", self.up_counter.sum(), dict(zip(self.Fibonacci_Retracement_important, self.up_counter.tolist())))
 
             self.counter_updated = False
         # You can still add other logic here if needed
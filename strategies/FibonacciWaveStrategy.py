@@ -1,7 +1,4 @@
 import backtrader as bt
-import pandas as pd
-# from utils.data_utils import ready_df
-import os
 
 
 class FibonacciOverlay(bt.Indicator):
@@ -23,19 +20,30 @@ class FibonacciOverlay(bt.Indicator):
         fib_100_up=dict(color='black', linestyle='-', linewidth=1),
     )
 
-    params = (('lookback', 200),)
+    params = (
+        ('lookback', 200),
+        ('range_index', None),  # utils.range_index.RangeExtremeIndex of the same chart: O(1) window max/min
+    )
 
     def __init__(self):
         high = self.data.high
         low = self.data.low
         lookback = self.p.lookback
 
-        self.highest = bt.ind.Highest(high, period=lookback)
-        self.lowest = bt.ind.Lowest(low, period=lookback)
+        if self.p.range_index is not None:
+            self.addminperiod(lookback)
+        else:
+            self.highest = bt.ind.Highest(high, period=lookback)
+            self.lowest = bt.ind.Lowest(low, period=lookback)
 
     def next(self):
-        hh = self.highest[0]
-        ll = self.lowest[0]
+        if self.p.range_index is not None:
+            bar = len(self.data)
+            hh = self.p.range_index.max_high(bar - self.p.lookback, bar)
+            ll = self.p.range_index.min_low(bar - self.p.lookback, bar)
+        else:
+            hh = self.highest[0]
+            ll = self.lowest[0]
         rng = hh - ll
 
         if rng == 0:
@@ -55,34 +63,11 @@ class FibonacciOverlay(bt.Indicator):
         self.lines.fib_100_up[0] = ll
 
 
-def ready_df(df_input, mcap=False):  # Renamed df to df_input to avoid conflict with local variable
-    print("Preparing dataframe with size ", len(df_input))
-    df_input["timestamp"] = df_input["time"]  # Assuming original 'time' is the ms timestamp
-    df_input['time'] = pd.to_datetime(df_input['timestamp'], unit='ms')
-
-    # Ensure your column names exactly match what Backtrader expects or map them.
-    # Backtrader expects 'datetime', 'open', 'high', 'low', 'close', 'volume' by default.
-    # If your original CSV columns are different, you'd map them here.
-    # For example, if your original CSV has 'price_open', rename it to 'open'.
-
-    # Your current scaling:
-    if mcap:
-        for c in ["open", "high", "low", "close"]:
-            df_input[c] = df_input[c] * 1_000_000_000
-
-    # Add color column (not directly used by Backtrader data feed, but fine to keep in DF)
-    df_input['color'] = df_input.apply(lambda row: 'green' if row['close'] > row['open'] else 'red', axis=1)
-
-    # Crucially, rename the 'time' column to 'datetime' as Backtrader expects 'datetime'
-    df_input = df_input.rename(columns={'time': 'datetime'})
-
-    return df_input
-
-
 class FibonacciWaveStrategy(bt.Strategy):
     params = (
         ('lookback_period', 200),  # Period to find the last significant high/low
         ('fib_levels', [0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0]),
+        ('range_index', None),  # utils.range_index.RangeExtremeIndex of the same chart: O(1) window max/min
     )
 
     # Define lines for plotting Fibonacci levels and swing points
@@ -122,9 +107,10 @@ class FibonacciWaveStrategy(bt.Strategy):
         self.datalow = self.datas[0].low
 
         # To find the "last high" and "last low" within a lookback period
-        self.last_high_indicator = bt.indicators.Highest(self.datahigh, period=self.p.lookback_period)
-        self.last_low_indicator = bt.indicators.Lowest(self.datalow, period=self.p.lookback_period)
-        self.fib_overlay = FibonacciOverlay(self.data)
+        if self.p.range_index is None:
+            self.last_high_indicator = bt.indicators.Highest(self.datahigh, period=self.p.lookback_period)
+            self.last_low_indicator = bt.indicators.Lowest(self.datalow, period=self.p.lookback_period)
+        self.fib_overlay = FibonacciOverlay(self.data, range_index=self.p.range_index)
 
         # Map fib_levels to our defined lines for easy assignment
         self.fib_line_map_up = {
@@ -150,8 +136,13 @@ class FibonacciWaveStrategy(bt.Strategy):
             return
 
         # Get the current highest high and lowest low from the indicators
-        current_highest_high = self.last_high_indicator[0]
-        current_lowest_low = self.last_low_indicator[0]
+        if self.p.range_index is not None:
+            bar = len(self.data)
+            current_highest_high = self.p.range_index.max_high(bar - self.p.lookback_period, bar)
+            current_lowest_low = self.p.range_index.min_low(bar - self.p.lookback_period, bar)
+        else:
+            current_highest_high = self.last_high_indicator[0]
+            current_lowest_low = self.last_low_indicator[0]
 
         # Assign these values to our plotting lines
         self.l.last_high_line[0] = current_highest_high
@@ -209,8 +200,12 @@ class FibonacciWaveStrategy(bt.Strategy):
         print(f'{dt.isoformat()}, {txt}')
 
 
-# Example usage (setting up cerebro and running the backtest)
-if __name__ == '__main__':
+def main():
+    """Example usage (setting up cerebro and running the backtest)."""
+    import os
+    import pandas as pd
+    from utils.data_utils import ready_df
+
     cerebro = bt.Cerebro()
     cerebro.addstrategy(FibonacciWaveStrategy)
 
@@ -266,3 +261,7 @@ if __name__ == '__main__':
         numfigs=1,  # Ensures all data is on one figure if you add more data feeds
         figsize=(12, 8),  # Adjust width and height for better visibility
     )
+
+
+if __name__ == '__main__':
+    main()
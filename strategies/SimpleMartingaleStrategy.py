@@ -3,6 +3,7 @@ from strategies.Base import BaseTradingStrategy
 
 
 from riskmanagers.ABCRiskManagement import AbstractRiskManagement
+from utils.range_index import narrow_envelope
 
 import backtrader as bt
 
@@ -60,9 +61,10 @@ class MartingaleRiskManagement(AbstractRiskManagement):
         self.dynamic_tp_peak_price = 0.0
 
     def _calculate_trailing_stop_loss_price(self) -> float:
-        if self.strategy.portfolio_total_quantity == 0 or self.strategy.portfolio_highest_price_since_buy == 0:
+        highest_price = self.strategy.highest_price_since_buy()
+        if self.strategy.portfolio_total_quantity == 0 or highest_price == 0:
             return 0.0
-        return self.strategy.portfolio_highest_price_since_buy * (1 - self.strategy.p.trailing_sl_percent)
+        return highest_price * (1 - self.strategy.p.trailing_sl_percent)
 
     def _calculate_take_profit_price(self) -> float:
         if self.strategy.portfolio_total_quantity == 0 or self.strategy.portfolio_avg_buy_price == 0:
@@ -108,6 +110,15 @@ class MartingaleRiskManagement(AbstractRiskManagement):
     def check_and_execute_dynamic_take_profit(self, current_price: float) -> bool:
         return False
 
+    def trigger_envelope(self, current_price: float):
+        if self.strategy.emergency_exit_triggered:
+            return None
+        envelope = (float('-inf'), float('inf'), None)
+        if self.strategy.getposition(self.strategy.datas[0]).size > 0:
+            envelope = narrow_envelope(envelope, current_price, band_hi=self._calculate_stop_loss_price())
+            envelope = narrow_envelope(envelope, current_price, band_lo=self._calculate_take_profit_price())
+        return envelope
+
     def check_and_execute_trailing_stop_loss(self, current_price: float) -> bool:
         return False
 
@@ -154,6 +165,15 @@ class SimpleMartingaleStrategy(BaseTradingStrategy):
             self.log(f"Next Martingale buy trigger price set to "
                      f"{self._format_value_for_log_mcap(self.martingale_buy_trigger_price)}")
 
+    def trigger_envelope(self):
+        envelope = (float('-inf'), float('inf'), None)
+        if self.getposition(self.datas[0]).size == 0:
+            # Rule 1 only depends on the RSI
+            return envelope[0], envelope[1], self._next_bar_where(self.rsi.lines[0], lambda rsi: rsi < 40)
+        if self.martingale_buy_count < self.p.max_martingales:
+            return narrow_envelope(envelope, self.current_price, band_hi=self.martingale_buy_trigger_price)
+        return envelope
+
     def _execute_trading_logic(self):
         """
         This is the core of the strategy, implementing the buy and sell logic.
@@ -1,4 +1,4 @@
-from riskmanagers import NoneRiskManagement
+from riskmanagers.NoneRiskManagement import NoneRiskManagement
 from strategies.Base import BaseTradingStrategy
 
 
@@ -23,6 +23,9 @@ class _20_100(BaseTradingStrategy):
         self.selled = False
         self.bought = False
 
+    def is_finished(self):
+        return super().is_finished() or (self.done and not self.order and self.getposition(self.datas[0]).size == 0)
+
     def _execute_trading_logic(self):
         """
         This is the core of the strategy, implementing the buy and sell logic.
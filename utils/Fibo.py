@@ -4,7 +4,7 @@
 # [0.001, 0.001, 0.002, 0.003, 0.005, 0.008, 0.013, 0.021, 0.027, 0.034, 0.034, 0.044, 0.056, 0.056, 0.071, 0.09, 0.09,
 # 0.115, 0.146, 0.146, 0.186,
 
-from numpy import sqrt
+from math import sqrt
 Fibonacci_Levels = [0.013, 0.021, 0.027, 0.034, 0.044, 0.056, 0.071, 0.09, 0.115, 0.146, 0.236, 0.382, 0.500, 0.618, 0.786, 1.000, 1.272, 1.382, 1.500, 1.618, 2, 2.618, 3.33, 4.236]
 Fibonacci_Retracement = [0.146, 0.236, 0.382, 0.500, 0.618, 0.786]
 Fibonacci_Extension = [1.000, 1.272, 1.382, 1.500, 1.618, 2, 2.618, 3.33, 4.236]
@@ -19,14 +19,24 @@ def fibos():
     return f
 
 
-fs = fibos()
-print(fs)
-fs.reverse()
-print(fs)
-r = []
-for i in (fs):
-    r.append(round(fs[15] / i, 3))
-    r.append(round(sqrt(fs[15] / i), 3))
-r.sort()
-print(r)
-[0.115, 0.146, 0.186, 0.236, 0.3, 0.382, 0.618, 0.786, 1.0, 1.272, 1.618, 2.058, 2.618, 3.33, 4.236, 4.236, 5.388, 6.854, 6.854, 8.719, 11.089, 11.09, 14.11, 17.934, 17.944, 22.861, 28.917, 29.035, 37.332, 45.722, 46.978, 64.661, 64.661, 76.018, 122.971, 199.095, 321.615, 522.625, 836.2, 1393.667, 2090.5, 4181.0, 4181.0]
+# fibo_ratios() ->
+# [0.115, 0.146, 0.186, 0.236, 0.3, 0.382, 0.618, 0.786, 1.0, 1.272, 1.618, 2.058, 2.618, 3.33, 4.236, 4.236, 5.388, 6.854, 6.854, 8.719, 11.089, 11.09, 14.11, 17.934, 17.944, 22.861, 28.917, 29.035, 37.332, 45.722, 46.978, 64.661, 64.661, 76.018, 122.971, 199.095, 321.615, 522.625, 836.2, 1393.667, 2090.5, 4181.0, 4181.0]
+def fibo_ratios(anchor=15):
+    """
+    Ratios (and their square roots) of the anchor Fibonacci number to every other one, sorted.
+    """
+    fs = fibos()
+    fs.reverse()
+    r = []
+    for i in (fs):
+        r.append(round(fs[anchor] / i, 3))
+        r.append(round(sqrt(fs[anchor] / i), 3))
+    r.sort()
+    return r
+
+
+if __name__ == "__main__":
+    fs = fibos()
+    print(fs)
+    print(list(reversed(fs)))
+    print(fibo_ratios())
@@ -0,0 +1,174 @@
+import collections.abc
+import datetime
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else repr(value)
+
+
+def _write_atomic(path, text):
+    """Replaces path with text in one step (a crash leaves either the old or the new file)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointHistories(collections.abc.Mapping):
+    """
+    Read-only {name: cash history} mapping over the histories of a RunCheckpoint, reading each parquet
+    file when it is accessed, so iterating over a large run keeps one history in memory at a time.
+    """
+
+    def __init__(self, checkpoint, keys):
+        """
+        Args:
+            checkpoint (RunCheckpoint): The checkpoint holding the histories.
+            keys (dict): {name: checkpoint key} of the completed keys, in iteration order.
+        """
+        self.checkpoint = checkpoint
+        self.keys_by_name = dict(keys)
+
+    def __getitem__(self, name):
+        return self.checkpoint.history(self.keys_by_name[name])
+
+    def __iter__(self):
+        return iter(self.keys_by_name)
+
+    def __len__(self):
+        return len(self.keys_by_name)
+
+
+class RunCheckpoint:
+    """
+    Durable progress of a batch run in a folder:
+
+    - results.jsonl: append-only journal, one line per finished or failed key, fsynced as it is written.
+    - histories/<key>.parquet: the cash history of every finished key.
+    - manifest.json: run config, completed keys and failure counts, rewritten atomically after each key.
+
+    A run restarted on the same folder with resume=True skips the completed keys and retries failed
+    ones until they failed max_retries times.
+    """
+
+    def __init__(self, run_dir, config=None, resume=False, max_retries=2):
+        """
+        Args:
+            run_dir (str): Checkpoint folder (created if missing).
+            config (dict): Run configuration. Resuming with a different config raises ValueError.
+            resume (bool): Continue the run in run_dir (False = start over, clearing the folder's progress).
+            max_retries (int): Attempts of a failing key across resumes before it is skipped.
+        """
+        self.run_dir = run_dir
+        self.max_retries = max_retries
+        self.journal_path = os.path.join(run_dir, 'results.jsonl')
+        self.manifest_path = os.path.join(run_dir, 'manifest.json')
+        self.history_dir = os.path.join(run_dir, 'histories')
+        os.makedirs(self.history_dir, exist_ok=True)
+        config_hash = hashlib.sha256(json.dumps(config or {}, sort_keys=True, default=repr).encode()).hexdigest()[:16]
+
+        if resume and os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            if self.manifest['config_hash'] != config_hash:
+                raise ValueError(f"Checkpoint in {run_dir} was written by another run configuration.")
+            self._repair_journal()
+            print(f"[RUN] Resuming {run_dir}: {len(self.manifest['completed'])} done, "
+                  f"{len(self.manifest['failures'])} failed before")
+        else:
+            self.manifest = {'config_hash': config_hash, 'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+                             'completed': [], 'failures': {}}
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=1))
+        self._completed = set(self.manifest['completed'])
+
+    def _repair_journal(self):
+        """Drops a last line cut by a crash, so the next appended line starts on its own line."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    def is_completed(self, key):
+        return key in self._completed
+
+    def should_run(self, key):
+        """False for completed keys and for keys that already failed max_retries times."""
+        return key not in self._completed and self.manifest['failures'].get(key, 0) < self.max_retries
+
+    def _append(self, entry):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, default=_json_default) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _history_path(self, key):
+        return os.path.join(self.history_dir, f"{key}.parquet")
+
+    def record_result(self, key, analysis_result, history=None):
+        """Journals a finished key (and stores its cash history), then marks it completed."""
+        if history is not None:
+            history.rename('value').to_frame().to_parquet(self._history_path(key))
+        self._append({'key': key, 'status': 'ok', 'result': analysis_result})
+        self._completed.add(key)
+        self.manifest['completed'].append(key)
+        self.manifest['failures'].pop(key, None)
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=1))
+
+    def record_failure(self, key, error):
+        """Journals a failed attempt of key."""
+        attempts = self.manifest['failures'].get(key, 0) + 1
+        self._append({'key': key, 'status': 'error', 'error': repr(error), 'attempt': attempts})
+        self.manifest['failures'][key] = attempts
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=1))
+        print(f"[RUN] {key} failed (attempt {attempts}/{self.max_retries}): {error!r}")
+
+    def results(self, keys=None):
+        """
+        Latest successful result of every completed key, from the journal.
+
+        Args:
+            keys (list): Keys in the wanted row order (None = journal order).
+
+        Returns:
+            pd.DataFrame: One row per completed key.
+        """
+        latest = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):  # line cut by a crash
+                        break
+                    entry = json.loads(line)
+                    if entry['status'] == 'ok':
+                        latest[entry['key']] = entry['result']
+        keys = latest.keys() if keys is None else [k for k in keys if k in latest]
+        return pd.DataFrame([latest[k] for k in keys])
+
+    def history(self, key):
+        """Stored cash history of a completed key, None if there is none."""
+        path = self._history_path(key)
+        return pd.read_parquet(path)['value'].rename(None) if os.path.exists(path) else None
+
+    def histories(self, keys):
+        """
+        Lazy mapping of the stored cash histories (see CheckpointHistories).
+
+        Args:
+            keys (dict): {name: key} to expose, keys that did not complete are left out.
+        """
+        return CheckpointHistories(self, {name: key for name, key in keys.items() if self.is_completed(key)})
+
+    def failures(self):
+        """{key: failed attempts} of the keys that did not complete."""
+        return dict(self.manifest['failures'])
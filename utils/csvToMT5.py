@@ -1,9 +1,7 @@
 import os
-from matplotlib import patches, pyplot as plt
 import pandas as pd
 
-from data_utils import ready_df
-import matplotlib.dates as mdates
+from utils.data_utils import ready_df
 
 
 def create_test():
@@ -161,6 +159,9 @@ def resample_to_higher_tf(df, tf='15T'):
 # It assumes you're passing in the *original* dataframe (or a slice of it)
 # and a 'trades' DataFrame you've prepared (e.g., from analyze_trades or a custom process).
 def plot_candles_with_trades_custom(df, only_around_trades=True, margin=60, drop_before=None, drop_after=None, title="Candlestick Chart with Trades"):
+    import matplotlib.dates as mdates
+    from matplotlib import patches, pyplot as plt
+
     fig, ax = plt.subplots(figsize=(18, 9))
     # width for 1s interval (in days), adjusted for better visual density
     width = 0.7 / (24 * 60 * 60)  # width for 1 second in matplotlib's date format
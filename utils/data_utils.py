@@ -1,8 +1,19 @@
 
 # --- Your DataFrame Preparation Function ---
+import numpy as np
 import pandas as pd
 
 
+def read_chart(path):
+    """
+    Reads a raw chart file in the axiom schema (time, open, high, low, close, volume).
+    CSV is the archive format; Parquet is accepted for generated / converted charts.
+    """
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
 def ready_df(df_input, mcap=False):  # Renamed df to df_input to avoid conflict with local variable
     print("Preparing dataframe with size ", len(df_input))
     df_input["timestamp"] = df_input["time"]  # Assuming original 'time' is the ms timestamp
@@ -25,3 +36,23 @@ def ready_df(df_input, mcap=False):  # Renamed df to df_input to avoid conflict
     df_input = df_input.rename(columns={'time': 'datetime'})
 
     return df_input
+
+
+def find_migration_bar(df, migration_market_cap=70_000, data_in_market_cap=False):
+    """
+    Position of the first bar whose close is above migration_market_cap, i.e. the bar where
+    BaseTradingStrategy.catch_migration fires.
+
+    Args:
+        df (pd.DataFrame): ready_df output.
+        migration_market_cap (float): Migration threshold in market cap.
+        data_in_market_cap (bool): Prices in df are already market caps (ready_df(mcap=True)).
+
+    Returns:
+        int: Bar position, or None when the chart never migrates.
+    """
+    close = df['close'].to_numpy(dtype=float)
+    if not data_in_market_cap:
+        close = close * 1_000_000_000
+    crossed = np.flatnonzero(close > migration_market_cap)
+    return int(crossed[0]) if len(crossed) else None
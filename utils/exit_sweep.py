@@ -0,0 +1,198 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from commissions.CustomSolanaCommission import CustomSolanaCommission
+
+
+def entries_from_orders(orders):
+    """
+    Turns the executed orders recorded by TradeListAnalyzer (.orders) into sweep entries, one per
+    round trip, at the bar, fill price and size of its buy.
+
+    The sweep holds one fixed entry until an exit fires. A round trip with several buys (a strategy
+    averaging down, e.g. SimpleMartingaleStrategy with MartingaleSizer) moves its average price and
+    its TP/SL levels with every buy, which the sweep can't model.
+
+    Args:
+        orders (list): (bar, signed size, price, commission, cash after the fill) tuples.
+
+    Returns:
+        tuple: (entry bars, entry prices, sizes) as numpy arrays.
+
+    Raises:
+        ValueError: When a round trip has more than one buy.
+    """
+    bars, prices, sizes = [], [], []
+    position = 0.0
+    buys = 0
+    for bar, size, price, _, _ in orders:
+        if size > 0:
+            if buys:
+                raise ValueError(f"Round trip opened at bar {bars[-1]} buys again at bar {bar}: "
+                                 f"exit_sweep only models single-entry round trips.")
+            bars.append(bar)
+            prices.append(price)
+            sizes.append(size)
+            buys = 1
+        position += size
+        if position <= 1e-12 * abs(size):
+            position = 0.0
+            buys = 0
+    return np.array(bars, dtype=np.int64), np.array(prices, dtype=float), np.array(sizes, dtype=float)
+
+
+def _first_true(mask):
+    """Index of the first True of a boolean array, len(mask) when there is none."""
+    idx = int(np.argmax(mask))
+    return idx if mask[idx] else len(mask)
+
+
+def _levels(entry_price, values, sign):
+    """Threshold prices entry_price * (1 + sign * v) for every grid value (None disables the rule)."""
+    disabled = np.inf if sign > 0 else -np.inf
+    return np.array([disabled if v is None else entry_price * (1 + sign * v) for v in values], dtype=float)
+
+
+def exit_sweep(df, entries, tp_values, sl_values=(None,), trailing_sl_values=(None,),
+               trailing_sl_activation_profit_percent=0.01, trailing_every_bar=False, dead_coin_price=None,
+               intrabar=False, commission=None, mcap=False):
+    """
+    Evaluates a whole grid of exit settings for fixed entries in one pass over the chart,
+    instead of one Cerebro run per combination.
+
+    Follows the exit flow of BaseTradingStrategy/BaseRiskManagement: exits are checked on the
+    close of every bar from the entry bar on, a triggered exit fills at the next bar's open, and a
+    position still open two bars before the end is closed at the open of the last bar.
+    Per entry, the first TP/SL crossing of every grid value comes from a searchsorted on the running
+    max/min of the window, so the TP and SL grids are solved independently and combined by broadcasting.
+
+    Entries are taken as fixed (same bar, price and size in every combination). In the real run an
+    earlier or later exit can move the next entry or its size, so the sweep is meant for ranking exit
+    settings, with the best ones confirmed by a normal backtest.
+
+    Args:
+        df (pd.DataFrame): The chart the entries came from (ready_df output, same slice as the run).
+        entries (tuple): (entry bars, entry prices, sizes) of single-entry round trips, see entries_from_orders.
+        tp_values (list): tp_percent values (None = no take profit).
+        sl_values (list): sl_percent values (None = no stop loss).
+        trailing_sl_values (list): trailing_sl_percent values (None = no trailing stop).
+        trailing_sl_activation_profit_percent (float): Profit needed before the trailing stop is armed.
+        trailing_every_bar (bool): Same as the strategy param: trail the highest close of every bar
+                                   since the entry. False (the strategy's default) trails the close
+                                   sampled at the buy's order notification, i.e. of the entry bar.
+        dead_coin_price (float): Exit when the close drops below this price (the strategy's dead coin exit).
+        intrabar (bool): Trigger TP/SL on the bar's high/low and fill at the level (or at the open
+                         when the bar gapped through it) instead of close + next open.
+        commission (CustomSolanaCommission): Fee model (default: CustomSolanaCommission()).
+        mcap (bool): PnL is reported divided by 1e9, like the runner in MCAP mode.
+
+    Returns:
+        pd.DataFrame: One row per combination with tp_percent, sl_percent, trailing_sl_percent,
+                      pnl (net of fees), trades, winning_trades, losing_trades, avg_bars_held.
+    """
+    commission = commission or CustomSolanaCommission()
+    open_ = df['open'].to_numpy(dtype=float)
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+    n = len(close)
+    last_check = n - 3  # Base.next closes everything on bar n - 2, risk checks run up to n - 3
+
+    tp_values, sl_values, trailing_values = list(tp_values), list(sl_values), list(trailing_sl_values)
+    shape = (len(tp_values), len(sl_values), len(trailing_values))
+    total_pnl = np.zeros(shape)
+    wins = np.zeros(shape, dtype=np.int64)
+    bars_held = np.zeros(shape, dtype=np.int64)
+
+    entry_bars, entry_prices, sizes = entries
+    for bar, price, size in zip(entry_bars, entry_prices, sizes):
+        window = slice(bar, max(bar, last_check + 1))
+        closes = close[window]
+        m = len(closes)
+
+        tp_levels = _levels(price, tp_values, 1)
+        sl_levels = _levels(price, sl_values, -1)
+        run_max = np.maximum.accumulate(high[window] if intrabar else closes) if m else closes
+        run_min = np.minimum.accumulate(low[window] if intrabar else closes) if m else closes
+        tp_k = np.searchsorted(run_max, tp_levels, side='left')
+        sl_k = np.searchsorted(-run_min, -sl_levels, side='left')
+
+        if trailing_every_bar:
+            highest_close = np.maximum.accumulate(closes) if m else closes
+        else:  # no order notification while the single-entry position is held
+            highest_close = np.full(m, closes[0]) if m else closes
+        armed = closes >= price * (1 + trailing_sl_activation_profit_percent)
+        tr_k = np.array([m if t is None else _first_true(armed & (closes <= highest_close * (1 - t))) if m else 0
+                         for t in trailing_values], dtype=np.int64)
+        dead_k = _first_true(closes < dead_coin_price) if (dead_coin_price is not None and m) else m
+
+        tp_k3 = tp_k[:, None, None]
+        sl_k3 = sl_k[None, :, None]
+        tr_k3 = tr_k[None, None, :]
+        k = np.minimum(np.minimum(tp_k3, sl_k3), np.minimum(tr_k3, dead_k))
+        k = np.broadcast_to(k, shape)
+
+        # Close trigger: fill at the next open (k == m is the forced exit at the last bar's open)
+        exit_bar = np.minimum(bar + k + 1, n - 1)
+        exit_price = open_[exit_bar]
+        if intrabar:
+            # SL has priority over TP on the same bar, both fill on the crossing bar itself
+            crossing_bar = np.minimum(bar + k, n - 1)
+            sl_hit = np.broadcast_to((sl_k3 == k) & (sl_k3 < m), shape)
+            tp_hit = np.broadcast_to((tp_k3 == k) & (tp_k3 < m), shape) & ~sl_hit
+            sl_fill = np.minimum(np.broadcast_to(sl_levels[None, :, None], shape), open_[crossing_bar])
+            tp_fill = np.maximum(np.broadcast_to(tp_levels[:, None, None], shape), open_[crossing_bar])
+            exit_price = np.where(sl_hit, sl_fill, np.where(tp_hit, tp_fill, exit_price))
+            exit_bar = np.where(sl_hit | tp_hit, crossing_bar, exit_bar)
+
+        pnl = size * (exit_price - price) \
+            - commission.getcommission_array(size, price) \
+            - commission.getcommission_array(size, exit_price)
+        total_pnl += pnl
+        wins += pnl > 0
+        bars_held += exit_bar - bar
+
+    trades = len(entry_bars)
+    if mcap:
+        total_pnl = total_pnl / 1_000_000_000
+    rows = []
+    for (i, tp), (j, sl), (r, tr) in itertools.product(enumerate(tp_values), enumerate(sl_values), enumerate(trailing_values)):
+        rows.append({
+            'tp_percent': tp,
+            'sl_percent': sl,
+            'trailing_sl_percent': tr,
+            'pnl': total_pnl[i, j, r],
+            'trades': trades,
+            'winning_trades': int(wins[i, j, r]),
+            'losing_trades': trades - int(wins[i, j, r]),
+            'avg_bars_held': bars_held[i, j, r] / trades if trades else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+def exit_sweep_from_cerebro(cerebro, tp_values, sl_values=(None,), mcap=False, **kwargs):
+    """
+    Runs exit_sweep on the chart and the entries of a finished run (one of run_all's cerebros), with
+    the run's dead coin threshold and trailing_every_bar unless given. Runs with round trips of
+    several buys raise ValueError (see entries_from_orders).
+
+    Args:
+        cerebro (bt.Cerebro): A cerebro returned by run_backtest_for_df / run_all.
+        tp_values, sl_values: Grids forwarded to exit_sweep.
+        mcap (bool): Same mcap flag the run used.
+        **kwargs: Any other exit_sweep argument.
+
+    Returns:
+        pd.DataFrame: See exit_sweep.
+    """
+    strategy = cerebro.runstrats[0][0]
+    df = cerebro.datas[0].p.dataname
+    if 'dead_coin_price' not in kwargs and hasattr(strategy.p, 'dead_coin_market_cap'):
+        dead = strategy.p.dead_coin_market_cap
+        kwargs['dead_coin_price'] = dead if strategy.p.data_in_market_cap else dead / 1_000_000_000
+    if 'trailing_every_bar' not in kwargs and hasattr(strategy.p, 'trailing_every_bar'):
+        kwargs['trailing_every_bar'] = strategy.p.trailing_every_bar
+    entries = entries_from_orders(strategy.analyzers.mytrades.orders)
+    return exit_sweep(df, entries, tp_values, sl_values, mcap=mcap, **kwargs)
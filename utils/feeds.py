@@ -0,0 +1,209 @@
+import array
+import math
+
+import backtrader as bt
+import numpy as np
+
+# Same constant as backtrader: datetime.date(1970, 1, 1).toordinal()
+EPOCH_ORDINAL = 719163
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _two_sum(a, b):
+    """Error-free addition: a + b == s + err exactly."""
+    s = a + b
+    bb = s - a
+    return s, (a - (s - bb)) + (b - bb)
+
+
+def date2num_ms(timestamps):
+    """
+    Vectorized bt.date2num for int64 millisecond timestamps (naive UTC).
+
+    bt.date2num adds the ordinal, hours, minutes, seconds and microseconds fractions with math.fsum,
+    the same terms are summed here with compensated (two-sum) additions so the result is the same
+    float, and so num2date gives back the same datetimes as a PandasData feed.
+    """
+    ms = np.asarray(timestamps, dtype=np.int64)
+    days = ms // 86_400_000
+    rem = ms - days * 86_400_000
+    terms = ((rem // 3_600_000) / 24.0,
+             ((rem // 60_000) % 60) / 1440.0,
+             ((rem // 1000) % 60) / 86400.0,
+             ((rem % 1000) * 1000) / 86400000000.0)
+    total = (days + EPOCH_ORDINAL).astype(np.float64)
+    error = np.zeros_like(total)
+    for term in terms:
+        total, err = _two_sum(total, term)
+        error += err
+    return total + error
+
+
+def num2date_array(values):
+    """
+    Vectorized bt.num2date (naive, no tz): same float steps and rounding compensations.
+
+    Returns:
+        np.ndarray: datetime64[us] array.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    days = np.floor(x)
+    hour, remainder = np.divmod(24.0 * (x - days), 1)
+    minute, remainder = np.divmod(60.0 * remainder, 1)
+    second, remainder = np.divmod(60.0 * remainder, 1)
+    microsecond = (1e6 * remainder).astype(np.int64)
+    microsecond[microsecond < 10] = 0
+    seconds = (days.astype(np.int64) - EPOCH_ORDINAL) * 86400 \
+        + hour.astype(np.int64) * 3600 + minute.astype(np.int64) * 60 + second.astype(np.int64)
+    us = seconds * 1_000_000 + microsecond
+    us = np.where(microsecond > 999990, us + (1_000_000 - microsecond), us)
+    return us.astype('datetime64[us]')
+
+
+class NumpyData(bt.feed.DataBase):
+    """
+    Data feed over numpy arrays: int64 ms timestamps and float64 OHLCV columns.
+
+    The datetimes are converted for the whole array at construction (date2num_ms) and preload()
+    fills every line with one bulk copy instead of loading bar by bar like PandasData.
+    The arrays are only referenced, so a feed can be built without copying from the parquet
+    columns or from shared memory (see share_arrays / attach_arrays). With filters or tzinput it
+    falls back to the regular bar by bar loading.
+    """
+    params = (
+        ('timestamps', None),  # int64 ms since epoch
+        ('open', None),
+        ('high', None),
+        ('low', None),
+        ('close', None),
+        ('volume', None),
+        ('openinterest', None),  # optional
+        ('datetimes', None),  # optional date2num_ms(timestamps), to reuse the conversion across feeds
+    )
+
+    def __init__(self):
+        self._columns = {
+            'datetime': self.p.datetimes if self.p.datetimes is not None else date2num_ms(self.p.timestamps),
+            'open': self.p.open,
+            'high': self.p.high,
+            'low': self.p.low,
+            'close': self.p.close,
+            'volume': self.p.volume,
+            'openinterest': self.p.openinterest,
+        }
+        self._cursor = -1
+
+    @classmethod
+    def from_df(cls, df, **kwargs):
+        """
+        Builds the feed from a ready_df DataFrame ('datetime' or ms 'timestamp' column and OHLCV columns).
+        Float64 columns are passed as views of the DataFrame data.
+        """
+        if 'datetime' in df:
+            timestamps = df['datetime'].to_numpy(dtype='datetime64[ms]').view(np.int64)
+        else:
+            timestamps = df['timestamp'].to_numpy(dtype=np.int64)
+        columns = {c: df[c].to_numpy(dtype=np.float64) for c in OHLCV_COLUMNS}
+        return cls(timestamps=timestamps, **columns, **kwargs)
+
+    @classmethod
+    def from_arrays(cls, arrays, **kwargs):
+        """
+        Builds the feed from a dict with 'timestamp' (int64 ms) and OHLCV float64 arrays, e.g. attach_arrays
+        or chart_arrays output, and optionally the converted 'datetime' array.
+        """
+        columns = {c: arrays[c] for c in OHLCV_COLUMNS}
+        return cls(timestamps=arrays['timestamp'], openinterest=arrays.get('openinterest'),
+                   datetimes=arrays.get('datetime'), **columns, **kwargs)
+
+    def start(self):
+        super().start()
+        self._cursor = -1
+
+    def _bulk_loadable(self):
+        return not self._filters and self._tzinput is None
+
+    def preload(self):
+        if not self._bulk_loadable():
+            return super().preload()
+
+        dt = self._columns['datetime']
+        keep = slice(int(np.searchsorted(dt, self.fromdate, side='left')),
+                     int(np.searchsorted(dt, self.todate, side='right')))
+        size = len(dt[keep])
+        for name in self.getlinealiases():
+            values = self._columns.get(name)
+            line = getattr(self.lines, name)
+            if values is None:
+                line.array.extend(array.array('d', [math.nan]) * size)
+            else:
+                line.array.frombytes(np.ascontiguousarray(values[keep], dtype=np.float64).tobytes())
+        self._cursor = keep.start + size - 1
+        self._last()
+        self.home()
+
+    def _load(self):
+        self._cursor += 1
+        if self._cursor >= len(self._columns['datetime']):
+            return False
+        for name in self.getlinealiases():
+            values = self._columns.get(name)
+            if values is not None:
+                getattr(self.lines, name)[0] = float(values[self._cursor])
+        return True
+
+
+def chart_arrays(df):
+    """
+    The arrays of a ready_df chart for NumpyData.from_arrays, datetimes converted once: feeds built on
+    them for several runs of the same chart share the columns and skip the conversion.
+    """
+    if 'datetime' in df:
+        timestamps = df['datetime'].to_numpy(dtype='datetime64[ms]').view(np.int64)
+    else:
+        timestamps = df['timestamp'].to_numpy(dtype=np.int64)
+    arrays = {c: df[c].to_numpy(dtype=np.float64) for c in OHLCV_COLUMNS}
+    arrays['timestamp'] = timestamps
+    arrays['datetime'] = date2num_ms(timestamps)
+    return arrays
+
+
+def share_arrays(arrays):
+    """
+    Copies a dict of numpy arrays into one shared memory block, so worker processes can attach feeds
+    to the same chart without copying or unpickling it.
+
+    Returns:
+        tuple: (SharedMemory, spec). Keep the SharedMemory alive (close() and unlink() it when done)
+               and pass the picklable spec to attach_arrays in the workers.
+    """
+    from multiprocessing import shared_memory
+
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        values = np.asarray(values)
+        offset = -(-offset // 8) * 8  # keep every column 8-byte aligned
+        layout[name] = (offset, values.dtype.str, len(values))
+        offset += values.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for name, values in arrays.items():
+        start, dtype, length = layout[name]
+        np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=start)[:] = values
+    return shm, {'name': shm.name, 'layout': layout}
+
+
+def attach_arrays(spec):
+    """
+    Attaches to a block created by share_arrays.
+
+    Returns:
+        tuple: (SharedMemory, dict of numpy arrays viewing the shared block). Close the SharedMemory
+               once the arrays (and feeds built on them) are no longer used.
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    arrays = {name: np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=start)
+              for name, (start, dtype, length) in spec['layout'].items()}
+    return shm, arrays
@@ -1,44 +1,53 @@
+
 # fibo = [1,1,2,3,5,8,13,21,34,55,89,144,233,377,610,987,1597,2584,4181]
 # fibo = [0.145, 0.236, 0.382, 0.5, 0.618, 0.786, 0.886]
 # fibo = [0.855, 0.764, 0.618, 0.5, 0.382, 0.214, 0.114]
 # fibo = [0.870, 0.775, 0.618, 0.5, 0.382, 0.225, 0.13]
-import math
 fibo = [1, 0.870, 0.775, 0.618, 0.5, 0.382, 0.225, 0.13]
-loss = {}
-math.sqrt(0.7861297602813418)
-for i in range(1, len(fibo)):
-    first = i - 1
-    second = i
-    r = (1 - fibo[second] / fibo[first])
-    r = round(r, 2)
-    p = round(fibo[first] / fibo[second], 2)
-    print("----")
-    print(f"if price goes from {100*fibo[first]:.2f} to {100*fibo[second]} mCap, then it is", f"{r:.2f}", " loss.")
-    print(f"if price back from {100*fibo[second]:.2f} to {100*fibo[first]} mCap, then it is", f"{p:.2f}", " profit.")
-    loss[f"loss from {fibo[first]} to {fibo[second]}"] = r
-print(loss)
-
-first = 100
-second = 50
-third = 60
-start = 1
-second_buy = 2
-spent = start
-portfolio = spent
-print(f"-------- start with portfolio = {start} and price {first} mcap.")
-portfolio = second / first
-loss = (start - portfolio)
-p = (first / second)
-print(f"-------- price goes from {first} to {second} mCap.")
-print("then it is", f"-{loss*100:.0f}%", f"loss. portfolio now=({portfolio})")
-print(f"now you need", f"{p*100}% for price to be back at {start}. (back from {second} to {first} mCap)")
-portfolio = portfolio + second_buy
-spent = spent + second_buy
-print(f"if you buy again at {second} mcap, amount of {second_buy}, you have {portfolio} at {second} mcap.")
-print(f"-------- price goes from {second} to {third} mCap.")
-c = third / second
-portfolio = portfolio * c
-print("then it is", f" +{(c-1)*100:.0f}%", f"profit. portfolio now=({portfolio})")
+
+
+def fibo_loss_table(fibo=fibo):
+    """
+    Prints the loss when price steps down from one level to the next and the profit needed to get back.
+
+    Returns:
+        dict: {'loss from a to b': loss ratio}
+    """
+    loss = {}
+    for i in range(1, len(fibo)):
+        first = i - 1
+        second = i
+        r = (1 - fibo[second] / fibo[first])
+        r = round(r, 2)
+        p = round(fibo[first] / fibo[second], 2)
+        print("----")
+        print(f"if price goes from {100*fibo[first]:.2f} to {100*fibo[second]} mCap, then it is", f"{r:.2f}", " loss.")
+        print(f"if price back from {100*fibo[second]:.2f} to {100*fibo[first]} mCap, then it is", f"{p:.2f}", " profit.")
+        loss[f"loss from {fibo[first]} to {fibo[second]}"] = r
+    return loss
+
+
+def martingale_example(first=100, second=50, third=60, start=1, second_buy=2):
+    """
+    Walks through one averaging-down buy: price drops from first to second, we buy again, price recovers to third.
+    """
+    spent = start
+    portfolio = spent
+    print(f"-------- start with portfolio = {start} and price {first} mcap.")
+    portfolio = second / first
+    loss = (start - portfolio)
+    p = (first / second)
+    print(f"-------- price goes from {first} to {second} mCap.")
+    print("then it is", f"-{loss*100:.0f}%", f"loss. portfolio now=({portfolio})")
+    print(f"now you need", f"{p*100}% for price to be back at {start}. (back from {second} to {first} mCap)")
+    portfolio = portfolio + second_buy
+    spent = spent + second_buy
+    print(f"if you buy again at {second} mcap, amount of {second_buy}, you have {portfolio} at {second} mcap.")
+    print(f"-------- price goes from {second} to {third} mCap.")
+    c = third / second
+    portfolio = portfolio * c
+    print("then it is", f" +{(c-1)*100:.0f}%", f"profit. portfolio now=({portfolio})")
+    return portfolio, spent
 
 
 def price_go_down(first, second, start=1, new=0.75):
@@ -74,21 +83,28 @@ def price_go_down_up(first, second, third, start=1):
     return to_buy
 
 
-# price_go_down(100,50)
-price_go_down_up(100, 38, 50)
+def fibo_step_table(fibo=fibo):
+    """
+    Prints the loss of every step down the levels and the profit of the way back up.
+    """
+    for i in range(1, len(fibo)):
+        first = i - 1
+        second = i
+        l = (1 - fibo[second] / fibo[first])
+        p = (fibo[first] / fibo[second])
+        l = round(l, 2)
+        print("----")
+        print(f"if price goes from {100*fibo[first]:.2f} to {100*fibo[second]} mCap, then it is", f"-{l:.2f}", f"loss. now=({1-l:.2f})")
+        print(f"if price back from {100*fibo[second]:.2f} to {100*fibo[first]} mCap, then it is", f"{p:.2f}", " profit.")
 
+        # print(f"if price goes from {100*fibo[first]:.2f} to {100*fibo[second]} mCap, then you have to buy "
+        #                     ,f"{ fibo[second]/fibo[first]:.2f}",f" to get back at {100*fibo[first]:.2f}.")
 
-for i in range(1, len(fibo)):
-    first = i - 1
-    second = i
-    l = (1 - fibo[second] / fibo[first])
-    p = (fibo[first] / fibo[second])
-    l = round(l, 2)
-    print("----")
-    print(f"if price goes from {100*fibo[first]:.2f} to {100*fibo[second]} mCap, then it is", f"-{l:.2f}", f"loss. now=({1-l:.2f})")
-    print(f"if price back from {100*fibo[second]:.2f} to {100*fibo[first]} mCap, then it is", f"{p:.2f}", " profit.")
 
-    # print(f"if price goes from {100*fibo[first]:.2f} to {100*fibo[second]} mCap, then you have to buy "
-    #                     ,f"{ fibo[second]/fibo[first]:.2f}",f" to get back at {100*fibo[first]:.2f}.")
-    # loss[f"loss from {fibo[first]} to {fibo[second]}"] = l
-print(loss)
+if __name__ == "__main__":
+    loss = fibo_loss_table()
+    print(loss)
+    martingale_example()
+    # price_go_down(100,50)
+    price_go_down_up(100, 38, 50)
+    fibo_step_table()
@@ -0,0 +1,85 @@
+import array
+
+import backtrader as bt
+import numpy as np
+
+
+class PrecomputedLine(bt.Indicator):
+    """
+    Indicator replaying the values of an indicator already computed over the same preloaded data,
+    with the same minimum period.
+    """
+    lines = ('value',)
+    params = (
+        ('values', None),  # np.ndarray, one value per bar of the data
+        ('minperiod', 1),
+    )
+    plotinfo = dict(plot=False)
+
+    def __init__(self):
+        self.addminperiod(self.p.minperiod)
+
+    def next(self):
+        self.lines.value[0] = self.p.values[len(self) - 1]
+
+    def once(self, start, end):
+        self.lines.value.array[start:end] = array.array('d', self.p.values[start:end])
+
+
+def _data_key(data):
+    """Identity of a preloaded feed: its length and first / last datetimes (None when not preloaded)."""
+    datetimes = data.datetime.array
+    if not len(datetimes):
+        return None
+    return len(datetimes), datetimes[0], datetimes[-1]
+
+
+class IndicatorCache:
+    """
+    Shares indicator computations between the runs of several strategies on the same chart
+    (see utils.runner.run_configs_for_df).
+
+    The first strategy declaring an indicator gets the regular backtrader indicator and the cache
+    keeps a reference to it. Once that run is over, a strategy declaring the same indicator (class,
+    params, source line) on the same chart gets a PrecomputedLine over the values of the first one,
+    so the indicator is computed once per chart instead of once per strategy.
+    """
+
+    def __init__(self):
+        self._pending = {}  # key -> indicator of a run that may still be going on
+        self._values = {}   # key -> (values, minperiod)
+        self.hits = 0
+        self.misses = 0
+
+    def indicator(self, indicator_class, data, line='close', **params):
+        """
+        Declares indicator_class(getattr(data, line), **params) in the strategy being initialized.
+
+        Args:
+            indicator_class (type): Backtrader indicator with a single output line (e.g. bt.indicators.RSI_Safe).
+            data: The strategy's data feed.
+            line (str): Source line of the feed.
+            **params: Indicator params.
+
+        Returns:
+            The indicator, or a PrecomputedLine with its values.
+        """
+        data_key = _data_key(data)
+        source = getattr(data, line)
+        if data_key is None:  # not preloaded, nothing to match the values to
+            return indicator_class(source, **params)
+        key = (indicator_class, tuple(sorted(params.items())), line, data_key)
+        if key not in self._values and key in self._pending:
+            computed = self._pending[key]
+            values = computed.lines[0].array
+            if len(values) == data_key[0]:  # the run computed every bar (once / runonce mode)
+                self._values[key] = (np.frombuffer(values, dtype=np.float64).copy(), computed._minperiod)
+                del self._pending[key]
+        if key in self._values:
+            self.hits += 1
+            values, minperiod = self._values[key]
+            return PrecomputedLine(source, values=values, minperiod=minperiod)
+        self.misses += 1
+        indicator = indicator_class(source, **params)
+        self._pending[key] = indicator
+        return indicator
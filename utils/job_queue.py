@@ -0,0 +1,280 @@
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import socket
+import threading
+import time
+
+import pandas as pd
+
+from commissions.CustomSolanaCommission import CustomSolanaCommission
+from utils.manifest import build_manifest
+from utils.scheduler import _run_task, plan_tasks
+
+
+QUEUE_FOLDERS = ('pending', 'claimed', 'done', 'failed', 'results')
+
+
+def _write_atomic(path, data):
+    """Writes bytes to path through a temporary file in the same folder and a rename."""
+    tmp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JobQueue:
+    """
+    Job queue in a shared folder, no server: every state change is a rename, which is atomic on one
+    filesystem (local disk, NFS or SMB share), so workers on several machines can share a sweep.
+
+    - pending/<job>.json: jobs waiting. A worker claims one by renaming it to claimed/<job>@<worker>.json,
+      only one rename of a file can succeed.
+    - claimed/: the claim is a lease, kept alive by touching the file (heartbeat). A claim whose file
+      was not touched for lease_seconds is renamed back to pending/ by any worker (the node died).
+    - results/<job>.pkl, then done/<job>.json: finished jobs. failed/<job>.json: jobs that raised.
+
+    Lease ages are measured against the mtime of a file touched on the share, so the machines'
+    clocks don't have to agree.
+    """
+
+    def __init__(self, queue_dir, lease_seconds=60):
+        """
+        Args:
+            queue_dir (str): Shared queue folder (created if missing).
+            lease_seconds (float): Age after which a claim without heartbeat is given back.
+        """
+        self.queue_dir = queue_dir
+        self.lease_seconds = lease_seconds
+        for folder in QUEUE_FOLDERS:
+            os.makedirs(os.path.join(queue_dir, folder), exist_ok=True)
+
+    def _dir(self, folder):
+        return os.path.join(self.queue_dir, folder)
+
+    def _fs_now(self):
+        """Current time of the filesystem holding the queue."""
+        clock = os.path.join(self.queue_dir, f".clock.{socket.gethostname()}")  # shared by the host's workers
+        with open(clock, 'a'):
+            os.utime(clock)
+        return os.stat(clock).st_mtime
+
+    def submit_sweep(self, paths, param_sets, workers=1, manifest_path=None, max_task_cost=None,
+                     df_start_margin=0, df_end_margin=-1, **run_kwargs):
+        """
+        Queues a sweep (every param set on every chart) as tasks of utils.scheduler.plan_tasks, numbered
+        longest first so workers claim the longest jobs first.
+        The chart paths must be readable at the same path from every worker machine.
+
+        Args:
+            paths, param_sets, manifest_path, max_task_cost, df_start_margin, df_end_margin, **run_kwargs:
+                See utils.scheduler.run_sweep.
+            workers (int): Expected total number of workers, used to size the tasks.
+
+        Returns:
+            int: Number of queued jobs.
+        """
+        run_kwargs.setdefault('commission_class', CustomSolanaCommission)
+        manifest = build_manifest(paths, manifest_path)
+        tasks = plan_tasks(manifest, param_sets, workers=workers, max_task_cost=max_task_cost,
+                           trim_pre_migration=run_kwargs.get('trim_pre_migration', False),
+                           warmup_bars=run_kwargs.get('warmup_bars', 300))
+        _write_atomic(os.path.join(self.queue_dir, 'sweep.pkl'), pickle.dumps({
+            'paths': list(manifest), 'param_sets': param_sets, 'margins': (df_start_margin, df_end_margin),
+            'run_kwargs': run_kwargs}))
+        for number, task in enumerate(tasks):
+            job = {'job_id': f"{number:06d}", 'path': task['path'], 'configs': task['configs'], 'cost': task['cost']}
+            _write_atomic(os.path.join(self._dir('pending'), f"{job['job_id']}.json"), json.dumps(job).encode())
+        print(f"[RUN] Queued {len(tasks)} jobs in {self.queue_dir}")
+        return len(tasks)
+
+    def sweep(self):
+        """The sweep definition written by submit_sweep."""
+        with open(os.path.join(self.queue_dir, 'sweep.pkl'), 'rb') as f:
+            return pickle.load(f)
+
+    def claim(self, worker_id):
+        """
+        Claims the first pending job.
+
+        Returns:
+            dict: The job (with its 'lease' path), or None when nothing is pending.
+        """
+        for name in sorted(os.listdir(self._dir('pending'))):
+            if not name.endswith('.json'):
+                continue
+            pending = os.path.join(self._dir('pending'), name)
+            lease = os.path.join(self._dir('claimed'), f"{name[:-5]}@{worker_id}.json")
+            try:
+                # The rename keeps the mtime: the lease must start now, not when the job was queued,
+                # or reclaim_stale could give it back right away
+                os.utime(pending)
+                os.rename(pending, lease)
+                with open(lease, 'r', encoding='utf-8') as f:
+                    job = json.load(f)
+            except FileNotFoundError:  # claimed by another worker first, or reclaimed meanwhile
+                continue
+            job['lease'] = lease
+            return job
+        return None
+
+    def heartbeat(self, job):
+        """Renews the lease of a claimed job. Returns False when the lease was lost (reclaimed)."""
+        try:
+            os.utime(job['lease'])
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, job, results):
+        """Stores the results of a job and marks it done."""
+        _write_atomic(os.path.join(self._dir('results'), f"{job['job_id']}.pkl"), pickle.dumps(results))
+        self._finish(job, 'done')
+
+    def fail(self, job, error):
+        """Marks a job failed with its error."""
+        _write_atomic(os.path.join(self._dir('failed'), f"{job['job_id']}.error"), repr(error).encode())
+        self._finish(job, 'failed')
+
+    def _finish(self, job, folder):
+        try:
+            os.rename(job['lease'], os.path.join(self._dir(folder), f"{job['job_id']}.json"))
+        except FileNotFoundError:
+            # Lease was reclaimed meanwhile, the job will run again and write the same results
+            print(f"[RUN] Lease of job {job['job_id']} was lost before it finished")
+
+    def reclaim_stale(self):
+        """
+        Gives the jobs whose lease expired back to pending.
+
+        Returns:
+            int: Number of reclaimed jobs.
+        """
+        now = self._fs_now()
+        reclaimed = 0
+        for name in os.listdir(self._dir('claimed')):
+            lease = os.path.join(self._dir('claimed'), name)
+            try:
+                if now - os.stat(lease).st_mtime < self.lease_seconds:
+                    continue
+                job_id = name.split('@', 1)[0]
+                os.rename(lease, os.path.join(self._dir('pending'), f"{job_id}.json"))
+            except FileNotFoundError:  # finished or reclaimed by someone else
+                continue
+            reclaimed += 1
+            print(f"[RUN] Reclaimed stale job {name}")
+        return reclaimed
+
+    def status(self):
+        """Number of jobs in every state."""
+        return {folder: sum(name.endswith('.json') for name in os.listdir(self._dir(folder)))
+                for folder in ('pending', 'claimed', 'done', 'failed')}
+
+    def results(self):
+        """
+        Results of the finished jobs, in the same layout as utils.scheduler.run_sweep: one row per
+        (chart, config) in chart then config order, with a 'config' column indexing the param sets.
+        """
+        sweep = self.sweep()
+        results = {}
+        for name in os.listdir(self._dir('results')):
+            if not name.endswith('.pkl'):
+                continue
+            with open(os.path.join(self._dir('results'), name), 'rb') as f:
+                path, task_results, _, _, _ = pickle.load(f)
+            for index, analysis_result in task_results:
+                results[(path, index)] = dict(analysis_result, config=index)
+        ordered = [results[(path, index)] for path in sweep['paths'] for index in range(len(sweep['param_sets']))
+                   if (path, index) in results]
+        return pd.DataFrame(ordered)
+
+
+def _heartbeat_loop(queue, job, stop, interval):
+    while not stop.wait(interval):
+        if not queue.heartbeat(job):
+            return
+
+
+def run_worker(queue_dir, worker_id=None, lease_seconds=60, poll_seconds=1.0, exit_when_idle=True):
+    """
+    Worker loop: reclaims stale leases, claims a job, runs it with a heartbeat thread renewing the
+    lease, writes its results, until the queue is drained.
+
+    Args:
+        queue_dir (str): Shared queue folder.
+        worker_id (str): Name in the leases (default host-pid).
+        lease_seconds (float): Lease length, the heartbeat runs every third of it.
+        poll_seconds (float): Wait between claims while other workers still hold jobs.
+        exit_when_idle (bool): Return once nothing is pending or claimed (False = keep polling).
+
+    Returns:
+        int: Number of jobs this worker ran.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = JobQueue(queue_dir, lease_seconds=lease_seconds)
+    sweep = queue.sweep()
+    ran = 0
+    while True:
+        queue.reclaim_stale()
+        job = queue.claim(worker_id)
+        if job is None:
+            status = queue.status()
+            if exit_when_idle and not status['pending'] and not status['claimed']:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        print(f"[RUN] Worker {worker_id} running job {job['job_id']} ({os.path.basename(job['path'])}, {len(job['configs'])} configs)")
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat_loop, args=(queue, job, stop, lease_seconds / 3), daemon=True)
+        beat.start()
+        try:
+            configs = [(i, sweep['param_sets'][i]) for i in job['configs']]
+            results = _run_task((job['path'], configs, sweep['margins'], sweep['run_kwargs']))
+        except Exception as e:
+            queue.fail(job, e)
+            print(f"[RUN] Job {job['job_id']} failed: {e!r}")
+        else:
+            queue.complete(job, results)
+        finally:
+            stop.set()
+            beat.join()
+        ran += 1
+    print(f"[RUN] Worker {worker_id} done, {ran} jobs")
+    return ran
+
+
+def run_local_workers(queue_dir, workers=2, **worker_kwargs):
+    """
+    Runs workers as separate processes on this machine, standing in for several nodes.
+
+    Returns:
+        dict: Queue status after the workers exited.
+    """
+    processes = [multiprocessing.Process(target=run_worker, args=(queue_dir,),
+                                         kwargs=dict(worker_kwargs, worker_id=f"{socket.gethostname()}-local{i}"))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return JobQueue(queue_dir).status()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Work on a shared backtest job queue (queue a sweep with JobQueue.submit_sweep).")
+    parser.add_argument("queue_dir", help="Shared queue folder.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this machine.")
+    parser.add_argument("--lease", type=float, default=60, help="Lease length in seconds.")
+    parser.add_argument("--keep-polling", action="store_true", help="Keep waiting for new jobs when the queue is empty.")
+    args = parser.parse_args()
+
+    kwargs = dict(lease_seconds=args.lease, exit_when_idle=not args.keep_polling)
+    if args.processes > 1:
+        print(run_local_workers(args.queue_dir, workers=args.processes, **kwargs))
+    else:
+        run_worker(args.queue_dir, **kwargs)
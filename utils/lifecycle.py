@@ -0,0 +1,129 @@
+import numpy as np
+
+from utils.manifest import build_manifest, manifest_df
+
+
+LIFECYCLE_COLUMNS = ('migration_bar', 'post_migration_bars', 'ath_bar', 'peak_market_cap', 'dead_bar', 'alive_bars')
+
+
+def lifecycle_events(high, close, migration_market_cap=70_000, dead_coin_market_cap=8_000):
+    """
+    Key events of a coin's life in one vectorized pass over its market caps, the same events the
+    strategies and the analysis tools find bar by bar:
+    - migration: first close above migration_market_cap (BaseTradingStrategy.catch_migration),
+    - ATH: highest high, first bar reaching it,
+    - death: first close below dead_coin_market_cap after migration (BaseTradingStrategy.catch_dead_coin).
+
+    Args:
+        high (np.ndarray): Highs in market cap.
+        close (np.ndarray): Closes in market cap.
+        migration_market_cap (float): Migration threshold.
+        dead_coin_market_cap (float): Dead coin threshold.
+
+    Returns:
+        dict: migration_bar (None when the coin never migrates), post_migration_bars, ath_bar,
+              peak_market_cap (ATH value), dead_bar (None when the coin never dies after migrating),
+              alive_bars (bars from migration to death or to the end of the chart).
+    """
+    high = np.asarray(high, dtype=float)
+    close = np.asarray(close, dtype=float)
+    bars = len(close)
+    crossed = np.flatnonzero(close > migration_market_cap)
+    migration_bar = int(crossed[0]) if len(crossed) else None
+    dead_bar = None
+    if migration_bar is not None:
+        dead = np.flatnonzero(close[migration_bar:] < dead_coin_market_cap)
+        dead_bar = migration_bar + int(dead[0]) if len(dead) else None
+    ath_bar = int(np.argmax(high)) if bars else None
+    return {
+        'migration_bar': migration_bar,
+        'post_migration_bars': bars - migration_bar if migration_bar is not None else 0,
+        'ath_bar': ath_bar,
+        'peak_market_cap': float(high[ath_bar]) if bars else None,
+        'dead_bar': dead_bar,
+        'alive_bars': ((dead_bar if dead_bar is not None else bars) - migration_bar) if migration_bar is not None else 0,
+    }
+
+
+def chart_lifecycle(df, data_in_market_cap=False, migration_market_cap=70_000, dead_coin_market_cap=8_000):
+    """
+    lifecycle_events of a raw or ready_df chart.
+
+    Args:
+        df (pd.DataFrame): Chart with 'high' and 'close' columns.
+        data_in_market_cap (bool): Prices are already market caps (ready_df(mcap=True)), else in SOL.
+    """
+    scale = 1 if data_in_market_cap else 1_000_000_000
+    return lifecycle_events(df['high'].to_numpy(dtype=float) * scale, df['close'].to_numpy(dtype=float) * scale,
+                            migration_market_cap=migration_market_cap, dead_coin_market_cap=dead_coin_market_cap)
+
+
+def lifecycle_index(paths, manifest_path=None, migration_market_cap=70_000, dead_coin_market_cap=8_000):
+    """
+    The lifecycle events of the charts as a DataFrame indexed by path, read from the manifest
+    (only new or changed charts are scanned, see utils.manifest.build_manifest).
+    """
+    manifest = build_manifest(paths, manifest_path, migration_market_cap=migration_market_cap,
+                              dead_coin_market_cap=dead_coin_market_cap)
+    return manifest_df(manifest)[['bars', *LIFECYCLE_COLUMNS]]
+
+
+def select_charts(manifest, migrated=None, died=None, min_post_migration_bars=0, min_alive_bars=0,
+                  min_peak_market_cap=None, max_peak_market_cap=None):
+    """
+    Charts of a manifest matching lifecycle conditions, without loading them.
+
+    Args:
+        manifest (dict): build_manifest output.
+        migrated (bool): Keep only the charts that migrate (True) or never do (False), None = both.
+        died (bool): Keep only the charts that die after migrating (True) or don't (False), None = both.
+        min_post_migration_bars (int): Minimum bars from migration to the end of the chart.
+        min_alive_bars (int): Minimum bars from migration to death (or the end of the chart).
+        min_peak_market_cap, max_peak_market_cap (float): ATH range.
+
+    Returns:
+        list: Paths, in manifest order.
+    """
+    selected = []
+    for path, entry in manifest.items():
+        if migrated is not None and (entry['migration_bar'] is not None) != migrated:
+            continue
+        if died is not None and (entry['dead_bar'] is not None) != died:
+            continue
+        if entry['post_migration_bars'] < min_post_migration_bars or entry['alive_bars'] < min_alive_bars:
+            continue
+        peak = entry['peak_market_cap'] or 0.0
+        if min_peak_market_cap is not None and peak < min_peak_market_cap:
+            continue
+        if max_peak_market_cap is not None and peak > max_peak_market_cap:
+            continue
+        selected.append(path)
+    print(f"[RUN] Lifecycle filter: {len(selected)} of {len(manifest)} charts selected")
+    return selected
+
+
+def lifecycle_slice(entry, start='start', end='end', warmup_bars=0, after_bars=0):
+    """
+    Bar range of a chart between two of its lifecycle events.
+
+    Args:
+        entry (dict): Manifest entry.
+        start (str): 'start', 'migration' or 'ath'.
+        end (str): 'end', 'dead' or 'ath' (an event that does not happen means the end of the chart).
+        warmup_bars (int): Bars kept before the start event.
+        after_bars (int): Bars kept after the end event.
+
+    Returns:
+        slice: Positions to keep (df.iloc[slice]). Empty when the start event never happens.
+    """
+    bars = entry['bars']
+    starts = {'start': 0, 'migration': entry['migration_bar'], 'ath': entry['ath_bar']}
+    ends = {'end': bars, 'dead': entry['dead_bar'], 'ath': entry['ath_bar']}
+    if start not in starts or end not in ends:
+        raise ValueError(f"Unknown lifecycle range '{start}' to '{end}'.")
+    first = starts[start]
+    if first is None:
+        return slice(bars, bars)
+    last = ends[end]
+    stop = bars if last is None or end == 'end' else min(bars, last + 1 + after_bars)
+    return slice(max(0, first - warmup_bars), stop)
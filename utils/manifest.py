@@ -0,0 +1,111 @@
+import json
+import os
+
+import pandas as pd
+
+
+MANIFEST_COLUMNS = ('path', 'size', 'mtime', 'bars', 'migration_bar', 'post_migration_bars',
+                    'first_timestamp', 'last_timestamp', 'peak_market_cap', 'ath_bar', 'dead_bar', 'alive_bars',
+                    'migration_market_cap', 'dead_coin_market_cap')
+
+
+def _read_columns(path, columns):
+    """Reads only the given columns of a raw chart (CSV or Parquet, see data_utils.read_chart)."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=list(columns))
+    return pd.read_csv(path, usecols=list(columns))
+
+
+def chart_stats(path, migration_market_cap=70_000, dead_coin_market_cap=8_000):
+    """
+    Scans one raw chart and returns its manifest entry.
+
+    Args:
+        path (str): Chart file in the axiom schema (prices in SOL, 'time' in ms).
+        migration_market_cap (float): Migration threshold in market cap (see data_utils.find_migration_bar).
+        dead_coin_market_cap (float): Dead coin threshold in market cap.
+
+    Returns:
+        dict: path, size, mtime, bars, first_timestamp, last_timestamp, the lifecycle events
+              (utils.lifecycle.lifecycle_events: migration_bar, post_migration_bars, ath_bar,
+              peak_market_cap, dead_bar, alive_bars) and the thresholds they were found with.
+    """
+    from utils.lifecycle import chart_lifecycle
+
+    stat = os.stat(path)
+    df = _read_columns(path, ('time', 'high', 'close'))
+    bars = len(df)
+    return {
+        'path': path,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'bars': bars,
+        'first_timestamp': int(df['time'].iloc[0]) if bars else None,
+        'last_timestamp': int(df['time'].iloc[-1]) if bars else None,
+        **chart_lifecycle(df, migration_market_cap=migration_market_cap, dead_coin_market_cap=dead_coin_market_cap),
+        'migration_market_cap': migration_market_cap,
+        'dead_coin_market_cap': dead_coin_market_cap,
+    }
+
+
+def load_manifest(manifest_path):
+    """
+    Reads a manifest written by save_manifest.
+
+    Returns:
+        dict: {path: entry}, empty when the file does not exist.
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return {entry['path']: entry for entry in entries}
+
+
+def save_manifest(manifest, manifest_path):
+    """Writes the manifest ({path: entry}) as a JSON list, replacing the file in one step."""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(list(manifest.values()), f, indent=1)
+    os.replace(tmp_path, manifest_path)
+
+
+def build_manifest(paths, manifest_path=None, migration_market_cap=70_000, dead_coin_market_cap=8_000):
+    """
+    Returns the manifest entries of the given charts, scanning only the files that are new or changed
+    (size or mtime) since manifest_path was written, or whose entry lacks a column added since or was
+    found with other thresholds, and saves the updated manifest there.
+
+    Args:
+        paths (list): Chart files.
+        manifest_path (str): JSON file caching the entries between runs (None = scan everything, no cache).
+        migration_market_cap (float): Migration threshold in market cap.
+        dead_coin_market_cap (float): Dead coin threshold in market cap.
+
+    Returns:
+        dict: {path: entry} for the given paths, in their order.
+    """
+    cached = load_manifest(manifest_path) if manifest_path else {}
+    manifest = {}
+    scanned = 0
+    for path in paths:
+        entry = cached.get(path)
+        stat = os.stat(path)
+        if entry is None or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime \
+                or not all(column in entry for column in MANIFEST_COLUMNS) \
+                or entry['migration_market_cap'] != migration_market_cap \
+                or entry['dead_coin_market_cap'] != dead_coin_market_cap:
+            entry = chart_stats(path, migration_market_cap=migration_market_cap,
+                                dead_coin_market_cap=dead_coin_market_cap)
+            scanned += 1
+        manifest[path] = entry
+    if manifest_path and scanned:
+        cached.update(manifest)
+        save_manifest(cached, manifest_path)
+    print(f"[RUN] Manifest: {len(manifest)} charts, {scanned} scanned, {len(manifest) - scanned} from cache")
+    return manifest
+
+
+def manifest_df(manifest):
+    """The manifest as a DataFrame indexed by path."""
+    return pd.DataFrame(list(manifest.values()), columns=list(MANIFEST_COLUMNS)).set_index('path')
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from commissions.CustomSolanaCommission import CustomSolanaCommission
+from utils.csvToMT5 import resample_to_higher_tf
+from utils.manifest import build_manifest
+from utils.runner import _load_chart, run_backtest_cached
+from utils.scheduler import run_sweep
+
+
+def coarse_chart(df, tf='15s'):
+    """
+    Resamples a ready_df chart to tf bars (resample_to_higher_tf), keeping the columns the runner uses.
+    """
+    coarse = resample_to_higher_tf(df[['datetime', 'open', 'high', 'low', 'close', 'volume']], tf)
+    return coarse[['datetime', 'open', 'high', 'low', 'close', 'volume']]
+
+
+def spearman(a, b):
+    """Spearman rank correlation of two aligned series (Pearson of average ranks, NaN pairs dropped)."""
+    pairs = pd.DataFrame({'a': pd.to_numeric(pd.Series(a), errors='coerce').to_numpy(),
+                          'b': pd.to_numeric(pd.Series(b), errors='coerce').to_numpy()}).dropna()
+    if len(pairs) < 2 or pairs['a'].nunique() < 2 or pairs['b'].nunique() < 2:
+        return np.nan
+    return pairs['a'].rank().corr(pairs['b'].rank())
+
+
+def _score(results, metric, aggregate):
+    values = pd.to_numeric(results[metric], errors='coerce').groupby(results['config'])
+    return values.median() if aggregate == 'median' else values.mean()
+
+
+def coarse_to_fine(paths, param_sets, tf='15s', coarse_paths=None, top_k=3, metric='final_value',
+                   aggregate='median', workers=1, manifest_path=None, df_start_margin=0, df_end_margin=-1,
+                   **run_kwargs):
+    """
+    Two-stage search: every param set is screened on coarse bars (1s charts resampled to tf, or the
+    native coarse files), with SL / TP checked on the bars' high / low (the strategy's 'intrabar_exits'
+    param). The top_k param sets are then confirmed on the full 1s charts.
+
+    The Spearman rank correlation between the two stages tells how far the screen can be trusted:
+    over the confirmed param sets' scores, and over every confirmed (coin, param set) result.
+    Run once with top_k=None (confirm everything) to calibrate a new strategy or tf.
+
+    Args:
+        paths (list): 1s chart files.
+        param_sets (list): Candidate strategy_params dicts.
+        tf (str): Screening timeframe (pandas offset, e.g. '15s', '1min').
+        coarse_paths (dict): {1s path: coarse chart file} to screen on native coarse files instead of resampling.
+        top_k (int): Param sets confirmed on 1s data (None = all).
+        metric (str): Result column the param sets are ranked on.
+        aggregate (str): 'median' or 'mean' of the metric over the coins.
+        workers (int): Worker processes of the confirm stage (see utils.scheduler.run_sweep).
+        manifest_path (str): Manifest cache file of the confirm stage.
+        df_start_margin, df_end_margin (int): Slice of every chart that is run, as in run_all.
+        **run_kwargs: Passed to the backtests (strategy_class, sizer_class, cash, mcap, cache, ...).
+
+    Returns:
+        tuple: (pd.DataFrame with one row per param set: config, coarse_score, fine_score, confirmed, params,
+                sorted by fine then coarse score,
+                pd.DataFrame of the coarse results, pd.DataFrame of the fine results,
+                dict: score_spearman, result_spearman, coarse_bars, fine_bars, full_grid_bars)
+    """
+    if aggregate not in ('median', 'mean'):
+        raise ValueError(f"Unknown aggregate '{aggregate}', expected 'median' or 'mean'.")
+    run_kwargs.setdefault('commission_class', CustomSolanaCommission)
+    strategy_class = run_kwargs['strategy_class']
+    intrabar = 'intrabar_exits' in strategy_class.params._getkeys()
+    if not intrabar:
+        print(f"[RUN] {strategy_class.__name__} has no intrabar_exits param, screening on closes only")
+    mcap = run_kwargs.get('mcap', False)
+
+    # Stage 1: screen every param set on coarse bars
+    coarse_rows = []
+    coarse_bars = 0
+    for path in paths:
+        coin_name = os.path.basename(path).split('.')[0][17:27]
+        if coarse_paths and path in coarse_paths:
+            df = _load_chart(coarse_paths[path], mcap=mcap)
+        else:
+            df = coarse_chart(_load_chart(path, mcap=mcap), tf)
+        df = df[df_start_margin:df_end_margin]
+        for index, params in enumerate(param_sets):
+            params = dict(params, intrabar_exits=True) if intrabar else params
+            analysis_result, _, _ = run_backtest_cached(df, coin_name=coin_name, strategy_params=params, **run_kwargs)
+            coarse_rows.append(dict(analysis_result, config=index))
+            coarse_bars += len(df)
+    coarse_results = pd.DataFrame(coarse_rows)
+    coarse_scores = _score(coarse_results, metric, aggregate)
+
+    # Stage 2: confirm the best ones on 1s bars
+    ranked = coarse_scores.sort_values(ascending=False, na_position='last').index.tolist()
+    confirmed = ranked if top_k is None else ranked[:top_k]
+    print(f"[RUN] Coarse screen ({tf}) done, confirming {len(confirmed)} of {len(param_sets)} param sets on 1s data")
+    fine_results, _ = run_sweep(paths, [param_sets[i] for i in confirmed], workers=workers, manifest_path=manifest_path,
+                                df_start_margin=df_start_margin, df_end_margin=df_end_margin, **run_kwargs)
+    fine_results['config'] = [confirmed[j] for j in fine_results['config']]
+    fine_scores = _score(fine_results, metric, aggregate)
+    chart_bars = sum(entry['bars'] for entry in build_manifest(paths, manifest_path).values())
+    fine_bars = chart_bars * len(confirmed)
+
+    summary = pd.DataFrame({'config': range(len(param_sets)),
+                            'coarse_score': [coarse_scores.get(i, np.nan) for i in range(len(param_sets))],
+                            'fine_score': [fine_scores.get(i, np.nan) for i in range(len(param_sets))],
+                            'confirmed': [i in confirmed for i in range(len(param_sets))],
+                            'params': param_sets})
+    both = summary[summary['confirmed']]
+    paired = coarse_results.merge(fine_results, on=['coin', 'config'], suffixes=('_coarse', '_fine'))
+    stats = {
+        'score_spearman': spearman(both['coarse_score'], both['fine_score']),
+        'result_spearman': spearman(paired[f'{metric}_coarse'], paired[f'{metric}_fine']),
+        'coarse_bars': coarse_bars,
+        'fine_bars': fine_bars,
+        'full_grid_bars': chart_bars * len(param_sets),
+    }
+    print(f"[RUN] Coarse vs 1s rank correlation: scores {stats['score_spearman']:.3f} over {len(both)} param sets, "
+          f"results {stats['result_spearman']:.3f} over {len(paired)} runs")
+    print(f"[RUN] Bars run: {coarse_bars} coarse + {fine_bars} 1s, full 1s grid {stats['full_grid_bars']}")
+    summary = summary.sort_values(['fine_score', 'coarse_score'], ascending=False, na_position='last')
+    return summary.reset_index(drop=True), coarse_results, fine_results, stats
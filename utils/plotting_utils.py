@@ -1,13 +1,25 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import matplotlib.patches as patches
 import numpy as np  # For plot_volume_with_averages if you choose to keep it
+import warnings
 
-# --- General Plotting Setup (run this once in your notebook/script) ---
+_plt = None
+
+
+# --- General Plotting Setup (done once, on the first plot) ---
 # %matplotlib inline # For Jupyter/Colab - run directly in a cell
-plt.rcParams['figure.figsize'] = [18, 10]  # Default figure size
-plt.rcParams['figure.dpi'] = 100  # Default DPI
+def _pyplot():
+    """
+    Imports matplotlib.pyplot on first use and applies the default figure setup.
+    Keeps matplotlib out of the import cost of modules that only need the downsampling helpers
+    (and of every backtest worker that never plots).
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot as plt
+        plt.rcParams['figure.figsize'] = [18, 10]  # Default figure size
+        plt.rcParams['figure.dpi'] = 100  # Default DPI
+        _plt = plt
+    return _plt
 
 
 # --- Plotting Individual Backtests (using cerebro.plot) ---
@@ -19,6 +31,7 @@ def plot_single_backtest(cerebro_obj, title="Backtest Plot"):
         cerebro_obj (bt.Cerebro): The cerebro object from a completed backtest run.
         title (str): Title for the plot.
     """
+    plt = _pyplot()
     print(f"\nPlotting: {title}")
     # Set figsize and dpi here if you want it specific to this plot, otherwise use global rcParams
     # plt.rcParams['figure.figsize'] = [18, 10] # Example: override global for this plot
@@ -37,6 +50,7 @@ def plot_all_portfolio_histories_by_time(all_portfolio_histories, title="Portfol
         all_portfolio_histories (dict): Dictionary of {'coin_name': portfolio_history_series (pd.Series)}.
         title (str): Title for the plot.
     """
+    plt = _pyplot()
     plt.figure(figsize=(20, 12))
     for coin_name, history_series in all_portfolio_histories.items():
         if not history_series.empty:
@@ -65,6 +79,7 @@ def plot_all_portfolio_histories(all_portfolio_histories, title="Portfolio Value
         all_portfolio_histories (dict): Dictionary of {'coin_name': portfolio_history_series (pd.Series)}.
         title (str): Title for the plot.
     """
+    plt = _pyplot()
     plt.figure(figsize=(20, 12))
     for coin_name, history_series in all_portfolio_histories.items():
         if not history_series.empty:
@@ -86,10 +101,170 @@ def plot_all_portfolio_histories(all_portfolio_histories, title="Portfolio Value
     plt.tight_layout()  # Adjusts plot to prevent labels from overlapping
     plt.show()
 
+
+# --- Downsampling helpers for large multi-coin overlays ---
+def downsample_minmax(x, y, max_points=2000):
+    """
+    Reduces a series to at most ~max_points by keeping the min and the max of each bucket.
+    Spikes survive (unlike plain striding), which matters for memecoin equity curves.
+
+    Args:
+        x (np.ndarray): Monotonic x values (bar index or matplotlib date numbers).
+        y (np.ndarray): Values to downsample.
+        max_points (int): Upper bound on the number of returned points.
+
+    Returns:
+        tuple: (x_downsampled, y_downsampled)
+    """
+    n = len(y)
+    n_buckets = max_points // 2
+    if n <= max_points or n_buckets < 1:
+        return x, y
+
+    # Pad to a whole number of equally sized buckets so min/max run as one reshape
+    bucket = int(np.ceil(n / n_buckets))
+    padded = np.full(n_buckets * bucket, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, bucket)
+    valid_rows = ~np.all(np.isnan(blocks), axis=1)
+    offsets = np.arange(n_buckets)[valid_rows] * bucket
+    blocks = blocks[valid_rows]
+
+    idx = np.concatenate([offsets + np.nanargmin(blocks, axis=1),
+                          offsets + np.nanargmax(blocks, axis=1),
+                          [0, n - 1]])
+    idx = np.unique(idx)  # sorted, keeps time order
+    return x[idx], y[idx]
+
+
+def downsample_lttb(x, y, max_points=2000):
+    """
+    Largest-Triangle-Three-Buckets downsampling. Keeps the visual shape of the curve
+    with exactly max_points points.
+
+    Args:
+        x (np.ndarray): Monotonic x values (bar index or matplotlib date numbers).
+        y (np.ndarray): Values to downsample.
+        max_points (int): Number of returned points.
+
+    Returns:
+        tuple: (x_downsampled, y_downsampled)
+    """
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return x, y
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)  # max_points - 2 inner buckets
+    idx = np.empty(max_points, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Triangle area between the last chosen point, each candidate and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+
+def _history_xy(history_series, by_time):
+    """Returns float x/y arrays for a portfolio history series (date numbers or bar index on x)."""
+    values = np.asarray(history_series.values, dtype=float)
+    if by_time:
+        index = history_series.index
+        if not isinstance(index, pd.DatetimeIndex):
+            index = pd.to_datetime(index)
+        import matplotlib.dates as mdates
+        return mdates.date2num(index.values), values
+    return np.arange(len(values), dtype=float), values
+
+
+def plot_portfolio_overlay(all_portfolio_histories, title="Portfolio Value Over Time for All Coins", by_time=True,
+                           method='minmax', max_points=2000, view='lines', percentiles=(10, 50, 90),
+                           show=True):
+    """
+    Overlays the portfolio history of many coins on one chart without drawing every bar.
+
+    Each series is downsampled first and all of them are drawn as a single LineCollection,
+    so hundreds of full 1s histories stay responsive. With view='band' the chart shows the
+    median and a low/high percentile band across coins instead of the individual lines.
+
+    Args:
+        all_portfolio_histories (dict): Dictionary of {'coin_name': portfolio_history_series (pd.Series)}.
+        title (str): Title for the plot.
+        by_time (bool): Use the datetime index on x (True) or the bar number (False).
+        method (str): 'minmax' or 'lttb' downsampling.
+        max_points (int): Maximum number of points per coin (and grid size for the band view).
+        view (str): 'lines' for the overlay, 'band' for the percentile band.
+        percentiles (tuple): (low, mid, high) percentiles used by the band view.
+        show (bool): Call plt.show() at the end.
+
+    Returns:
+        matplotlib.figure.Figure: The figure that was drawn.
+    """
+    plt = _pyplot()
+    from matplotlib.collections import LineCollection
+
+    downsample = {'minmax': downsample_minmax, 'lttb': downsample_lttb}[method]
+    series_xy = [_history_xy(s, by_time) for s in all_portfolio_histories.values() if not s.empty]
+
+    fig, ax = plt.subplots(figsize=(20, 12))
+    if not series_xy:
+        print("No portfolio histories to plot.")
+        return fig
+
+    if view == 'lines':
+        segments = []
+        for x, y in series_xy:
+            x, y = downsample(x, y, max_points)
+            segments.append(np.column_stack((x, y)))
+        colors = plt.cm.viridis(np.linspace(0, 1, len(segments)))
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=1, alpha=0.7))
+        ax.autoscale()
+    elif view == 'band':
+        # Common x grid; outside its own lifetime a coin is NaN (by time) or holds its last value (by bar)
+        x_min = min(x[0] for x, _ in series_xy)
+        x_max = max(x[-1] for x, _ in series_xy)
+        grid = np.linspace(x_min, x_max, max_points)
+        stacked = np.full((len(series_xy), len(grid)), np.nan)
+        for row, (x, y) in enumerate(series_xy):
+            if by_time:
+                inside = (grid >= x[0]) & (grid <= x[-1])
+                stacked[row, inside] = np.interp(grid[inside], x, y)
+            else:
+                stacked[row] = np.interp(grid, x, y)  # np.interp holds the edge values
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)  # all-NaN columns between lifetimes
+            low, mid, high = np.nanpercentile(stacked, percentiles, axis=0)
+        ax.fill_between(grid, low, high, color='tab:blue', alpha=0.25,
+                        label=f"p{percentiles[0]}–p{percentiles[2]}")
+        ax.plot(grid, mid, color='tab:blue', linewidth=1.5, label=f"p{percentiles[1]}")
+        ax.legend(loc='upper left')
+    else:
+        raise ValueError(f"Unknown view '{view}', expected 'lines' or 'band'.")
+
+    if by_time:
+        ax.xaxis_date()
+    ax.set_title(f"{title} ({len(series_xy)} coins)")
+    ax.set_xlabel("Date" if by_time else "Bar Number")
+    ax.set_ylabel("Portfolio Value")
+    ax.grid(True)
+    fig.tight_layout()
+    if show:
+        plt.show()
+    return fig
+
 # --- Plotting Aggregated Summary DataFrame ---
 
 
-def draw_summary_df(summary_df):
+def draw_summary_df(summary_df, initial_cash=None, show=True):
     """
     Draws summary plots from the aggregated results DataFrame.
 
@@ -97,10 +272,23 @@ def draw_summary_df(summary_df):
         summary_df (pd.DataFrame): The DataFrame containing aggregated backtest results.
                                    Expected columns: 'file', 'total_profit', 'win_rate',
                                    'num_trades', 'final_value', 'initial_cash' (or similar).
+        initial_cash (float): Starting capital for the portfolio change plot. Defaults to the
+                              per-coin 'start_value' column written by run_backtest_for_df.
+        show (bool): Call plt.show() after each figure. Pass False for headless rendering.
+
+    Returns:
+        list: [(name, matplotlib.figure.Figure)] for every figure drawn.
     """
+    plt = _pyplot()
+    figures = []
+
+    def _finish(name):
+        fig = plt.gcf()
+        figures.append((name, fig))
+        if show:
+            plt.show()
+
     # Ensure necessary columns exist. Adjust these names if your summary_df differs.
-    # Example adaptation: Using 'final_value' and assuming initial_cash was 10_000_000.0
-    # You might need to pass initial_cash to this function or store it in summary_df
     if 'final_value' not in summary_df.columns:
         print("Warning: 'final_value' column not found in summary_df. Cannot plot portfolio change.")
     if 'total_profit' not in summary_df.columns:
@@ -118,7 +306,7 @@ def draw_summary_df(summary_df):
         plt.title("Final Portfolio Value per Coin")
         plt.ylabel("Value")
         plt.tight_layout()
-        plt.show()
+        _finish('final_value')
 
     # 2. Win Rate
     if 'win_rate' in summary_df.columns:  # Assuming you compute this in analyze_trades
@@ -130,7 +318,7 @@ def draw_summary_df(summary_df):
         plt.ylim(0, 100)
         plt.grid(True)
         plt.tight_layout()
-        plt.show()
+        _finish('win_rate')
 
     # 3. Number of Trades
     if 'total_trades' in summary_df.columns:  # Changed from num_trades
@@ -140,12 +328,12 @@ def draw_summary_df(summary_df):
         plt.title("Number of Trades per Coin")
         plt.ylabel("Trades")
         plt.tight_layout()
-        plt.show()
+        _finish('total_trades')
 
     # 4. Net Portfolio Change (Requires initial capital to be known or stored)
-    # Assuming initial cash of 10,000,000.0 from your run_backtest_for_df
-    initial_cash = 10_000_000.0
-    if 'final_value' in summary_df.columns:
+    if initial_cash is None and 'start_value' in summary_df.columns:
+        initial_cash = summary_df['start_value']
+    if 'final_value' in summary_df.columns and initial_cash is not None:
         summary_df["portfolio_change"] = summary_df["final_value"] - initial_cash
         plt.figure(figsize=(12, 6))
         plt.plot(summary_df['coin'], summary_df["portfolio_change"], marker='x', color='red')
@@ -155,14 +343,17 @@ def draw_summary_df(summary_df):
         plt.axhline(0, color='black', linestyle='--')
         plt.grid(True)
         plt.tight_layout()
-        plt.show()
+        _finish('portfolio_change')
+
+    return figures
 
 
 # --- Adapted Custom Plot for Candlesticks with Enhanced Trades ---
 # This function is for when backtrader's default trade plotting isn't enough.
 # It assumes you're passing in the *original* dataframe (or a slice of it)
 # and a 'trades' DataFrame you've prepared (e.g., from analyze_trades or a custom process).
-def plot_candles_with_trades_custom(df, trades_df, only_around_trades=True, margin=60, drop_before=None, drop_after=None, title="Candlestick Chart with Trades"):
+def plot_candles_with_trades_custom(df, trades_df, only_around_trades=True, margin=60, drop_before=None, drop_after=None, title="Candlestick Chart with Trades", show=True,
+                                    lifecycle=None, lifecycle_range=None):
     """
     Plots a candlestick chart with custom trade visualizations (buy/sell markers and rectangles).
     This function is a standalone alternative to backtrader's trade observers if more customization is needed.
@@ -175,13 +366,24 @@ def plot_candles_with_trades_custom(df, trades_df, only_around_trades=True, marg
         drop_before (float): If not None, filter candles where 'open' price is below this value.
         drop_after (float): If not None, filter candles where 'open' price is above this value.
         title (str): The title of the plot.
+        show (bool): Call plt.show() at the end. Pass False for headless rendering.
+        lifecycle (dict): Manifest entry of the chart (utils.lifecycle): its migration, ATH and death bars
+                          are marked with vertical lines.
+        lifecycle_range (slice): Bars to plot, e.g. utils.lifecycle.lifecycle_slice(entry, 'migration', 'dead'),
+                                 applied before the other filters.
+
+    Returns:
+        matplotlib.figure.Figure: The figure, or None when there was nothing to plot.
     """
+    import matplotlib.dates as mdates
+    import matplotlib.patches as patches
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(18, 9))
     # width for 1s interval (in days), adjusted for better visual density
     width = 0.7 / (24 * 60 * 60)  # width for 1 second in matplotlib's date format
 
     # Apply filtering based on marketcap/price (your original 'drop_before'/'drop_after' logic)
-    filtered_df = df.copy()
+    filtered_df = df.iloc[lifecycle_range].copy() if lifecycle_range is not None else df.copy()
     if drop_before is not None:
         start_idx = filtered_df[filtered_df['open'] >= drop_before].first_valid_index()
         if start_idx is not None:
@@ -210,7 +412,8 @@ def plot_candles_with_trades_custom(df, trades_df, only_around_trades=True, marg
 
     if filtered_df.empty:
         print("No data to plot after filtering.")
-        return
+        plt.close(fig)
+        return None
 
     # Plot candles
     for idx, row in filtered_df.iterrows():
@@ -260,6 +463,16 @@ def plot_candles_with_trades_custom(df, trades_df, only_around_trades=True, marg
                 )
                 ax.add_patch(rect)
 
+    if lifecycle is not None:
+        events = (('migration_bar', 'purple', 'Migration'), ('ath_bar', 'green', 'ATH'), ('dead_bar', 'black', 'Dead coin'))
+        for key, color, label in events:
+            bar = lifecycle.get(key)
+            if bar is None or bar >= len(df):
+                continue
+            event_time = df.index[bar]
+            if filtered_df.index[0] <= event_time <= filtered_df.index[-1]:
+                ax.axvline(event_time, color=color, linestyle='--', alpha=0.6, label=label)
+
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M:%S'))
     plt.setp(ax.get_xticklabels(), rotation=45, ha="right")  # Rotate for readability
     ax.set_title(title)
@@ -268,7 +481,9 @@ def plot_candles_with_trades_custom(df, trades_df, only_around_trades=True, marg
     ax.grid(True)
     # ax.legend() # Only if you want 'Buy' and 'Sell' labels in legend
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
 
 # --- Functions that are likely useless or have better backtrader alternatives ---
 # def plot_candles(df): # Useless, covered by cerebro.plot()
@@ -282,6 +497,7 @@ def plot_volume_with_averages(df):
     Plots raw volume and several rolling mean volumes.
     This is a specialized analytical plot, not part of backtrader's core visualization.
     """
+    plt = _pyplot()
     # Filter to start after a certain 'open' price threshold (your original logic)
     # Ensure datetime index for filtering
     if not isinstance(df.index, pd.DatetimeIndex):
@@ -0,0 +1,258 @@
+import functools
+import heapq
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from commissions.CustomSolanaCommission import CustomSolanaCommission
+from utils.prefetch import PrefetchLoader
+from utils.runner import _load_chart, run_configs_for_df
+
+
+def round_trips(orders, start_bar=0):
+    """
+    Splits the executed orders of a standalone run (TradeListAnalyzer.orders) into round trips, each
+    one relative to the cash the run had when it opened, so it can be replayed with any stake.
+    Commissions are left out: they are not proportional to the stake (fixed fee per order), the
+    replay charges them on the replayed order sizes (see PortfolioEngine).
+
+    Args:
+        orders (list): (bar, signed size, price, commission, cash after the fill) tuples.
+        start_bar (int): Chart bar of the first fed bar (trim_pre_migration runs).
+
+    Returns:
+        list: One dict per round trip: 'orders' as (chart bar, units per unit of stake, price) tuples,
+              and 'closed' (False when the run ended holding the position).
+    """
+    trips = []
+    position = 0.0
+    trip = None
+    for bar, size, price, comm, cash_after in orders:
+        if trip is None:
+            if size <= 0:  # nothing held, nothing to sell
+                continue
+            # Flat before the first buy: the run's cash was its whole value
+            trip = {'orders': [], 'closed': False, 'cash_before': cash_after + size * price + comm}
+            trips.append(trip)
+        trip['orders'].append((start_bar + bar, size / trip['cash_before'], price))
+        position += size
+        if position <= 1e-12 * abs(size):
+            trip['closed'] = True
+            position = 0.0
+            trip = None
+    for trip in trips:
+        del trip['cash_before']
+    return trips
+
+
+class PortfolioEngine:
+    """
+    One wallet trading the round trips of many coins (and strategies) with a capital limit.
+
+    Every coin stream (a chart's timestamps and closes plus the round trips of one strategy on it) is
+    a cursor in a heap keyed by the timestamp of its next event, a k-way merge of the streams' timelines:
+    - a flat stream sits in the heap at its next round trip's first order, its bars are never visited;
+    - a stream holding a position steps bar by bar, so its value is marked at every bar it trades.
+    Only the bars of held coins are processed, there is no global 1s grid, and the cost grows with the
+    held bars plus log(number of streams) per event.
+
+    When a round trip opens, it gets a stake of stake_fraction of the current equity out of the wallet's
+    cash (nothing when max_positions streams are already open or less than min_stake is available),
+    its orders are replayed scaled to that stake, each one paying the commission of its own size, and
+    the stake's cash goes back to the wallet when it closes. A position still open at the end of its
+    chart is closed at the last close.
+    """
+
+    def __init__(self, initial_cash=1000, stake_fraction=0.1, max_positions=20, min_stake=0.0,
+                 commission=None, cash_scale=1.0):
+        """
+        Args:
+            initial_cash (float): Wallet cash at the start.
+            stake_fraction (float): Stake of a new round trip as a fraction of the current equity.
+            max_positions (int): Round trips open at the same time.
+            min_stake (float): Round trips with a smaller stake available are skipped.
+            commission (bt.CommissionInfo): Commission charged on every replayed order (e.g.
+                                            CustomSolanaCommission()), None = no fees.
+            cash_scale (float): Broker cash per unit of wallet cash in the standalone runs
+                                (1_000_000_000 in MCAP mode), the scale the commission works in.
+        """
+        self.initial_cash = initial_cash
+        self.stake_fraction = stake_fraction
+        self.max_positions = max_positions
+        self.min_stake = min_stake
+        self.commission = commission
+        self.cash_scale = cash_scale
+        self.streams = []
+
+    def add_stream(self, name, timestamps, closes, trips):
+        """
+        Adds the round trips of one strategy on one chart.
+
+        Args:
+            name: Identifies the stream in the trade list (e.g. (coin, config)).
+            timestamps (np.ndarray): int64 ms timestamps of the chart bars.
+            closes (np.ndarray): Closes of the chart bars, in the unit of the run's prices.
+            trips (list): round_trips output.
+        """
+        if trips:
+            self.streams.append((name, np.asarray(timestamps, dtype=np.int64), np.asarray(closes, dtype=np.float64), trips))
+
+    def run(self):
+        """
+        Returns:
+            tuple: (pd.Series of the equity at every processed event, indexed by datetime,
+                    pd.DataFrame of the round trips: stream, open_time, close_time, stake, pnl, skipped,
+                    dict of stats: final_equity, return_percent, max_drawdown, trips, skipped_trips,
+                    max_open, events, grid_bars (1s bars of a global grid over the same span))
+        """
+        cash = self.initial_cash
+        held_value = 0.0  # marked value of the open round trips (their cash + units * close)
+        open_trips = {}   # stream index -> state of its open round trip
+        trade_rows = []
+        equity_times, equity_values = [], []
+        events = 0
+
+        # heap of (timestamp, stream index, bar, trip index, order index)
+        heap = [(int(ts[trips[0]['orders'][0][0]]), i, trips[0]['orders'][0][0], 0, 0)
+                for i, (_, ts, _, trips) in enumerate(self.streams)]
+        heapq.heapify(heap)
+        first_time = heap[0][0] if heap else None
+        last_time = first_time
+        max_open = 0
+        while heap:
+            timestamp, i, bar, t, k = heapq.heappop(heap)
+            name, ts, closes, trips = self.streams[i]
+            trip = trips[t]
+            events += 1
+            last_time = timestamp
+
+            state = open_trips.get(i)
+            if state is None:  # first order of a round trip
+                equity = cash + held_value
+                stake = min(self.stake_fraction * equity, cash)
+                if len(open_trips) >= self.max_positions or stake <= 0 or stake < self.min_stake:
+                    trade_rows.append({'stream': name, 'open_time': timestamp, 'close_time': None,
+                                       'stake': 0.0, 'pnl': 0.0, 'skipped': True})
+                    self._push_next_trip(heap, i, t)
+                    continue
+                cash -= stake
+                state = {'stake': stake, 'cash': stake, 'units': 0.0, 'value': stake, 'open_time': timestamp}
+                open_trips[i] = state
+                held_value += stake
+                max_open = max(max_open, len(open_trips))
+
+            # Orders of this bar, then mark the position at the close
+            orders = trip['orders']
+            while k < len(orders) and orders[k][0] == bar:
+                _, units, price = orders[k]
+                units *= state['stake']
+                state['units'] += units
+                state['cash'] -= units * price
+                if self.commission is not None:
+                    state['cash'] -= self.commission.getcommission(units * self.cash_scale, price) / self.cash_scale
+                k += 1
+            value = state['cash'] + state['units'] * closes[bar]
+            held_value += value - state['value']
+            state['value'] = value
+
+            last_bar = bar + 1 >= len(ts)
+            if k == len(orders) and (trip['closed'] or last_bar):
+                # Round trip over (or chart over with the position open): its value goes back to the wallet
+                cash += value
+                held_value -= value
+                del open_trips[i]
+                trade_rows.append({'stream': name, 'open_time': state['open_time'], 'close_time': timestamp,
+                                   'stake': state['stake'], 'pnl': value - state['stake'], 'skipped': False})
+                self._push_next_trip(heap, i, t)
+            elif not last_bar:
+                heapq.heappush(heap, (int(ts[bar + 1]), i, bar + 1, t, k))
+            equity_times.append(timestamp)
+            equity_values.append(cash + held_value)
+
+        equity = pd.Series(equity_values, index=pd.to_datetime(np.asarray(equity_times, dtype=np.int64), unit='ms'),
+                           dtype=float)
+        equity = equity[~equity.index.duplicated(keep='last')]
+        trades = pd.DataFrame(trade_rows, columns=['stream', 'open_time', 'close_time', 'stake', 'pnl', 'skipped'])
+        for column in ('open_time', 'close_time'):
+            trades[column] = pd.to_datetime(trades[column], unit='ms')
+        final_equity = cash + held_value
+        values = np.concatenate(([self.initial_cash], equity.to_numpy()))
+        peak = np.maximum.accumulate(values)
+        stats = {
+            'final_equity': float(final_equity),
+            'return_percent': float((final_equity / self.initial_cash - 1.0) * 100.0),
+            'max_drawdown': float((100.0 * (peak - values) / peak).max()),
+            'trips': int((~trades['skipped']).sum()),
+            'skipped_trips': int(trades['skipped'].sum()),
+            'max_open': max_open,
+            'events': events,
+            'grid_bars': ((last_time - first_time) // 1000 + 1) * len(self.streams) if first_time is not None else 0,
+        }
+        return equity, trades, stats
+
+    def _push_next_trip(self, heap, i, t):
+        """Puts stream i back in the heap at the first order of its next round trip, if any."""
+        _, ts, _, trips = self.streams[i]
+        if t + 1 < len(trips):
+            bar = trips[t + 1]['orders'][0][0]
+            heapq.heappush(heap, (int(ts[bar]), i, bar, t + 1, 0))
+
+
+def run_portfolio(csv_files, configs, initial_cash=1000, stake_fraction=0.1, max_positions=20, min_stake=0.0,
+                  run_cash=1000, mcap=False, df_start_margin=0, df_end_margin=-1, prefetch=0, **run_kwargs):
+    """
+    Portfolio backtest of the given strategy configs over many coins sharing one wallet.
+
+    Every config first runs standalone on every chart (run_configs_for_df, one feed per chart), its
+    executed orders become round trips, then PortfolioEngine replays all of them in time order with
+    the shared capital, charging the runs' commission model on the replayed order sizes. Strategies
+    keep their standalone decisions: the capital limit decides which round trips are taken and how
+    big they are, not when the strategies buy or sell.
+
+    Args:
+        csv_files (list): Chart files.
+        configs (list): (strategy_class, strategy_params, sizer_class[, sizer_params]) tuples.
+        initial_cash, stake_fraction, max_positions, min_stake: See PortfolioEngine.
+        run_cash (float): Cash of the standalone runs (only the round trips' proportions are used).
+        mcap (bool): Charts in market cap.
+        df_start_margin, df_end_margin (int): Slice of every chart that is run, as in run_all.
+        prefetch (int): Load the next charts in a background thread (see run_all).
+        **run_kwargs: Other run_backtest_for_df arguments (trim_pre_migration, stop_when_finished, ...).
+
+    Returns:
+        tuple: (equity pd.Series, trades pd.DataFrame with 'coin' and 'config' columns, stats dict),
+               see PortfolioEngine.run.
+    """
+    run_kwargs.setdefault('commission_class', CustomSolanaCommission)
+    engine = PortfolioEngine(initial_cash=initial_cash, stake_fraction=stake_fraction,
+                             max_positions=max_positions, min_stake=min_stake,
+                             commission=run_kwargs['commission_class'](),
+                             cash_scale=1_000_000_000 if mcap else 1.0)
+    charts = PrefetchLoader(csv_files, functools.partial(_load_chart, mcap=mcap), depth=prefetch)
+    start = time.perf_counter()
+    for csv_file, df in charts:
+        coin_name = os.path.basename(csv_file).split('.')[0][17:27]
+        df = df[df_start_margin:df_end_margin]
+        results, cerebros, _ = run_configs_for_df(df, coin_name, configs, cash=run_cash, mcap=mcap, **run_kwargs)
+        timestamps = df['datetime'].to_numpy(dtype='datetime64[ms]').view(np.int64)
+        closes = df['close'].to_numpy(dtype=np.float64)
+        for index, cerebro_obj in enumerate(cerebros):
+            start_bar = results['start_bar'].iloc[index] if 'start_bar' in results else 0
+            orders = cerebro_obj.runstrats[0][0].analyzers.mytrades.orders
+            engine.add_stream((coin_name, index), timestamps, closes, round_trips(orders, start_bar=int(start_bar)))
+    signal_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    equity, trades, stats = engine.run()
+    trades.insert(0, 'coin', [name[0] for name in trades['stream']])
+    trades.insert(1, 'config', [name[1] for name in trades['stream']])
+    trades = trades.drop(columns='stream')
+    print(f"[RUN] Portfolio: {len(csv_files)} charts x {len(configs)} configs, {stats['trips']} round trips taken, "
+          f"{stats['skipped_trips']} skipped for capital, up to {stats['max_open']} open")
+    print(f"[RUN] Portfolio: final equity {stats['final_equity']:.2f} ({stats['return_percent']:.2f}%), "
+          f"max drawdown {stats['max_drawdown']:.2f}%")
+    print(f"[RUN] Portfolio: standalone runs {signal_time:.2f}s, merge {time.perf_counter() - start:.2f}s over "
+          f"{stats['events']} events (a global 1s grid would be {stats['grid_bars']} coin bars)")
+    return equity, trades, stats
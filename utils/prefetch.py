@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+
+
+class PrefetchLoader:
+    """
+    Loads files in a background thread, up to `depth` files ahead of the consumer, so reading
+    (and preprocessing) the next charts overlaps with the backtest of the current one.
+
+    Iterating yields (path, loaded) in the order of paths. An exception raised while loading a file
+    is re-raised by the iteration when that file is reached.
+
+    Attributes:
+        io_wait (float): Seconds the consumer spent waiting for a file that was not loaded yet.
+        load_time (float): Seconds the background thread spent loading.
+    """
+
+    _DONE = object()
+
+    def __init__(self, paths, load, depth=2):
+        """
+        Args:
+            paths (list): Files to load.
+            load (callable): load(path) -> loaded object (e.g. read_chart + ready_df).
+            depth (int): Max number of loaded files waiting in the queue (0 = load in the consumer thread).
+        """
+        self.paths = list(paths)
+        self.load = load
+        self.depth = max(0, depth)
+        self.io_wait = 0.0
+        self.load_time = 0.0
+        self._queue = queue.Queue(maxsize=self.depth)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _worker(self):
+        for path in self.paths:
+            if self._stop.is_set():
+                break
+            start = time.perf_counter()
+            try:
+                item = (path, self.load(path), None)
+            except Exception as e:  # handed over to the consumer
+                item = (path, None, e)
+            self.load_time += time.perf_counter() - start
+            self._put(item)
+        self._put((None, self._DONE, None))
+
+    def _put(self, item):
+        # Timed puts so close() can stop a thread blocked on a full queue
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self):
+        if not self.depth:
+            yield from self._iter_sequential()
+            return
+        self._thread = threading.Thread(target=self._worker, name='PrefetchLoader', daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                path, loaded, error = self._queue.get()
+                self.io_wait += time.perf_counter() - start
+                if loaded is self._DONE:
+                    return
+                if error is not None:
+                    raise error
+                yield path, loaded
+        finally:
+            self.close()
+
+    def _iter_sequential(self):
+        # depth 0: plain sequential loading, every load counts as I/O wait
+        for path in self.paths:
+            start = time.perf_counter()
+            loaded = self.load(path)
+            elapsed = time.perf_counter() - start
+            self.io_wait += elapsed
+            self.load_time += elapsed
+            yield path, loaded
+
+    def close(self):
+        """Stops the background thread (also called when the iteration ends or is abandoned)."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
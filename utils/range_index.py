@@ -0,0 +1,153 @@
+import numpy as np
+
+
+class SparseTable:
+    """
+    Sparse table over a 1D array for O(1) range max/min queries (after an O(n log n) build).
+    Level k holds the extreme of every window of 2**k values, a query combines two overlapping windows.
+    """
+
+    def __init__(self, values, op=np.maximum):
+        values = np.asarray(values, dtype=float)
+        self.op = op
+        self._pick = max if op is np.maximum else min
+        self.levels = [values]
+        width = 1
+        while 2 * width <= len(values):
+            previous = self.levels[-1]
+            self.levels.append(op(previous[:-width], previous[width:]))
+            width *= 2
+
+    def __len__(self):
+        return len(self.levels[0])
+
+    def query(self, start, end):
+        """
+        Extreme of values[start:end] (half-open, start is clipped at 0). Returns nan for an empty range.
+        """
+        if start < 0:
+            start = 0
+        if end > len(self.levels[0]):
+            end = len(self.levels[0])
+        if end <= start:
+            return float('nan')
+        k = int(end - start).bit_length() - 1
+        level = self.levels[k]
+        return self._pick(level[start], level[end - (1 << k)])
+
+    def rolling(self, period):
+        """
+        Extreme of the window of `period` values ending at every index (nan until the window is full),
+        the vectorized equivalent of bt.ind.Highest / bt.ind.Lowest.
+        """
+        n = len(self.levels[0])
+        out = np.full(n, np.nan)
+        if period < 1 or period > n:
+            return out
+        k = int(period).bit_length() - 1
+        level = self.levels[k]
+        width = 1 << k
+        starts = np.arange(n - period + 1)
+        out[period - 1:] = self.op(level[starts], level[starts + period - width])
+        return out
+
+
+class RangeExtremeIndex:
+    """
+    Range-extreme index over one chart, built once and shared by every consumer that needs
+    "highest/lowest over a window" (Fibonacci overlays, swing detection, trailing stops, ...).
+
+    Bar indexes are positions in the arrays the index was built from, i.e. len(data) - 1 inside
+    a strategy or indicator running on the same DataFrame.
+    """
+
+    def __init__(self, high, low, close):
+        self.high_max = SparseTable(high, np.maximum)
+        self.low_min = SparseTable(low, np.minimum)
+        self.close_max = SparseTable(close, np.maximum)
+        self.close_min = SparseTable(close, np.minimum)
+
+    @classmethod
+    def from_df(cls, df):
+        """
+        Builds the index from a DataFrame with 'high', 'low' and 'close' columns (e.g. the output of ready_df).
+        """
+        return cls(df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float), df['close'].to_numpy(dtype=float))
+
+    def __len__(self):
+        return len(self.high_max)
+
+    def max_high(self, start, end):
+        """Highest high of bars [start, end)."""
+        return self.high_max.query(start, end)
+
+    def min_low(self, start, end):
+        """Lowest low of bars [start, end)."""
+        return self.low_min.query(start, end)
+
+    def max_close(self, start, end):
+        """Highest close of bars [start, end)."""
+        return self.close_max.query(start, end)
+
+    def rolling_max_high(self, period):
+        """Highest high of the last `period` bars at every bar (nan until `period` bars exist)."""
+        return self.high_max.rolling(period)
+
+    def rolling_min_low(self, period):
+        """Lowest low of the last `period` bars at every bar (nan until `period` bars exist)."""
+        return self.low_min.rolling(period)
+
+    def rolling_max_close(self, period):
+        """Highest close of the last `period` bars at every bar (nan until `period` bars exist)."""
+        return self.close_max.rolling(period)
+
+    def next_exit(self, start, lo, hi, end=None):
+        """
+        First bar in [start, end) whose close is <= lo or >= hi, or end when the close stays inside (lo, hi).
+        O(log n): binary lifting over the close max/min tables.
+        """
+        n = len(self.close_max)
+        end = n if end is None else min(end, n)
+        pos = start
+        max_levels = self.close_max.levels
+        min_levels = self.close_min.levels
+        for k in range(len(max_levels) - 1, -1, -1):
+            width = 1 << k
+            if pos + width <= end and max_levels[k][pos] < hi and min_levels[k][pos] > lo:
+                pos += width
+        return pos
+
+
+def narrow_envelope(envelope, price, band_lo=-np.inf, band_hi=np.inf):
+    """
+    Shrinks a trigger envelope (lo, hi, wake) so it excludes the price band [band_lo, band_hi] in which
+    a rule fires, keeping the side the current price is on.
+
+    Returns:
+        tuple: The narrowed envelope, or None when the price is inside the band (the rule can fire now).
+    """
+    if envelope is None:
+        return None
+    lo, hi, wake = envelope
+    if band_lo > band_hi:  # empty band, the rule can never fire
+        return envelope
+    if price < band_lo:
+        return lo, min(hi, band_lo), wake
+    if price > band_hi:
+        return max(lo, band_hi), hi, wake
+    return None
+
+
+def intersect_envelopes(*envelopes):
+    """
+    Intersection of trigger envelopes (lo, hi, wake): highest lo, lowest hi, earliest wake.
+    Returns None when any of them is None (that part cannot tell when it fires).
+    """
+    lo, hi, wake = -np.inf, np.inf, None
+    for envelope in envelopes:
+        if envelope is None:
+            return None
+        lo, hi = max(lo, envelope[0]), min(hi, envelope[1])
+        if envelope[2] is not None:
+            wake = envelope[2] if wake is None else min(wake, envelope[2])
+    return lo, hi, wake
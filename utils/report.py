@@ -0,0 +1,189 @@
+import base64
+import html
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+
+FIGURE_FORMATS = ('png', 'svg', 'html')
+
+
+def _init_headless_worker():
+    """Process pool initializer: every worker renders with the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _save_figure(fig, out_dir, name, formats):
+    """
+    Saves one figure in every requested format and closes it.
+    'html' writes a standalone page with the PNG embedded, so it can be opened without the image files.
+
+    Returns:
+        list: Paths relative to out_dir, in the order of formats.
+    """
+    import matplotlib.pyplot as plt
+
+    paths = []
+    for fmt in formats:
+        rel_path = f"{name}.{fmt}"
+        if fmt == 'html':
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', bbox_inches='tight')
+            encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+            with open(os.path.join(out_dir, rel_path), 'w', encoding='utf-8') as f:
+                f.write(f"<html><head><title>{html.escape(name)}</title></head><body>"
+                        f"<img src=\"data:image/png;base64,{encoded}\"/></body></html>")
+        else:
+            fig.savefig(os.path.join(out_dir, rel_path), format=fmt, bbox_inches='tight')
+        paths.append(rel_path)
+    plt.close(fig)
+    return paths
+
+
+def _render_job(job):
+    """
+    Renders one report job inside a worker process.
+
+    Args:
+        job (tuple): (kind, name, payload, out_dir, formats)
+
+    Returns:
+        tuple: (kind, [(figure_name, [relative paths])])
+    """
+    from utils.plotting_utils import draw_summary_df, plot_candles_with_trades_custom, plot_portfolio_overlay
+
+    kind, name, payload, out_dir, formats = job
+    rendered = []
+    if kind == 'overlay':
+        fig = plot_portfolio_overlay(payload, view='lines', show=False)
+        rendered.append((name, _save_figure(fig, out_dir, name, formats)))
+    elif kind == 'band':
+        fig = plot_portfolio_overlay(payload, view='band', show=False)
+        rendered.append((name, _save_figure(fig, out_dir, name, formats)))
+    elif kind == 'summary':
+        summary_df, initial_cash = payload
+        for fig_name, fig in draw_summary_df(summary_df, initial_cash=initial_cash, show=False):
+            full_name = f"{name}_{fig_name}"
+            rendered.append((full_name, _save_figure(fig, out_dir, full_name, formats)))
+    elif kind == 'coin':
+        df, trades_df, margin = payload
+        fig = plot_candles_with_trades_custom(df, trades_df, only_around_trades=not trades_df.empty, margin=margin,
+                                              title=f"Candlestick Chart with Trades - {name}", show=False)
+        if fig is not None:
+            rendered.append((name, _save_figure(fig, out_dir, f"coin_{name}", formats)))
+    else:
+        raise ValueError(f"Unknown report job kind '{kind}'.")
+    return kind, rendered
+
+
+def coin_data_from_cerebros(all_cerebros):
+    """
+    Pulls the OHLC frame and the recorded round trips out of finished cerebro objects,
+    so they can be shipped to worker processes (cerebro objects themselves do not pickle).
+
+    Args:
+        all_cerebros (dict): {'coin_name': bt.Cerebro} as returned by run_all.
+
+    Returns:
+        dict: {'coin_name': (ohlc_df indexed by datetime, trades_df)}
+    """
+    from utils.runner import get_trades_df
+
+    coin_data = {}
+    for coin_name, cerebro in all_cerebros.items():
+        if cerebro is None or not cerebro.runstrats:
+            continue
+        strategy = cerebro.runstrats[0][0]
+        df = cerebro.datas[0].p.dataname
+        ohlc = df[['datetime', 'open', 'high', 'low', 'close']].set_index('datetime')
+        coin_data[coin_name] = (ohlc, get_trades_df(strategy))
+    return coin_data
+
+
+def _write_index(out_dir, results_df, sections, formats):
+    """Writes index.html with the results table and every rendered figure grouped by section."""
+    preview_fmt = 'png' if 'png' in formats else ('svg' if 'svg' in formats else None)
+    parts = ["<html><head><meta charset=\"utf-8\"><title>Backtest Report</title>",
+             "<style>body{font-family:sans-serif} img{max-width:100%} table{border-collapse:collapse}"
+             " td,th{border:1px solid #ccc;padding:2px 6px}</style></head><body>",
+             "<h1>Backtest Report</h1>"]
+    if results_df is not None:
+        parts.append("<h2>Results</h2>")
+        parts.append(results_df.to_html(index=False, float_format=lambda v: f"{v:.4f}"))
+    for title, figures in sections:
+        if not figures:
+            continue
+        parts.append(f"<h2>{html.escape(title)}</h2>")
+        for fig_name, paths in figures:
+            links = " | ".join(f"<a href=\"{html.escape(p)}\">{html.escape(p.rsplit('.', 1)[-1])}</a>" for p in paths)
+            parts.append(f"<h3>{html.escape(fig_name)}</h3><p>{links}</p>")
+            if preview_fmt:
+                preview = next(p for p in paths if p.endswith('.' + preview_fmt))
+                parts.append(f"<img src=\"{html.escape(preview)}\" loading=\"lazy\"/>")
+    parts.append("</body></html>")
+    index_path = os.path.join(out_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(parts))
+    return index_path
+
+
+def generate_report(results_df, all_portfolio_histories, all_cerebros=None, coin_data=None,
+                    out_dir='report', formats=('png',), workers=None, initial_cash=None,
+                    max_coin_plots=None, margin=60):
+    """
+    Renders a full, non-interactive backtest report to files, using a process pool with the Agg backend.
+
+    Produces the equity overlay and percentile band, the summary charts from draw_summary_df and a
+    candlestick/trade chart per coin, then writes out_dir/index.html linking everything.
+
+    Args:
+        results_df (pd.DataFrame): Aggregated results from run_all.
+        all_portfolio_histories (dict): {'coin_name': pd.Series} from run_all.
+        all_cerebros (dict): {'coin_name': bt.Cerebro} from run_all, used for the per-coin charts.
+        coin_data (dict): Alternative to all_cerebros: {'coin_name': (ohlc_df, trades_df)}.
+        out_dir (str): Output folder (created if missing).
+        formats (tuple): Any of 'png', 'svg', 'html'.
+        workers (int): Number of worker processes (None = os.cpu_count()).
+        initial_cash (float): Passed to draw_summary_df (defaults to results_df['start_value']).
+        max_coin_plots (int): Only render the first N coins (None = all).
+        margin (int): Seconds shown around the trades in each coin chart.
+
+    Returns:
+        str: Path of the written index.html.
+    """
+    unknown = set(formats) - set(FIGURE_FORMATS)
+    if unknown:
+        raise ValueError(f"Unsupported report formats {sorted(unknown)}, expected any of {FIGURE_FORMATS}.")
+    os.makedirs(out_dir, exist_ok=True)
+
+    if coin_data is None and all_cerebros:
+        coin_data = coin_data_from_cerebros(all_cerebros)
+    coin_data = coin_data or {}
+
+    histories = {k: v for k, v in (all_portfolio_histories or {}).items() if isinstance(v, pd.Series)}
+    jobs = []
+    if histories:
+        jobs.append(('overlay', 'equity_overlay', histories, out_dir, formats))
+        jobs.append(('band', 'equity_band', histories, out_dir, formats))
+    if results_df is not None and not results_df.empty:
+        jobs.append(('summary', 'summary', (results_df.copy(), initial_cash), out_dir, formats))
+    for i, (coin_name, (df, trades_df)) in enumerate(coin_data.items()):
+        if max_coin_plots is not None and i >= max_coin_plots:
+            break
+        jobs.append(('coin', coin_name, (df, trades_df, margin), out_dir, formats))
+
+    print(f"[REPORT] Rendering {len(jobs)} jobs to {out_dir} with {workers or os.cpu_count()} workers.")
+    rendered = {'overlay': [], 'band': [], 'summary': [], 'coin': []}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_headless_worker) as pool:
+        for kind, figures in pool.map(_render_job, jobs):
+            rendered[kind].extend(figures)
+
+    sections = [("Equity Overlay", rendered['overlay'] + rendered['band']),
+                ("Summary", rendered['summary']),
+                ("Coins", rendered['coin'])]
+    index_path = _write_index(out_dir, results_df, sections, formats)
+    print(f"[REPORT] Wrote {index_path}")
+    return index_path
@@ -0,0 +1,211 @@
+import ast
+import hashlib
+import inspect
+import json
+import os
+import pickle
+
+
+# Code outside this folder (backtrader, numpy, ...) is versioned by its package, not hashed
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_COLUMNS = ('datetime', 'open', 'high', 'low', 'close', 'volume')
+
+
+def data_hash(df):
+    """Hash of the columns a backtest reads from a ready_df DataFrame."""
+    h = hashlib.sha256()
+    for column in DATA_COLUMNS:
+        if column in df:
+            values = df[column].to_numpy()
+            h.update(column.encode())
+            h.update(str(values.dtype).encode())
+            h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def _project_file(obj):
+    try:
+        path = os.path.abspath(inspect.getsourcefile(obj))
+    except TypeError:  # builtins
+        return None
+    return path if path.startswith(PROJECT_ROOT + os.sep) else None
+
+
+def _module_file(name):
+    """Project file of a dotted module name (a package's __init__.py), None outside the project."""
+    base = os.path.join(PROJECT_ROOT, *name.split('.'))
+    for path in (base + '.py', os.path.join(base, '__init__.py')):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+_IMPORTS = {}
+
+
+def _imported_files(path):
+    """Project files a source file imports, function-level (lazy) imports included."""
+    if path not in _IMPORTS:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read(), filename=path)
+        package = os.path.relpath(os.path.dirname(path), PROJECT_ROOT).split(os.sep)
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                parent = package[:len(package) - node.level + 1] if node.level else []
+                module = '.'.join([*parent, *([node.module] if node.module else [])])
+                # `from a import b` imports a, and a.b when b is a submodule
+                modules = [module] + [f"{module}.{alias.name}" if module else alias.name for alias in node.names]
+            else:
+                continue
+            for module in modules:
+                parts = module.split('.')
+                names.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))  # parent packages run too
+        _IMPORTS[path] = {file for file in map(_module_file, names) if file is not None}
+    return _IMPORTS[path]
+
+
+def source_files(*roots):
+    """
+    Project source files the given files depend on: the files themselves and every project module
+    they import, transitively. Code outside the project is left out, so editing a module nothing in
+    the closure imports (plotting, reports, another strategy) keeps the cache.
+    """
+    files = set()
+    stack = [path for path in roots if path is not None]
+    while stack:
+        path = stack.pop()
+        if path not in files:
+            files.add(path)
+            stack.extend(_imported_files(path))
+    return sorted(files)
+
+
+def _files_hash(h, paths):
+    for path in paths:
+        h.update(os.path.relpath(path, PROJECT_ROOT).encode())
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+_RUNNER_HASH = None
+
+
+def runner_hash():
+    """Hash of the import closure of the runner and the data feeds (analyzers, result extraction)."""
+    global _RUNNER_HASH
+    if _RUNNER_HASH is None:
+        _RUNNER_HASH = _files_hash(hashlib.sha256(), source_files(_module_file('utils.runner'),
+                                                                  _module_file('utils.feeds')))
+    return _RUNNER_HASH
+
+
+_SOURCE_HASHES = {}
+
+
+def source_hash(cls):
+    """
+    Hash of a class's qualified name and of the import closure (see source_files) of the project
+    modules defining it and its base classes. None hashes as ''.
+    """
+    if cls is None:
+        return ''
+    if cls not in _SOURCE_HASHES:
+        h = hashlib.sha256(f"{cls.__module__}.{cls.__qualname__}".encode())
+        _SOURCE_HASHES[cls] = _files_hash(h, source_files(*map(_project_file, inspect.getmro(cls))))
+    return _SOURCE_HASHES[cls]
+
+
+def backtest_key(df, strategy_class, sizer_class=None, commission_class=None, **run_kwargs):
+    """
+    Content address of one backtest: hash of the fed data, of the import closures of the strategy /
+    sizer / commission classes and of the runner (see source_files), and every other run argument
+    (params, cash, mcap mode, options). Source hashes are computed once per process.
+
+    Returns:
+        str: Hex digest.
+    """
+    h = hashlib.sha256()
+    h.update(data_hash(df).encode())
+    h.update(runner_hash().encode())
+    for cls in (strategy_class, sizer_class, commission_class):
+        h.update(source_hash(cls).encode())
+    h.update(json.dumps(run_kwargs, sort_keys=True, default=repr).encode())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of backtest outputs, one pickle per key, evicted least recently used first once
+    the folder holds more than max_bytes. Safe to share between the processes of one sweep
+    (writes are atomic, a file evicted by another process is a miss).
+    """
+
+    def __init__(self, cache_dir='.backtest_cache', max_bytes=2 * 1024 ** 3):
+        """
+        Args:
+            cache_dir (str): Folder of the cache (created if missing).
+            max_bytes (int): Size limit of the folder.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def get(self, key):
+        """Cached value of key, or None. A hit refreshes the entry's LRU position."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Stores value under key, then evicts the oldest entries while the cache is over max_bytes."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.pkl'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes every entry."""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl'):
+                os.remove(entry.path)
@@ -0,0 +1,195 @@
+import datetime
+import hashlib
+import json
+import numbers
+import os
+import sqlite3
+
+import pandas as pd
+
+
+METRIC_COLUMNS = ('start_value', 'final_value', 'sharpe_ratio', 'max_drawdown', 'total_trades',
+                  'winning_trades', 'losing_trades', 'annualized_return', 'start_bar', 'end_bar')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    sizer TEXT,
+    strategy_params TEXT NOT NULL,
+    sizer_params TEXT,
+    cash REAL,
+    mcap INTEGER,
+    options TEXT,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS coin_results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    coin TEXT NOT NULL,
+    start_value REAL,
+    final_value REAL,
+    sharpe_ratio REAL,
+    max_drawdown REAL,
+    total_trades INTEGER,
+    winning_trades INTEGER,
+    losing_trades INTEGER,
+    annualized_return REAL,
+    start_bar INTEGER,
+    end_bar INTEGER,
+    equity_path TEXT,
+    trades_path TEXT,
+    PRIMARY KEY (run_id, coin)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_config ON runs(config_hash);
+CREATE INDEX IF NOT EXISTS idx_runs_strategy ON runs(strategy);
+CREATE INDEX IF NOT EXISTS idx_results_coin ON coin_results(coin);
+CREATE INDEX IF NOT EXISTS idx_results_trades ON coin_results(total_trades, run_id);
+"""
+
+
+def _class_name(cls):
+    return None if cls is None else f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _to_json(value):
+    return json.dumps(value or {}, sort_keys=True, default=repr)
+
+
+def _number(value):
+    """Metric value as stored: numbers as is, 'N/A' / None / nan as NULL."""
+    if isinstance(value, numbers.Number) and value == value:
+        return value.item() if hasattr(value, 'item') else value
+    return None
+
+
+class RunRegistry:
+    """
+    SQLite registry of backtest runs: one row per run_all call (strategy, params, options) and one
+    row per coin with the metrics of analysis_results and the paths of the stored equity curve and trades.
+    Identical configurations share a config_hash, so results of repeated runs group together.
+    """
+
+    def __init__(self, db_path='runs.sqlite', artifact_dir=None):
+        """
+        Args:
+            db_path (str): SQLite database file (created if missing).
+            artifact_dir (str): Folder of the equity curves and trades (default: 'runs_artifacts' next to db_path).
+        """
+        self.db_path = db_path
+        self.artifact_dir = artifact_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), 'runs_artifacts')
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, results_df, strategy_class, strategy_params=None, sizer_class=None, sizer_params=None,
+                   cash=None, mcap=False, histories=None, trades=None, options=None, note=None):
+        """
+        Records one run_all output.
+
+        Args:
+            results_df (pd.DataFrame): run_all results (one row per coin).
+            strategy_class, strategy_params, sizer_class, sizer_params, cash, mcap: The run configuration.
+            histories (dict): {'coin': cash history series} to store as equity curves.
+            trades (dict): {'coin': trades DataFrame} (see utils.runner.get_trades_df) to store.
+            options (dict): Other run_all options worth keeping (trim_pre_migration, ...).
+            note (str): Free text.
+
+        Returns:
+            int: The run_id.
+        """
+        config = {'strategy': _class_name(strategy_class), 'sizer': _class_name(sizer_class),
+                  'strategy_params': strategy_params or {}, 'sizer_params': sizer_params or {},
+                  'cash': cash, 'mcap': bool(mcap)}
+        config_hash = hashlib.sha256(_to_json(config).encode()).hexdigest()[:16]
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created_at, config_hash, strategy, sizer, strategy_params, sizer_params, cash, mcap, options, note)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (datetime.datetime.now().isoformat(timespec='seconds'), config_hash, config['strategy'], config['sizer'],
+                 _to_json(strategy_params), _to_json(sizer_params), cash, int(bool(mcap)), _to_json(options), note))
+            run_id = cursor.lastrowid
+            run_dir = os.path.join(self.artifact_dir, f"run_{run_id}")
+            rows = []
+            for result in results_df.to_dict('records'):
+                coin = str(result['coin'])
+                equity_path = trades_path = None
+                history = histories.get(coin) if histories is not None else None  # read once (lazy mappings)
+                if history is not None:
+                    os.makedirs(run_dir, exist_ok=True)
+                    equity_path = os.path.join(run_dir, f"{coin}_equity.parquet")
+                    history.rename('value').to_frame().to_parquet(equity_path)
+                if trades is not None and trades.get(coin) is not None:
+                    os.makedirs(run_dir, exist_ok=True)
+                    trades_path = os.path.join(run_dir, f"{coin}_trades.parquet")
+                    trades[coin].to_parquet(trades_path)
+                rows.append((run_id, coin, *(_number(result.get(c)) for c in METRIC_COLUMNS), equity_path, trades_path))
+            self.conn.executemany(
+                f"INSERT INTO coin_results (run_id, coin, {', '.join(METRIC_COLUMNS)}, equity_path, trades_path)"
+                f" VALUES ({', '.join('?' * (len(METRIC_COLUMNS) + 4))})", rows)
+        print(f"[RUN] Registered run {run_id} ({len(rows)} coins, config {config_hash})")
+        return run_id
+
+    def query(self, sql, params=()):
+        """Runs any SQL query on the registry and returns a DataFrame."""
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def runs(self, strategy=None):
+        """The runs table, newest first (optionally for one strategy class name)."""
+        if strategy is None:
+            return self.query("SELECT * FROM runs ORDER BY run_id DESC")
+        return self.query("SELECT * FROM runs WHERE strategy LIKE ? ORDER BY run_id DESC", (f"%{strategy}",))
+
+    def results(self, run_id):
+        """Per-coin results of one run."""
+        return self.query("SELECT * FROM coin_results WHERE run_id = ? ORDER BY coin", (run_id,))
+
+    def top_params(self, metric='final_value', min_trades=0, limit=10, strategy=None):
+        """
+        Configurations ranked by the median of a metric over their coins with more than min_trades trades.
+        Repeated runs of one configuration are pooled.
+
+        Args:
+            metric (str): One of METRIC_COLUMNS.
+            min_trades (int): Only coins with more trades than this count.
+            limit (int): Number of configurations returned.
+            strategy (str): Only runs of this strategy class name.
+
+        Returns:
+            pd.DataFrame: config_hash, strategy, strategy_params, sizer_params, median, coins, runs.
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {METRIC_COLUMNS}.")
+        strategy_filter = "AND r.strategy LIKE ?" if strategy else ""
+        params = (min_trades, f"%{strategy}") if strategy else (min_trades,)
+        return self.query(f"""
+            WITH filtered AS (
+                SELECT r.config_hash, r.run_id, c.{metric} AS value,
+                       ROW_NUMBER() OVER (PARTITION BY r.config_hash ORDER BY c.{metric}) AS rn,
+                       COUNT(*) OVER (PARTITION BY r.config_hash) AS n
+                FROM coin_results c JOIN runs r ON r.run_id = c.run_id
+                WHERE c.total_trades > ? AND c.{metric} IS NOT NULL {strategy_filter}
+            ),
+            medians AS (
+                SELECT config_hash, AVG(value) AS median, MAX(n) AS coins
+                FROM filtered WHERE rn IN ((n + 1) / 2, (n + 2) / 2) GROUP BY config_hash
+            )
+            SELECT m.config_hash, r.strategy, r.strategy_params, r.sizer_params, m.median, m.coins,
+                   COUNT(DISTINCT r.run_id) AS runs
+            FROM medians m JOIN runs r ON r.config_hash = m.config_hash
+            GROUP BY m.config_hash
+            ORDER BY m.median DESC
+            LIMIT {int(limit)}""", params)
+
+    def load_equity(self, run_id, coin):
+        """Stored equity curve (cash history series) of a coin in a run, None if it was not stored."""
+        path = self.conn.execute("SELECT equity_path FROM coin_results WHERE run_id = ? AND coin = ?", (run_id, coin)).fetchone()
+        return pd.read_parquet(path[0])['value'] if path and path[0] else None
+
+    def load_trades(self, run_id, coin):
+        """Stored trades DataFrame of a coin in a run, None if it was not stored."""
+        path = self.conn.execute("SELECT trades_path FROM coin_results WHERE run_id = ? AND coin = ?", (run_id, coin)).fetchone()
+        return pd.read_parquet(path[0]) if path and path[0] else None
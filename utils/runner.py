@@ -1,12 +1,25 @@
 import pandas as pd
 import numpy as np
+import collections
+import functools
+import math
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 import backtrader as bt
 from commissions.CustomSolanaCommission import CustomSolanaCommission
 from sizers.FiboMartingaleSizer import FiboMartingaleSizer
 from strategies import FiboMartingaleStrategy
-from utils.data_utils import ready_df
+from utils.data_utils import find_migration_bar, read_chart, ready_df
+from utils.checkpoint import RunCheckpoint
+from utils.indicator_cache import IndicatorCache
+from utils.lifecycle import select_charts
+from utils.manifest import build_manifest
+from utils.feeds import NumpyData, chart_arrays, num2date_array
+from utils.prefetch import PrefetchLoader
+from utils.range_index import RangeExtremeIndex
+from utils.result_cache import backtest_key
 
 
 class CashHistoryAnalyzer(bt.Analyzer):
@@ -29,6 +42,198 @@ class CashHistoryAnalyzer(bt.Analyzer):
         return self.cash_history
 
 
+class TradeListAnalyzer(bt.Analyzer):
+    """
+    An analyzer that records every round trip (first buy until the position is flat again)
+    with its entry/exit time, bar index and average prices, in the format expected by
+    plot_candles_with_trades_custom. The executed orders are kept in .orders as well
+    (bar, signed size, price, commission, broker cash after the fill), for replaying them
+    (see utils.portfolio).
+    """
+
+    def __init__(self):
+        self.trades = []
+        self.orders = []
+        self._open = None
+
+    def notify_order(self, order):
+        if order.status != order.Completed:
+            return
+        dt = self.strategy.data.datetime.datetime(0)
+        bar = len(self.strategy.data) - 1
+        self.orders.append((bar, order.executed.size, order.executed.price, order.executed.comm,
+                            self.strategy.broker.getcash()))
+        if order.isbuy():
+            if self._open is None:
+                self._open = {'buy_time': dt, 'buy_bar': bar, 'cost': 0.0, 'size': 0.0, 'proceeds': 0.0, 'sold': 0.0}
+            self._open['cost'] += order.executed.price * order.executed.size
+            self._open['size'] += order.executed.size
+        elif self._open is not None:
+            self._open['proceeds'] += order.executed.price * abs(order.executed.size)
+            self._open['sold'] += abs(order.executed.size)
+            if self.strategy.getposition(self.strategy.data).size == 0:
+                trade = self._open
+                self._open = None
+                self.trades.append({
+                    'buy_time': trade['buy_time'],
+                    'sell_time': dt,
+                    'buy_bar': trade['buy_bar'],
+                    'sell_bar': bar,
+                    'buy_price': trade['cost'] / trade['size'],
+                    'sell_price': trade['proceeds'] / trade['sold'],
+                    'size': trade['size'],
+                })
+
+    def notify_trade(self, trade):
+        if trade.isclosed and self.trades:
+            self.trades[-1]['pnl'] = trade.pnl
+            self.trades[-1]['pnlcomm'] = trade.pnlcomm
+
+    def get_analysis(self):
+        return self.trades
+
+
+def _period_keys(datetimes, timeframe, compression=1):
+    """
+    Integer period of every datetime64 for a backtrader timeframe: a new key starts a new period,
+    like TimeFrameAnalyzerBase._dt_over (weeks start on Monday, compression only applies below Days).
+    """
+    TF = bt.TimeFrame
+    if timeframe == TF.Years:
+        return datetimes.astype('datetime64[Y]').astype(np.int64)
+    if timeframe == TF.Months:
+        return datetimes.astype('datetime64[M]').astype(np.int64)
+    days = datetimes.astype('datetime64[D]').astype(np.int64)
+    if timeframe == TF.Weeks:
+        return (days + 3) // 7  # 1970-01-01 is a Thursday
+    if timeframe == TF.Days:
+        return days
+    unit = {TF.Minutes: 'm', TF.Seconds: 's'}.get(timeframe, 'us')
+    per_day = {'m': 1440, 's': 86400, 'us': 86_400_000_000}[unit]
+    in_day = datetimes.astype(f'datetime64[{unit}]').astype(np.int64) - days * per_day
+    return days * per_day + in_day // compression
+
+
+def _count_periods(keys):
+    """Number of bars whose period key is above every previous one (TimeFrameAnalyzerBase period count)."""
+    if not len(keys):
+        return 0
+    previous_max = np.concatenate(([np.iinfo(np.int64).min], np.maximum.accumulate(keys)[:-1]))
+    return int(np.count_nonzero(keys > previous_max))
+
+
+class FusedAnalyzer(bt.Analyzer):
+    """
+    Single analyzer for everything run_backtest_for_df reads, replacing SharpeRatio, DrawDown,
+    TradeAnalyzer, Returns, PositionsValue and CashHistoryAnalyzer.
+
+    Per bar it only stores the datetime, value, cash and position values into preallocated arrays;
+    closed trades go into a pnl ledger. Sharpe ratio (yearly, like SharpeRatio's defaults), max drawdown,
+    returns and won/lost counts are computed with numpy at stop(), following the same formulas.
+    """
+    params = (
+        ('riskfreerate', 0.01),
+    )
+
+    def start(self):
+        size = max(self.data.buflen(), 1)
+        self._count = 0
+        self._datetime = np.empty(size)
+        self._values = np.empty(size)
+        self._cash = np.empty(size)
+        self._positions = np.empty((size, len(self.datas)))
+        self._value = self._value_start = self.strategy.broker.getvalue()
+        self._pnlcomm = []
+        self.rets = {}
+
+    def notify_fund(self, cash, value, fundvalue, shares):
+        self._value = value
+
+    def notify_trade(self, trade):
+        if trade.status == trade.Closed:
+            self._pnlcomm.append(trade.pnlcomm)
+
+    def next(self):
+        i = self._count
+        if i == len(self._datetime):  # not preloaded, the buffer grows with the data
+            self._datetime, self._values, self._cash, self._positions = (
+                np.concatenate((a, np.empty_like(a))) for a in (self._datetime, self._values, self._cash, self._positions))
+        broker = self.strategy.broker
+        self._datetime[i] = self.strategy.datetime[0]
+        self._values[i] = self._value
+        self._cash[i] = broker.get_cash()
+        for j, data in enumerate(self.datas):
+            self._positions[i, j] = broker.get_value([data])
+        self._count = i + 1
+
+    def stop(self):
+        n = self._count
+        datetimes = num2date_array(self._datetime[:n])
+        values = self._values[:n]
+
+        # DrawDown: percentage below the running peak
+        max_drawdown = 0.0
+        if n:
+            peak = np.maximum.accumulate(values)
+            max_drawdown = max(max_drawdown, float((100.0 * (peak - values) / peak).max()))
+
+        # SharpeRatio (timeframe Years): one return per calendar year, from the value at the end of the previous one
+        year_ends = np.flatnonzero(np.diff(_period_keys(datetimes, bt.TimeFrame.Years), append=np.iinfo(np.int64).max))
+        ends = values[year_ends]
+        returns = (ends / np.concatenate(([self._value_start], ends[:-1])) - 1.0).tolist()
+        rate = pow(1.0 + self.p.riskfreerate, 1.0 / bt.analyzers.SharpeRatio.RATEFACTORS[bt.TimeFrame.Years]) - 1.0
+        sharpe = None
+        if returns:
+            ret_free = [r - rate for r in returns]
+            ret_free_avg = bt.mathsupport.average(ret_free)
+            try:
+                sharpe = ret_free_avg / bt.mathsupport.standarddev(ret_free, avgx=ret_free_avg)
+            except (ValueError, TypeError, ZeroDivisionError):
+                sharpe = None
+
+        # Returns: log return averaged over the periods of the data timeframe
+        value_end = self.strategy.broker.getvalue()
+        try:
+            rtot = math.log(value_end / self._value_start) if value_end / self._value_start >= 0 else float('-inf')
+        except (ValueError, ZeroDivisionError):
+            rtot = float('-inf')
+        tcount = _count_periods(_period_keys(datetimes, self.data._timeframe, self.data._compression))
+        ravg = rtot / tcount if tcount else float('nan')
+        tann = bt.analyzers.Returns._TANN.get(self.data._timeframe, 1.0)
+        rnorm = math.expm1(ravg * tann) if ravg > float('-inf') else ravg
+
+        pnlcomm = np.asarray(self._pnlcomm, dtype=float)
+        won = int(np.count_nonzero(pnlcomm >= 0.0))
+        self.rets = {
+            'sharperatio': sharpe,
+            'max_drawdown': max_drawdown,
+            'closed': len(pnlcomm),
+            'won': won,
+            'lost': len(pnlcomm) - won,
+            'rtot': rtot,
+            'ravg': ravg,
+            'rnorm': rnorm,
+            'rnorm100': rnorm * 100.0,
+            'tcount': tcount,
+            'datetime': datetimes,
+            'value': values,
+            'cash': self._cash[:n],
+            'positions_value': self._positions[:n],
+        }
+
+    def get_analysis(self):
+        return self.rets
+
+
+def get_trades_df(strategy):
+    """
+    Returns the round trips recorded by TradeListAnalyzer as a DataFrame
+    (empty DataFrame with the expected columns when nothing was traded).
+    """
+    columns = ['buy_time', 'sell_time', 'buy_bar', 'sell_bar', 'buy_price', 'sell_price', 'size', 'pnl', 'pnlcomm']
+    return pd.DataFrame(strategy.analyzers.mytrades.get_analysis(), columns=columns)
+
+
 def _configure_cerebro(
     cerebro: bt.Cerebro,
     df: pd.DataFrame,
@@ -38,25 +243,37 @@ def _configure_cerebro(
     sizer_params: dict,
     commission_class: type,
     initial_cash: float,
-    is_mcap: bool
+    is_mcap: bool,
+    numpy_feed: bool = False,
+    fused_analyzer: bool = False,
+    feed_arrays: dict = None
 ):
     """
     Helper function to configure a Backtrader Cerebro object.
+    With numpy_feed the chart is fed through utils.feeds.NumpyData (bulk preload) instead of PandasData,
+    built on feed_arrays (utils.feeds.chart_arrays of df) when given.
+    With fused_analyzer the statistics come from one FusedAnalyzer and no observers are added
+    (create the cerebro with stdstats=False too), cerebro.plot() then has no broker/trades panels.
     """
     print(f"[RUN] Strategy: {strategy_class.__name__}, Params: {strategy_params}")
     cerebro.addstrategy(strategy_class, **strategy_params)
 
-    data = bt.feeds.PandasData(
-        dataname=df,
-        datetime='datetime',
-        open='open',
-        high='high',
-        low='low',
-        close='close',
-        volume='volume',
-        timeframe=bt.TimeFrame.Seconds,
-        compression=1
-    )
+    if numpy_feed and feed_arrays is not None:
+        data = NumpyData.from_arrays(feed_arrays, dataname=df, timeframe=bt.TimeFrame.Seconds, compression=1)
+    elif numpy_feed:
+        data = NumpyData.from_df(df, dataname=df, timeframe=bt.TimeFrame.Seconds, compression=1)
+    else:
+        data = bt.feeds.PandasData(
+            dataname=df,
+            datetime='datetime',
+            open='open',
+            high='high',
+            low='low',
+            close='close',
+            volume='volume',
+            timeframe=bt.TimeFrame.Seconds,
+            compression=1
+        )
     cerebro.adddata(data)
 
     # REGISTER YOUR SIZER
@@ -73,6 +290,12 @@ def _configure_cerebro(
     print(f"[RUN] Commission: {commission_class.__name__}")
     cerebro.broker.addcommissioninfo(commission_class())
 
+    if fused_analyzer:
+        print("[RUN] Adding Fused Analyzer.")
+        cerebro.addanalyzer(FusedAnalyzer, _name='myfused')
+        cerebro.addanalyzer(TradeListAnalyzer, _name='mytrades')
+        return
+
     # Add analyzers
     print("[RUN] Adding Analyzers and Observers.")
     cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='mysharpe')
@@ -81,6 +304,7 @@ def _configure_cerebro(
     cerebro.addanalyzer(bt.analyzers.Returns, _name='myreturns')
     cerebro.addanalyzer(bt.analyzers.PositionsValue, _name='mypositionsvalue')  # To get portfolio history
     cerebro.addanalyzer(CashHistoryAnalyzer, _name='mycashvalue')         # To get CASH history
+    cerebro.addanalyzer(TradeListAnalyzer, _name='mytrades')              # Round trips for trade plots / reports
 
     # Add observers (for plotting later)
     cerebro.addobserver(bt.observers.Broker)
@@ -88,6 +312,52 @@ def _configure_cerebro(
     cerebro.addobserver(bt.observers.Trades)
 
 
+def _pre_migration_start(df, strategy_class, strategy_params, warmup_bars, lifecycle=None):
+    """
+    First bar to feed when the pre-migration part of a chart is trimmed: the migration bar minus
+    warmup_bars for the indicators, or the last warmup_bars bars when the chart never migrates.
+    Returns 0 for strategies without the migration params.
+    The migration bar comes from the chart's lifecycle entry (utils.lifecycle) when it was found with
+    the strategy's threshold, else df is scanned.
+    """
+    params = dict(strategy_class.params._getitems())
+    if 'migration_market_cap' not in params:
+        return 0
+    params.update(strategy_params)
+    if lifecycle is not None and lifecycle.get('migration_market_cap') == params['migration_market_cap']:
+        migration_bar = lifecycle['migration_bar']
+    else:
+        migration_bar = find_migration_bar(df, params['migration_market_cap'], params['data_in_market_cap'])
+    if migration_bar is None or migration_bar > len(df):
+        migration_bar = len(df)
+    return max(0, migration_bar - warmup_bars)
+
+
+def _flat_history(datetimes, value):
+    """
+    History series holding value on each of datetimes, for bars that were not run through cerebro.
+    The datetimes take the same float round trip as the ones backtrader reports for the fed bars.
+    """
+    index = pd.DatetimeIndex([bt.num2date(bt.date2num(dt)) for dt in datetimes])
+    return pd.Series([value] * len(index), index=index)
+
+
+def _rebased_annualized_return(strategy, extra_bars):
+    """
+    Annualized return (rnorm100) of the Returns analyzer spread over extra_bars flat bars that were not fed.
+    """
+    if hasattr(strategy.analyzers, 'myfused'):
+        returns = strategy.analyzers.myfused.get_analysis()
+        tcount = returns['tcount']
+    else:
+        returns = strategy.analyzers.myreturns.get_analysis()
+        tcount = strategy.analyzers.myreturns._tcount
+    rnorm = returns.get('rnorm')
+    if rnorm is None or not rnorm > -1 or not tcount:
+        return returns.get('rnorm100', 'N/A')
+    return math.expm1(math.log1p(rnorm) * tcount / (tcount + extra_bars)) * 100.0
+
+
 def run_backtest_for_df(df, coin_name,
                         sizer_class=None,
                         strategy_class=None,
@@ -96,7 +366,17 @@ def run_backtest_for_df(df, coin_name,
                         strategy_params=None,
                         sizer_params=None,
                         mcap=False,
-                        print_cash_history=False
+                        print_cash_history=False,
+                        use_range_index=False,
+                        event_skipping=False,
+                        trim_pre_migration=False,
+                        warmup_bars=300,
+                        stop_when_finished=False,
+                        numpy_feed=False,
+                        fused_analyzer=False,
+                        feed_arrays=None,
+                        indicator_cache=None,
+                        lifecycle=None
                         ):
     """
     Runs a backtest for a single DataFrame and returns results and the cerebro object.
@@ -106,14 +386,50 @@ def run_backtest_for_df(df, coin_name,
         df (pd.DataFrame): The dataframe containing OHLCV data.
         coin_name (str): The name of the coin for identification in results.
         strategy_class: The Backtrader strategy class to use.
+        use_range_index (bool): Build a RangeExtremeIndex over df and pass it as the strategy's
+                                'range_index' param (only if the strategy has that param).
+        event_skipping (bool): Turn on the strategy's 'event_skipping' param (only if the strategy has it).
+        trim_pre_migration (bool): Start the feed warmup_bars before the migration bar. The strategy does
+                                   nothing before migration, so the skipped bars are added back to the
+                                   history as flat cash and the annualized return is re-based on them.
+                                   The bar where the feed starts is returned as 'start_bar'.
+        warmup_bars (int): Bars kept before the migration bar for the indicators to warm up.
+        stop_when_finished (bool): Turn on the strategy's 'stop_when_finished' param (only if the strategy
+                                   has it): the run stops once the strategy reaches a terminal state, the
+                                   remaining bars are filled with the final value and the bar after the
+                                   last one run is returned as 'end_bar'.
+        numpy_feed (bool): Feed the chart with utils.feeds.NumpyData instead of bt.feeds.PandasData.
+        fused_analyzer (bool): Collect the results with FusedAnalyzer instead of the six analyzers and
+                               the observers (same result keys and histories).
+        feed_arrays (dict): utils.feeds.chart_arrays of df, reused by the numpy feed (see run_configs_for_df).
+        indicator_cache (IndicatorCache): Passed as the strategy's 'indicator_cache' param (only if the
+                                          strategy has it).
+        lifecycle (dict): Lifecycle events of df (manifest entry, see utils.lifecycle), trim_pre_migration
+                          takes the migration bar from it instead of scanning df.
 
     Returns:
         tuple: (dict of analysis results, bt.Cerebro object)
     """
     strategy_params = strategy_params or {}
     sizer_params = sizer_params or {}
-
-    cerebro = bt.Cerebro()
+    start_bar = 0
+    if trim_pre_migration:
+        start_bar = _pre_migration_start(df, strategy_class, strategy_params, warmup_bars, lifecycle=lifecycle)
+        skipped_datetimes = df['datetime'].iloc[:start_bar]
+        df = df.iloc[start_bar:]
+        if feed_arrays is not None:
+            feed_arrays = {name: values[start_bar:] for name, values in feed_arrays.items()}
+        print(f'[RUN] Trimmed {start_bar} pre-migration bars of {coin_name}')
+    if use_range_index and 'range_index' in strategy_class.params._getkeys():
+        strategy_params = dict(strategy_params, range_index=RangeExtremeIndex.from_df(df))
+    if event_skipping and 'event_skipping' in strategy_class.params._getkeys():
+        strategy_params = dict(strategy_params, event_skipping=True)
+    if stop_when_finished and 'stop_when_finished' in strategy_class.params._getkeys():
+        strategy_params = dict(strategy_params, stop_when_finished=True)
+    if indicator_cache is not None and 'indicator_cache' in strategy_class.params._getkeys():
+        strategy_params = dict(strategy_params, indicator_cache=indicator_cache)
+
+    cerebro = bt.Cerebro(stdstats=not fused_analyzer)
 
     _configure_cerebro(
         cerebro=cerebro,
@@ -124,7 +440,10 @@ def run_backtest_for_df(df, coin_name,
         sizer_params=sizer_params,
         commission_class=commission_class,
         initial_cash=cash,
-        is_mcap=mcap
+        is_mcap=mcap,
+        numpy_feed=numpy_feed,
+        fused_analyzer=fused_analyzer,
+        feed_arrays=feed_arrays
     )
 
     if mcap:
@@ -136,49 +455,93 @@ def run_backtest_for_df(df, coin_name,
     strategy = results[0]
     print("[RUN] Cerebro Ended.")
 
+    # Bars of df left unprocessed when the strategy stopped the run
+    remaining_datetimes = df['datetime'].iloc[len(strategy.data):]
+    if len(remaining_datetimes):
+        print(f'[RUN] Strategy finished at bar {start_bar + len(strategy.data)}, '
+              f'skipped the remaining {len(remaining_datetimes)} bars of {coin_name}')
+
     final_portfolio_value = cerebro.broker.getvalue()
     if mcap:
         final_portfolio_value = final_portfolio_value / 1_000_000_000
     print(f'[RUN] Final Portfolio Value for {coin_name}: {final_portfolio_value:.2f}')
 
     # Extract analysis results
-    analysis_results = {
-        'coin': coin_name,
-        'start_value': cash,
-        'final_value': final_portfolio_value,
-        'sharpe_ratio': strategy.analyzers.mysharpe.get_analysis().get('sharperatio', 'N/A'),
-        'max_drawdown': strategy.analyzers.mydrawdown.get_analysis().get('max', {}).get('drawdown', 'N/A'),
-        'total_trades': strategy.analyzers.mytradeanalyzer.get_analysis().get('total', {}).get('closed', 0),
-        'winning_trades': strategy.analyzers.mytradeanalyzer.get_analysis().get('won', {}).get('total', 0),
-        'losing_trades': strategy.analyzers.mytradeanalyzer.get_analysis().get('lost', {}).get('total', 0),
-        'annualized_return': strategy.analyzers.myreturns.get_analysis().get('rnorm100', 'N/A')
-    }
+    if fused_analyzer:
+        fused = strategy.analyzers.myfused.get_analysis()
+        analysis_results = {
+            'coin': coin_name,
+            'start_value': cash,
+            'final_value': final_portfolio_value,
+            'sharpe_ratio': fused['sharperatio'],
+            'max_drawdown': fused['max_drawdown'],
+            'total_trades': fused['closed'],
+            'winning_trades': fused['won'],
+            'losing_trades': fused['lost'],
+            'annualized_return': fused['rnorm100']
+        }
+    else:
+        analysis_results = {
+            'coin': coin_name,
+            'start_value': cash,
+            'final_value': final_portfolio_value,
+            'sharpe_ratio': strategy.analyzers.mysharpe.get_analysis().get('sharperatio', 'N/A'),
+            'max_drawdown': strategy.analyzers.mydrawdown.get_analysis().get('max', {}).get('drawdown', 'N/A'),
+            'total_trades': strategy.analyzers.mytradeanalyzer.get_analysis().get('total', {}).get('closed', 0),
+            'winning_trades': strategy.analyzers.mytradeanalyzer.get_analysis().get('won', {}).get('total', 0),
+            'losing_trades': strategy.analyzers.mytradeanalyzer.get_analysis().get('lost', {}).get('total', 0),
+            'annualized_return': strategy.analyzers.myreturns.get_analysis().get('rnorm100', 'N/A')
+        }
+    if trim_pre_migration:
+        analysis_results['start_bar'] = start_bar
+    if stop_when_finished:
+        analysis_results['end_bar'] = start_bar + len(strategy.data)
+    if start_bar or len(remaining_datetimes):
+        # Returns averages over the bars it saw, spread it over the flat bars that were not fed too
+        analysis_results['annualized_return'] = _rebased_annualized_return(strategy, start_bar + len(remaining_datetimes))
     print('Analyze:')
     for k, v in analysis_results.items():
         print("[RUN] ", k, v)
 
-    # Extract portfolio history for plotting
-    portfolio_history = {}
-    for dt, value_list in strategy.analyzers.mypositionsvalue.get_analysis().items():
-        np_value_array = np.array(value_list)
+    if fused_analyzer:
+        # Same series as the dict based analyzers below: one entry per datetime (last bar wins), sorted
+        index = pd.DatetimeIndex(fused['datetime'])
+        positions_value = fused['positions_value'] / 1_000_000_000 if mcap else fused['positions_value']
+        portfolio_history_series = pd.Series(positions_value.tolist(), index=index)
+        portfolio_history_series = portfolio_history_series[~index.duplicated(keep='last')].sort_index()
+        cash_history_series = pd.Series(fused['cash'], index=index)
+        cash_history_series = cash_history_series[~index.duplicated(keep='last')].sort_index()
+    else:
+        # Extract portfolio history for plotting
+        portfolio_history = {}
+        for dt, value_list in strategy.analyzers.mypositionsvalue.get_analysis().items():
+            np_value_array = np.array(value_list)
 
-        if mcap:
-            # Perform the division on the entire NumPy array at once
-            processed_value_array = np_value_array / 1_000_000_000
-            portfolio_history[dt] = processed_value_array.tolist()  # Store as list again if needed, or keep array
-        else:
-            portfolio_history[dt] = value_list
+            if mcap:
+                # Perform the division on the entire NumPy array at once
+                processed_value_array = np_value_array / 1_000_000_000
+                portfolio_history[dt] = processed_value_array.tolist()  # Store as list again if needed, or keep array
+            else:
+                portfolio_history[dt] = value_list
 
-        # portfolio_history[dt] = value # dt is already a datetime object
-    portfolio_history_series = pd.Series(portfolio_history).sort_index()
+            # portfolio_history[dt] = value # dt is already a datetime object
+        portfolio_history_series = pd.Series(portfolio_history).sort_index()
 
-    # Extract CASH history , dt is already a datetime object
-    cash_history = {dt: value for dt, value in strategy.analyzers.mycashvalue.get_analysis().items()}
-    cash_history_series = pd.Series(cash_history).sort_index()
+        # Extract CASH history , dt is already a datetime object
+        cash_history = {dt: value for dt, value in strategy.analyzers.mycashvalue.get_analysis().items()}
+        cash_history_series = pd.Series(cash_history).sort_index()
 
     if mcap:
         cash_history_series = cash_history_series / 1_000_000_000
 
+    # Bars that were not fed are flat: no position, cash at its initial / final value
+    if start_bar:
+        cash_history_series = pd.concat([_flat_history(skipped_datetimes, float(cash)), cash_history_series])
+        portfolio_history_series = pd.concat([_flat_history(skipped_datetimes, [0.0]), portfolio_history_series])
+    if len(remaining_datetimes):
+        cash_history_series = pd.concat([cash_history_series, _flat_history(remaining_datetimes, float(cash_history_series.iloc[-1]))])
+        portfolio_history_series = pd.concat([portfolio_history_series, _flat_history(remaining_datetimes, [0.0])])
+
     if print_cash_history:
         print("[RUN] Cash History:", cash_history_series.tolist())
         combined_array = np.column_stack((cash_history_series.values, portfolio_history_series.values))
@@ -188,6 +551,114 @@ def run_backtest_for_df(df, coin_name,
     return analysis_results, cerebro, cash_history_series
 
 
+def run_backtest_cached(df, coin_name, cache=None, **kwargs):
+    """
+    run_backtest_for_df memoized in a utils.result_cache.ResultCache: the results, the trades and the
+    cash history are stored under the content key of the run (data, class sources, arguments).
+
+    Args:
+        df (pd.DataFrame): The dataframe containing OHLCV data.
+        coin_name (str): The name of the coin for identification in results.
+        cache (ResultCache): The cache (None = plain run_backtest_for_df).
+        **kwargs: run_backtest_for_df arguments.
+
+    Returns:
+        tuple: (dict of analysis results, bt.Cerebro object or None when the run came from the cache,
+                cash history series). The cached trades are under cache.get(key)['trades'].
+    """
+    if cache is None:
+        return run_backtest_for_df(df, coin_name, **kwargs)
+    # The lifecycle entry only saves a scan of df, the results don't depend on it
+    key = backtest_key(df, coin_name=coin_name, **{k: v for k, v in kwargs.items() if k != 'lifecycle'})
+    cached = cache.get(key)
+    if cached is not None:
+        print(f"[RUN] Cached result for {coin_name} ({key[:12]})")
+        return cached['analysis_results'], None, cached['cash_history']
+    analysis_results, cerebro, cash_history_series = run_backtest_for_df(df, coin_name, **kwargs)
+    cache.put(key, {'analysis_results': analysis_results,
+                    'trades': get_trades_df(cerebro.runstrats[0][0]),
+                    'cash_history': cash_history_series})
+    return analysis_results, cerebro, cash_history_series
+
+
+def _config_label(config):
+    """Name of a (strategy_class, strategy_params, sizer_class[, sizer_params]) config in the results."""
+    return f"{config[0].__name__}/{config[2].__name__}"
+
+
+def run_configs_for_df(df, coin_name, configs, share_indicators=True, **kwargs):
+    """
+    Runs several (strategy, params, sizer) configs on one chart in one call. Backtrader has a single
+    broker per cerebro, so every config still gets its own cerebro and broker, but they are fed from
+    the same arrays (numpy feed, datetimes converted once) and share the indicators declared through
+    an IndicatorCache: a config declaring the same indicator as an earlier one (e.g. RSI_Safe with the
+    same period) replays its values instead of computing it again.
+
+    Args:
+        df (pd.DataFrame): The dataframe containing OHLCV data.
+        coin_name (str): The name of the coin for identification in results.
+        configs (list): (strategy_class, strategy_params, sizer_class) or
+                        (strategy_class, strategy_params, sizer_class, sizer_params) tuples.
+        share_indicators (bool): Share indicator values between the configs.
+        **kwargs: Other run_backtest_for_df arguments (commission_class, cash, mcap, fused_analyzer, ...),
+                  numpy_feed is always on.
+
+    Returns:
+        tuple: (pd.DataFrame of the results, one row per config with 'config' (index in configs) and
+                'strategy' columns, list of bt.Cerebro objects, list of cash history series)
+    """
+    arrays = chart_arrays(df)
+    indicator_cache = IndicatorCache() if share_indicators else None
+    results, cerebros, histories = [], [], []
+    for index, config in enumerate(configs):
+        strategy_class, strategy_params, sizer_class = config[:3]
+        sizer_params = config[3] if len(config) > 3 else None
+        analysis_result, cerebro_obj, history = run_backtest_for_df(
+            df, coin_name,
+            strategy_class=strategy_class,
+            strategy_params=strategy_params,
+            sizer_class=sizer_class,
+            sizer_params=sizer_params,
+            numpy_feed=True,
+            feed_arrays=arrays,
+            indicator_cache=indicator_cache,
+            **kwargs)
+        results.append(dict(analysis_result, config=index, strategy=_config_label(config)))
+        cerebros.append(cerebro_obj)
+        histories.append(history)
+    if indicator_cache is not None:
+        print(f"[RUN] {coin_name}: {len(configs)} configs, indicators computed {indicator_cache.misses} times, "
+              f"shared {indicator_cache.hits} times")
+    return pd.DataFrame(results), cerebros, histories
+
+
+def _load_chart(csv_file, mcap=False):
+    """read_chart + ready_df, the loading step of run_all."""
+    return ready_df(read_chart(csv_file), mcap=mcap)
+
+
+def _load_chart_or_error(csv_file, mcap=False):
+    """_load_chart returning the exception instead of raising it, so a checkpointed run can record it and go on."""
+    try:
+        return _load_chart(csv_file, mcap=mcap)
+    except Exception as e:
+        return e
+
+
+def _run_backtest_job(job):
+    """
+    Worker process side of run_all(workers > 1): runs one backtest and returns what can be sent back
+    (the cerebro stays in the worker).
+
+    Returns:
+        tuple: (analysis results, cash history series, compute seconds)
+    """
+    df, kwargs = job
+    start = time.perf_counter()
+    analysis_result, _, history = run_backtest_cached(df, **kwargs)
+    return analysis_result, history, time.perf_counter() - start
+
+
 def run_all(csv_files,
             sizer_class=FiboMartingaleSizer,
             strategy_class=FiboMartingaleStrategy,
@@ -196,7 +667,22 @@ def run_all(csv_files,
             strategy_params=None,
             mcap=False,
             df_start_margin=0,
-            df_end_margin=-1
+            df_end_margin=-1,
+            use_range_index=False,
+            event_skipping=False,
+            trim_pre_migration=False,
+            stop_when_finished=False,
+            numpy_feed=False,
+            fused_analyzer=False,
+            prefetch=0,
+            workers=1,
+            cache=None,
+            registry=None,
+            checkpoint_dir=None,
+            resume=False,
+            max_retries=2,
+            manifest_path=None,
+            lifecycle_filter=None
             ):
     """
     Runs backtests for multiple coin dataframes and aggregates results.
@@ -204,55 +690,199 @@ def run_all(csv_files,
     Args:
         csv_files (list): A list of paths to your CSV files.
         strategy_class: The Backtrader strategy class to use.
+        use_range_index (bool): Give every run a RangeExtremeIndex of its chart (see run_backtest_for_df).
+        event_skipping (bool): Skip bars where no rule can fire (see run_backtest_for_df).
+        trim_pre_migration (bool): Don't feed the bars before migration (see run_backtest_for_df).
+        stop_when_finished (bool): Stop each run once its strategy is finished (see run_backtest_for_df).
+        numpy_feed (bool): Use the numpy feed (see run_backtest_for_df).
+        fused_analyzer (bool): Collect results with FusedAnalyzer (see run_backtest_for_df).
+        prefetch (int): Load and prepare up to this many next charts in a background thread while the
+                        current backtest runs (0 = load each chart right before its backtest).
+        workers (int): Run the backtests in this many processes. The charts are still loaded (and
+                       prefetched) by the calling process, the cerebros stay in the workers so the
+                       returned cerebro dict is empty.
+        cache (ResultCache): Reuse the results of runs whose data, code and arguments did not change
+                             (see run_backtest_cached). Coins served from the cache have no cerebro.
+        registry (RunRegistry): Record the run, its per-coin results, equity curves and trades
+                                (trades of the coins that have a cerebro) in a utils.run_registry.RunRegistry.
+        checkpoint_dir (str): Stream every coin's result and cash history to this folder as it finishes
+                              (see utils.checkpoint.RunCheckpoint). A failing coin is recorded and skipped
+                              instead of stopping the run, and cerebros are not kept. The results are read
+                              back from the folder at the end, the histories are returned as a lazy
+                              read-only mapping (utils.checkpoint.CheckpointHistories) that loads each
+                              coin's parquet file when it is accessed, so memory stays bounded by one
+                              history; copy it with dict() to hold them all.
+        resume (bool): Continue the run in checkpoint_dir: finished coins are skipped, failed ones retried.
+        max_retries (int): Attempts of a failing coin across resumes.
+        manifest_path (str): Manifest cache file (utils.manifest). With it, or with lifecycle_filter, the
+                             charts' lifecycle events are read from the manifest: trim_pre_migration
+                             uses their migration bar instead of scanning every chart.
+        lifecycle_filter (dict): utils.lifecycle.select_charts conditions (e.g. {'migrated': True,
+                                 'min_alive_bars': 600}), charts failing them are not loaded.
 
     Returns:
-        tuple: (pd.DataFrame of all results, dict of {'coin_name': cerebro_object}, dict of {'coin_name': portfolio_history_series})
+        tuple: (pd.DataFrame of all results, dict of {'coin_name': cerebro_object}, dict of {'coin_name': portfolio_history_series}
+               (a lazy CheckpointHistories mapping with checkpoint_dir))
     """
     all_results = []
     all_cerebros = {}
     all_portfolio_histories = {}
 
-    for i, csv_file in enumerate(csv_files):
-        print(f"\n{'*' * 20} Running backtest for {os.path.basename(csv_file)} ({i+1}/{len(csv_files)}) {'*' * 20}")
-        df = pd.read_csv(csv_file)
-        df = ready_df(df, mcap=mcap)
-        coin_name = os.path.basename(csv_file).split('.')[0][17:27]  # Assuming coin name is the filename without extension
-
-        analysis_result, cerebro_obj, portfolio_history_series = run_backtest_for_df(
-                df[df_start_margin:df_end_margin],
-                coin_name=coin_name,
-                strategy_class=strategy_class,
-                cash=cash,
-                sizer_class=sizer_class,
-                strategy_params=strategy_params,
-                mcap=mcap,
-                commission_class=CustomSolanaCommission,
-                sizer_params=sizer_params)
+    run_kwargs = dict(strategy_class=strategy_class,
+                      cash=cash,
+                      sizer_class=sizer_class,
+                      strategy_params=strategy_params,
+                      mcap=mcap,
+                      commission_class=CustomSolanaCommission,
+                      sizer_params=sizer_params,
+                      use_range_index=use_range_index,
+                      event_skipping=event_skipping,
+                      trim_pre_migration=trim_pre_migration,
+                      stop_when_finished=stop_when_finished,
+                      numpy_feed=numpy_feed,
+                      fused_analyzer=fused_analyzer,
+                      cache=cache)
+    manifest = None
+    if manifest_path is not None or lifecycle_filter is not None:
+        manifest = build_manifest(csv_files, manifest_path)
+        if lifecycle_filter is not None:
+            csv_files = select_charts(manifest, **lifecycle_filter)
+
+    checkpoint = None
+    if checkpoint_dir is not None:
+        config = dict(run_kwargs, csv_files=[os.path.basename(f) for f in csv_files],
+                      df_start_margin=df_start_margin, df_end_margin=df_end_margin)
+        config.pop('cache')
+        checkpoint = RunCheckpoint(checkpoint_dir, config=config, resume=resume, max_retries=max_retries)
+    to_run = [f for f in csv_files if checkpoint is None or checkpoint.should_run(os.path.basename(f))]
+    load = _load_chart if checkpoint is None else _load_chart_or_error
+    charts = PrefetchLoader(to_run, functools.partial(load, mcap=mcap), depth=prefetch)
+    compute_time = 0.0
+    wall_start = time.perf_counter()
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = collections.deque()  # (csv_file, coin_name, future), oldest first
+
+    def record(csv_file, coin_name, analysis_result, cerebro_obj, portfolio_history_series):
+        if checkpoint is not None:  # kept on disk only
+            checkpoint.record_result(os.path.basename(csv_file), analysis_result, portfolio_history_series)
+            return
         all_results.append(analysis_result)
         all_cerebros[coin_name] = cerebro_obj
         all_portfolio_histories[coin_name] = portfolio_history_series
-            
-        # try:
-        #     analysis_result, cerebro_obj, portfolio_history_series = run_backtest_for_df(
-        #         df[df_start_margin:df_end_margin],
-        #         coin_name=coin_name,
-        #         strategy_class=strategy_class,
-        #         cash=cash,
-        #         sizer_class=sizer_class,
-        #         strategy_params=strategy_params,
-        #         mcap=mcap,
-        #         commission_class=CustomSolanaCommission,
-        #         sizer_params=sizer_params)
-        #     all_results.append(analysis_result)
-        #     all_cerebros[coin_name] = cerebro_obj
-        #     all_portfolio_histories[coin_name] = portfolio_history_series
-        # except Exception as e:
-        #     print(f"Error running backtest for {coin_name}: {e}")
-        #     # Optionally add a placeholder result for failed backtests
-        #     all_results.append({'coin': coin_name, 'final_value': 'Error', 'sharpe_ratio': 'Error',
-        #                         'max_drawdown': 'Error', 'total_trades': 'Error',
-        #                         'winning_trades': 'Error', 'losing_trades': 'Error',
-        #                         'annualized_return': 'Error'})
+
+    def collect(csv_file, coin_name, future):
+        nonlocal compute_time
+        try:
+            analysis_result, history, seconds = future.result()
+        except Exception as e:
+            if checkpoint is None:
+                raise
+            checkpoint.record_failure(os.path.basename(csv_file), e)
+            return
+        compute_time += seconds
+        record(csv_file, coin_name, analysis_result, None, history)
+
+    try:
+        for i, (csv_file, df) in enumerate(charts):
+            print(f"\n{'*' * 20} Running backtest for {os.path.basename(csv_file)} ({i+1}/{len(to_run)}) {'*' * 20}")
+            coin_name = os.path.basename(csv_file).split('.')[0][17:27]  # Assuming coin name is the filename without extension
+            if isinstance(df, Exception):
+                checkpoint.record_failure(os.path.basename(csv_file), df)
+                continue
+
+            job_kwargs = run_kwargs
+            if manifest is not None and trim_pre_migration and df_start_margin == 0:  # bars are chart bars
+                job_kwargs = dict(run_kwargs, lifecycle=manifest[csv_file])
+
+            if pool is not None:
+                pending.append((csv_file, coin_name, pool.submit(_run_backtest_job, (df[df_start_margin:df_end_margin], dict(job_kwargs, coin_name=coin_name)))))
+                while len(pending) > 2 * workers:  # bound the charts held in memory
+                    collect(*pending.popleft())
+                continue
+
+            start = time.perf_counter()
+            try:
+                analysis_result, cerebro_obj, portfolio_history_series = run_backtest_cached(
+                        df[df_start_margin:df_end_margin],
+                        coin_name=coin_name,
+                        **job_kwargs)
+            except Exception as e:
+                if checkpoint is None:
+                    raise
+                checkpoint.record_failure(os.path.basename(csv_file), e)
+                continue
+            compute_time += time.perf_counter() - start
+            record(csv_file, coin_name, analysis_result, cerebro_obj, portfolio_history_series)
+        while pending:
+            collect(*pending.popleft())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    print(f"[RUN] {len(to_run)} backtests in {time.perf_counter() - wall_start:.2f}s: "
+          f"I/O wait {charts.io_wait:.2f}s, compute {compute_time:.2f}s"
+          f"{' (summed over workers)' if pool is not None else ''}, loading {charts.load_time:.2f}s")
+    if cache is not None and pool is None:  # the workers count their own hits
+        print(f"[RUN] Result cache: {cache.hits} hits, {cache.misses} misses")
 
     results_df = pd.DataFrame(all_results)
+    if checkpoint is not None:
+        keys = [os.path.basename(f) for f in csv_files]
+        results_df = checkpoint.results(keys)
+        all_portfolio_histories = checkpoint.histories({f.split('.')[0][17:27]: f for f in keys})
+        if checkpoint.failures():
+            print(f"[RUN] Failed coins: {checkpoint.failures()}")
+    if registry is not None:
+        trades = {coin_name: get_trades_df(cerebro_obj.runstrats[0][0])
+                  for coin_name, cerebro_obj in all_cerebros.items() if cerebro_obj is not None}
+        registry.record_run(results_df, strategy_class, strategy_params=strategy_params, sizer_class=sizer_class,
+                            sizer_params=sizer_params, cash=cash, mcap=mcap, histories=all_portfolio_histories,
+                            trades=trades, options={'df_start_margin': df_start_margin, 'df_end_margin': df_end_margin,
+                                                    'trim_pre_migration': trim_pre_migration,
+                                                    'stop_when_finished': stop_when_finished})
     return results_df, all_cerebros, all_portfolio_histories
+
+
+def run_all_configs(csv_files,
+                    configs,
+                    cash=1,
+                    mcap=False,
+                    df_start_margin=0,
+                    df_end_margin=-1,
+                    share_indicators=True,
+                    prefetch=0,
+                    **run_kwargs):
+    """
+    run_all for several (strategy, params, sizer) configs per coin: every chart is loaded once and
+    all configs run on it through run_configs_for_df.
+
+    Args:
+        csv_files (list): A list of paths to your CSV files.
+        configs (list): (strategy_class, strategy_params, sizer_class[, sizer_params]) tuples.
+        share_indicators (bool): Share indicator values between the configs of a coin.
+        prefetch (int): Load the next charts in a background thread (see run_all).
+        **run_kwargs: Other run_backtest_for_df arguments (use_range_index, trim_pre_migration,
+                      fused_analyzer, ...).
+
+    Returns:
+        tuple: (pd.DataFrame of all results with 'config' and 'strategy' columns,
+                dict of {(coin_name, config): portfolio_history_series})
+    """
+    run_kwargs.setdefault('commission_class', CustomSolanaCommission)
+    all_results = []
+    all_portfolio_histories = {}
+    charts = PrefetchLoader(csv_files, functools.partial(_load_chart, mcap=mcap), depth=prefetch)
+    wall_start = time.perf_counter()
+    for i, (csv_file, df) in enumerate(charts):
+        print(f"\n{'*' * 20} Running {len(configs)} configs for {os.path.basename(csv_file)} ({i+1}/{len(csv_files)}) {'*' * 20}")
+        coin_name = os.path.basename(csv_file).split('.')[0][17:27]
+        results, _, histories = run_configs_for_df(df[df_start_margin:df_end_margin], coin_name, configs,
+                                                   share_indicators=share_indicators, cash=cash, mcap=mcap, **run_kwargs)
+        all_results.append(results)
+        for index, history in enumerate(histories):
+            all_portfolio_histories[(coin_name, index)] = history
+    print(f"[RUN] {len(csv_files)} charts x {len(configs)} configs in {time.perf_counter() - wall_start:.2f}s, "
+          f"loading {charts.load_time:.2f}s")
+    results_df = pd.concat(all_results, ignore_index=True) if all_results else pd.DataFrame()
+    return results_df, all_portfolio_histories
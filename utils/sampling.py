@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from utils.manifest import build_manifest
+from utils.scheduler import run_sweep
+
+
+# Stratum boundaries: peak market cap and chart length (bars)
+PEAK_MCAP_BUCKETS = (70_000, 300_000, 1_000_000, 10_000_000)
+LENGTH_BUCKETS = (3_600, 21_600)
+
+
+def stratum(entry):
+    """
+    Stratum of a chart from its manifest entry: (migrated, peak market cap bucket, length bucket).
+    """
+    peak = entry.get('peak_market_cap') or 0.0
+    return (entry['migration_bar'] is not None,
+            int(np.searchsorted(PEAK_MCAP_BUCKETS, peak, side='right')),
+            int(np.searchsorted(LENGTH_BUCKETS, entry['bars'], side='right')))
+
+
+def stratified_order(manifest, seed=0):
+    """
+    Orders the charts so that every prefix is a (close to) proportional stratified random sample:
+    the k-th chart of a random permutation of a stratum of size N gets the key (k + u) / N, u ~ U(0, 1),
+    and the charts are sorted by key. Growing the sample is taking a longer prefix.
+
+    Returns:
+        list: Chart paths in sampling order.
+    """
+    rng = np.random.default_rng(seed)
+    groups = {}
+    for path, entry in manifest.items():
+        groups.setdefault(stratum(entry), []).append(path)
+    keyed = []
+    for key in sorted(groups):
+        paths = groups[key]
+        for k, i in enumerate(rng.permutation(len(paths))):
+            keyed.append(((k + rng.random()) / len(paths), paths[i]))
+    keyed.sort(key=lambda item: item[0])
+    return [path for _, path in keyed]
+
+
+def bootstrap_ci(values, strata, weights, n_boot=1000, confidence=0.95, seed=0):
+    """
+    Stratified estimate of the population mean (stratum means weighted by the strata's shares of the
+    population, renormalized over the strata in the sample) and its bootstrap confidence interval,
+    resampling with replacement within every stratum.
+
+    Args:
+        values (array): Metric of every sampled coin.
+        strata (array): Stratum of every sampled coin.
+        weights (dict): {stratum: share of the population}.
+        n_boot (int): Bootstrap resamples.
+        confidence (float): Confidence level.
+        seed (int): Seed of the resampling.
+
+    Returns:
+        tuple: (estimate, low, high)
+    """
+    rng = np.random.default_rng(seed)
+    values = np.asarray(values, dtype=float)
+    strata = np.asarray(strata)
+    groups = [(values[strata == s], weights[s]) for s in np.unique(strata)]
+    w = np.array([weight for _, weight in groups])
+    w = w / w.sum()
+    estimate = float(sum(wi * group.mean() for wi, (group, _) in zip(w, groups)))
+    boot = np.empty(n_boot)
+    for b in range(n_boot):
+        # A stratum with a single coin has no spread of its own, it is resampled from the whole sample
+        boot[b] = sum(wi * rng.choice(group if len(group) > 1 else values, size=max(len(group), 1)).mean()
+                      for wi, (group, _) in zip(w, groups))
+    alpha = (1 - confidence) / 2
+    return estimate, float(np.quantile(boot, alpha)), float(np.quantile(boot, 1 - alpha))
+
+
+def run_sampled(paths, strategy_params=None, metric='final_value', target_width=None, initial_coins=50,
+                batch=50, max_coins=None, confidence=0.95, n_boot=1000, seed=0, workers=1, manifest_path=None,
+                **run_kwargs):
+    """
+    Backtests a stratified random sample of the charts instead of all of them, growing it until the
+    bootstrap confidence interval of the metric's mean over all charts is narrower than target_width.
+
+    Strata come from the manifest (migrated or not, peak market cap bucket, chart length bucket), the
+    estimate weights every stratum by its share of all charts. Besides the metric, the share of
+    profitable coins (final_value > start_value) is reported with its interval.
+
+    Args:
+        paths (list): Chart files (the population).
+        strategy_params (dict): Strategy params of the run.
+        metric (str): Result column whose mean is estimated.
+        target_width (float): Stop once the interval (high - low) of the metric is at most this wide
+                              (None = run initial_coins only).
+        initial_coins (int): First sample size.
+        batch (int): Coins added per step.
+        max_coins (int): Sample size limit (None = all charts).
+        confidence (float): Confidence level of the intervals.
+        n_boot (int): Bootstrap resamples.
+        seed (int): Seed of the sample and of the bootstrap.
+        workers (int): Worker processes (see utils.scheduler.run_sweep).
+        manifest_path (str): Manifest cache file.
+        **run_kwargs: Passed to run_sweep (strategy_class, sizer_class, cash, mcap, cache, ...).
+
+    Returns:
+        tuple: (pd.DataFrame of the sampled coins' results with their 'stratum',
+                dict: estimate, low, high, profitable, profitable_low, profitable_high, coins, total_coins, steps)
+    """
+    manifest = build_manifest(paths, manifest_path)
+    order = stratified_order(manifest, seed=seed)
+    max_coins = min(max_coins or len(order), len(order))
+    sizes = pd.Series([stratum(entry) for entry in manifest.values()]).value_counts()
+    weights = {key: count / len(order) for key, count in sizes.items()}
+
+    results = []
+    taken = 0
+    size = min(initial_coins, max_coins)
+    steps = 0
+    while True:
+        steps += 1
+        new_paths = order[taken:size]
+        step_results, _ = run_sweep(new_paths, [strategy_params or {}], workers=workers,
+                                    manifest_path=manifest_path, **run_kwargs)
+        step_results['stratum'] = [str(stratum(manifest[path])) for path in new_paths]
+        results.append(step_results)
+        taken = size
+
+        sample = pd.concat(results, ignore_index=True)
+        str_weights = {str(key): weight for key, weight in weights.items()}
+        values = pd.to_numeric(sample[metric], errors='coerce')
+        valid = values.notna().to_numpy()
+        estimate, low, high = bootstrap_ci(values[valid], sample['stratum'][valid], str_weights,
+                                           n_boot=n_boot, confidence=confidence, seed=seed)
+        profitable = (pd.to_numeric(sample['final_value'], errors='coerce') >
+                      pd.to_numeric(sample['start_value'], errors='coerce')).astype(float)
+        share, share_low, share_high = bootstrap_ci(profitable, sample['stratum'], str_weights,
+                                                    n_boot=n_boot, confidence=confidence, seed=seed)
+        print(f"[RUN] Sample of {taken}/{len(order)} coins: {metric} {estimate:.4f} "
+              f"[{low:.4f}, {high:.4f}], profitable {share:.1%} [{share_low:.1%}, {share_high:.1%}]")
+        if target_width is None or high - low <= target_width or taken >= max_coins:
+            break
+        size = min(taken + batch, max_coins)
+
+    stats = {'estimate': estimate, 'low': low, 'high': high, 'profitable': share, 'profitable_low': share_low,
+             'profitable_high': share_high, 'coins': taken, 'total_coins': len(order), 'steps': steps,
+             'strata_sampled': sample['stratum'].nunique(), 'strata': len(weights)}
+    return sample.drop(columns='config'), stats
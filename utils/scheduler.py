@@ -0,0 +1,171 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from commissions.CustomSolanaCommission import CustomSolanaCommission
+from utils.manifest import build_manifest
+from utils.runner import _load_chart, run_backtest_cached
+
+
+# Fixed cost of one backtest (cerebro setup, analyzers, result extraction) in bar equivalents
+RUN_OVERHEAD_BARS = 2_000
+
+
+def estimate_cost(entry, trim_pre_migration=False, warmup_bars=300):
+    """
+    Estimated cost of one backtest of a chart, in bars, from its manifest entry.
+
+    Args:
+        entry (dict): Manifest entry (see utils.manifest.chart_stats).
+        trim_pre_migration (bool): The run only feeds the bars from warmup_bars before the migration
+                                   (see run_backtest_for_df).
+        warmup_bars (int): Same warmup_bars as the run.
+
+    Returns:
+        int: Bars fed plus RUN_OVERHEAD_BARS.
+    """
+    bars = entry['bars']
+    if trim_pre_migration:
+        migration_bar = entry['migration_bar'] if entry['migration_bar'] is not None else bars
+        bars -= max(0, migration_bar - warmup_bars)
+    return bars + RUN_OVERHEAD_BARS
+
+
+def plan_tasks(manifest, param_sets, workers=1, max_task_cost=None, trim_pre_migration=False, warmup_bars=300):
+    """
+    Splits a sweep (every chart x every param set) into tasks and orders them longest first.
+
+    A task is one chart with a chunk of its param sets. The configs of a chart are chunked so no task
+    costs more than max_task_cost, a single backtest is never split so a chart longer than that is
+    a task of one config.
+
+    Args:
+        manifest (dict): {path: entry} from utils.manifest.build_manifest.
+        param_sets (list): strategy_params dicts to run on every chart.
+        workers (int): Number of workers the tasks are planned for.
+        max_task_cost (int): Cost cap per task (None = a quarter of a worker's fair share of the sweep).
+        trim_pre_migration, warmup_bars: See estimate_cost.
+
+    Returns:
+        list: Tasks as dicts {'path', 'configs' (param set indexes), 'cost'}, longest first.
+    """
+    costs = {path: estimate_cost(entry, trim_pre_migration, warmup_bars) for path, entry in manifest.items()}
+    if max_task_cost is None:
+        max_task_cost = math.ceil(sum(costs.values()) * len(param_sets) / (4 * max(1, workers)))
+    tasks = []
+    for path, cost in costs.items():
+        chunk = max(1, int(max_task_cost // cost))
+        for start in range(0, len(param_sets), chunk):
+            configs = list(range(start, min(start + chunk, len(param_sets))))
+            tasks.append({'path': path, 'configs': configs, 'cost': cost * len(configs)})
+    tasks.sort(key=lambda task: task['cost'], reverse=True)
+    return tasks
+
+
+def _run_task(job):
+    """
+    Runs one task inside a worker: loads the chart once and backtests each of its configs.
+
+    Args:
+        job (tuple): (path, [(config index, strategy_params)], (df_start_margin, df_end_margin), run_kwargs)
+
+    Returns:
+        tuple: (path, [(config index, analysis results)], worker pid, start time, end time)
+    """
+    path, configs, (df_start_margin, df_end_margin), run_kwargs = job
+    start = time.time()
+    df = _load_chart(path, mcap=run_kwargs.get('mcap', False))[df_start_margin:df_end_margin]
+    coin_name = os.path.basename(path).split('.')[0][17:27]
+    results = []
+    for index, params in configs:
+        analysis_result, _, _ = run_backtest_cached(df, coin_name=coin_name, strategy_params=params, **run_kwargs)
+        results.append((index, analysis_result))
+    return path, results, os.getpid(), start, time.time()
+
+
+def worker_utilization(timings, wall_start, wall_end):
+    """
+    Per-worker utilization of a sweep.
+
+    Args:
+        timings (list): (pid, task start, task end, task cost) of every task.
+        wall_start, wall_end (float): Sweep start and end (time.time()).
+
+    Returns:
+        pd.DataFrame: One row per worker with tasks, cost, busy seconds and utilization (busy / wall time).
+    """
+    wall = max(wall_end - wall_start, 1e-9)
+    rows = {}
+    for pid, start, end, cost in timings:
+        row = rows.setdefault(pid, {'worker': pid, 'tasks': 0, 'cost': 0, 'busy_seconds': 0.0})
+        row['tasks'] += 1
+        row['cost'] += cost
+        row['busy_seconds'] += end - start
+    utilization = pd.DataFrame(list(rows.values()), columns=['worker', 'tasks', 'cost', 'busy_seconds'])
+    utilization['utilization'] = utilization['busy_seconds'] / wall
+    return utilization
+
+
+def run_sweep(paths, param_sets, workers=None, manifest_path=None, max_task_cost=None,
+              df_start_margin=0, df_end_margin=-1, **run_kwargs):
+    """
+    Runs every param set on every chart across a process pool, longest tasks first.
+
+    Costs come from the chart manifest (bar count, post-migration bar count when trimming), so the
+    longest charts start first and the short ones fill the gaps at the end, instead of one worker
+    finishing a giant chart alone after the file order ran out.
+
+    Args:
+        paths (list): Chart files.
+        param_sets (list): strategy_params dicts, every one is run on every chart.
+        workers (int): Number of worker processes (None = os.cpu_count(), 1 = run in this process).
+        manifest_path (str): Manifest cache file (see utils.manifest.build_manifest).
+        max_task_cost (int): Cost cap per task, see plan_tasks.
+        df_start_margin, df_end_margin (int): Slice of every chart that is run, as in run_all.
+        **run_kwargs: Passed to run_backtest_cached (strategy_class, sizer_class, cash, mcap, cache, ...).
+
+    Returns:
+        tuple: (pd.DataFrame of results with a 'config' column indexing param_sets, in chart then
+                config order, pd.DataFrame of per-worker utilization)
+    """
+    workers = workers or os.cpu_count()
+    run_kwargs.setdefault('commission_class', CustomSolanaCommission)
+    manifest = build_manifest(paths, manifest_path)
+    tasks = plan_tasks(manifest, param_sets, workers=workers, max_task_cost=max_task_cost,
+                       trim_pre_migration=run_kwargs.get('trim_pre_migration', False),
+                       warmup_bars=run_kwargs.get('warmup_bars', 300))
+    print(f"[RUN] Sweep: {len(paths)} charts x {len(param_sets)} configs in {len(tasks)} tasks on {workers} workers")
+
+    margins = (df_start_margin, df_end_margin)
+    jobs = [(task['path'], [(i, param_sets[i]) for i in task['configs']], margins, run_kwargs) for task in tasks]
+    results = {}
+    timings = []
+    wall_start = time.time()
+
+    def collect(task, done):
+        path, task_results, pid, start, end = done
+        for index, analysis_result in task_results:
+            results[(path, index)] = dict(analysis_result, config=index)
+        timings.append((pid, start, end, task['cost']))
+
+    if workers == 1:
+        for task, job in zip(tasks, jobs):
+            collect(task, _run_task(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Submitted longest first, the pool hands them out in that order as workers free up
+            futures = {pool.submit(_run_task, job): task for task, job in zip(tasks, jobs)}
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+    wall_end = time.time()
+
+    utilization = worker_utilization(timings, wall_start, wall_end)
+    for row in utilization.itertuples():
+        print(f"[RUN] Worker {row.worker}: {row.tasks} tasks, busy {row.busy_seconds:.1f}s ({row.utilization:.0%})")
+    print(f"[RUN] Sweep done in {wall_end - wall_start:.1f}s, mean utilization {utilization['utilization'].mean():.0%}")
+
+    ordered = [results[(path, index)] for path in manifest for index in range(len(param_sets))]
+    return pd.DataFrame(ordered), utilization
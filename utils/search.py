@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from utils.manifest import build_manifest
+from utils.scheduler import estimate_cost, run_sweep
+
+
+def successive_halving(paths, param_sets, metric='final_value', higher_is_better=True, aggregate='median',
+                       initial_coins=8, eta=2, seed=0, workers=1, manifest_path=None, **run_kwargs):
+    """
+    Adaptive parameter search: every candidate is run on a small random subset of coins, the best
+    1/eta are kept and run on eta times more coins, and so on until the survivors ran on every coin
+    (or one candidate is left). Coin subsets are nested, so every round only runs the coins the
+    survivors did not see yet.
+
+    Args:
+        paths (list): Chart files.
+        param_sets (list): Candidate strategy_params dicts.
+        metric (str): Result column the candidates are ranked on (e.g. 'final_value', 'sharpe_ratio').
+        higher_is_better (bool): Direction of the metric.
+        aggregate (str): How a candidate's per-coin metrics are combined ('median' or 'mean').
+        initial_coins (int): Coins of the first round.
+        eta (int): Keep 1/eta of the candidates and multiply the coins by eta each round.
+        seed (int): Seed of the coin order.
+        workers (int): Worker processes of every round (see utils.scheduler.run_sweep).
+        manifest_path (str): Manifest cache file, also used to cost the search.
+        **run_kwargs: Passed to run_sweep (strategy_class, sizer_class, cash, mcap, cache, ...).
+
+    Returns:
+        tuple: (pd.DataFrame ranking of every candidate: config, score, coins, rounds, params, best first,
+                pd.DataFrame of every result row with a 'config' column,
+                dict of compute stats: backtests, full_grid_backtests, cost, full_grid_cost, saved)
+    """
+    if aggregate not in ('median', 'mean'):
+        raise ValueError(f"Unknown aggregate '{aggregate}', expected 'median' or 'mean'.")
+    manifest = build_manifest(paths, manifest_path)
+    costs = {path: estimate_cost(entry, run_kwargs.get('trim_pre_migration', False), run_kwargs.get('warmup_bars', 300))
+             for path, entry in manifest.items()}
+    order = list(manifest)
+    np.random.default_rng(seed).shuffle(order)
+
+    survivors = list(range(len(param_sets)))
+    seen = {}  # candidate -> number of coins of `order` it already ran on
+    rows = []
+    rounds = {i: 0 for i in survivors}
+    scores = {}
+    coins = min(initial_coins, len(order))
+    backtests = 0
+    cost = 0
+    round_number = 0
+    while True:
+        round_number += 1
+        start = min(seen.get(i, 0) for i in survivors)
+        new_paths = order[start:coins]
+        print(f"[RUN] Halving round {round_number}: {len(survivors)} candidates on {coins} coins ({len(new_paths)} new)")
+        results, _ = run_sweep(new_paths, [param_sets[i] for i in survivors], workers=workers,
+                               manifest_path=manifest_path, **run_kwargs)
+        # run_sweep rows are in chart then config order
+        results['config'] = [survivors[j] for j in results['config']]
+        results['path'] = [path for path in new_paths for _ in survivors]
+        rows.append(results)
+        backtests += len(results)
+        cost += sum(costs[path] for path in new_paths) * len(survivors)
+        for i in survivors:
+            seen[i] = coins
+            rounds[i] = round_number
+
+        all_rows = pd.concat(rows, ignore_index=True)
+        values = pd.to_numeric(all_rows[metric], errors='coerce')
+        grouped = values[all_rows['config'].isin(survivors)].groupby(all_rows['config'])
+        round_scores = grouped.median() if aggregate == 'median' else grouped.mean()
+        for i in survivors:
+            scores[i] = round_scores.get(i, np.nan)
+        if coins >= len(order) or len(survivors) == 1:
+            break
+        ranked = sorted(survivors, key=lambda i: (np.isnan(scores[i]), -scores[i] if higher_is_better else scores[i]))
+        survivors = ranked[:max(1, math.ceil(len(survivors) / eta))]
+        coins = min(coins * eta, len(order))
+
+    full_grid_cost = sum(costs.values()) * len(param_sets)
+    stats = {'backtests': backtests, 'full_grid_backtests': len(order) * len(param_sets),
+             'cost': cost, 'full_grid_cost': full_grid_cost, 'saved': 1 - cost / full_grid_cost if full_grid_cost else 0.0}
+    print(f"[RUN] Successive halving: {backtests} backtests instead of {stats['full_grid_backtests']}, "
+          f"{stats['saved']:.0%} of the full grid's bars saved")
+
+    ranking = pd.DataFrame({'config': list(scores), 'score': list(scores.values()),
+                            'coins': [seen[i] for i in scores], 'rounds': [rounds[i] for i in scores],
+                            'params': [param_sets[i] for i in scores]})
+    # Candidates that lasted longer rank first, then by score within their last round
+    ranking['_order'] = ranking['score'] if higher_is_better else -ranking['score']
+    ranking = ranking.sort_values(['rounds', '_order'], ascending=False, na_position='last').drop(columns='_order')
+    return ranking.reset_index(drop=True), pd.concat(rows, ignore_index=True), stats
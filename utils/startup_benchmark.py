@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+# Packages whose modules must stay cheap to import (every backtest worker imports them)
+PACKAGES = ('strategies', 'sizers', 'riskmanagers', 'commissions', 'utils', 'analysis')
+# Heavy dependencies that may only be loaded by the functions that need them
+HEAVY_MODULES = ('matplotlib', 'ta')
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def discover_modules(root='.', packages=PACKAGES):
+    """
+    Lists the importable modules of the given packages ('strategies.Base', 'utils.runner', ...).
+    """
+    modules = []
+    for package in packages:
+        folder = os.path.join(root, package)
+        if not os.path.isdir(folder):
+            continue
+        for file_name in sorted(os.listdir(folder)):
+            if file_name.endswith('.py') and file_name != '__init__.py':
+                modules.append(f"{package}.{file_name[:-3]}")
+    return modules
+
+
+def measure_import(module, root='.', heavy=HEAVY_MODULES):
+    """
+    Imports one module in a fresh interpreter and measures it.
+
+    Returns:
+        dict: {'module', 'seconds', 'heavy': heavy modules pulled in, 'error': stderr tail or None}
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(root), MPLBACKEND='Agg')
+    proc = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=tuple(heavy))],
+                          cwd=root, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {'module': module, 'seconds': None, 'heavy': [], 'error': proc.stderr.strip().splitlines()[-1]}
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result.update(module=module, error=None)
+    return result
+
+
+def run_benchmark(root='.', modules=None, budget=None, heavy=HEAVY_MODULES):
+    """
+    Measures the import time of every module and checks that none of them loads a heavy dependency.
+
+    Args:
+        root (str): Repository root (added to PYTHONPATH of each probe).
+        modules (list): Module names to check (default: everything in PACKAGES).
+        budget (float): Max seconds allowed for a single import (None = no time check).
+        heavy (tuple): Modules that must not be in sys.modules after the import.
+
+    Returns:
+        tuple: (list of result dicts, list of failure messages)
+    """
+    modules = modules or discover_modules(root)
+    results, failures = [], []
+    for module in modules:
+        result = measure_import(module, root=root, heavy=heavy)
+        results.append(result)
+        if result['error']:
+            failures.append(f"{module}: import failed ({result['error']})")
+            continue
+        if result['heavy']:
+            failures.append(f"{module}: imports {', '.join(result['heavy'])} at module level")
+        if budget is not None and result['seconds'] > budget:
+            failures.append(f"{module}: {result['seconds']:.3f}s > budget {budget:.3f}s")
+    return results, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that importing strategies, sizers and utilities stays cheap.")
+    parser.add_argument("modules", nargs="*", help="Modules to check (default: every module of the project packages).")
+    parser.add_argument("--root", default=".", help="Repository root.")
+    parser.add_argument("--budget", type=float, default=None, help="Max seconds per module import.")
+    args = parser.parse_args()
+
+    results, failures = run_benchmark(root=args.root, modules=args.modules, budget=args.budget)
+    for r in sorted(results, key=lambda r: -(r['seconds'] or 0)):
+        seconds = 'ERROR' if r['seconds'] is None else f"{r['seconds']:.3f}s"
+        print(f"[STARTUP] {r['module']:<40} {seconds:>8} {' '.join(r['heavy'])}")
+    for failure in failures:
+        print(f"[STARTUP] FAIL {failure}")
+    sys.exit(1 if failures else 0)